@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    name = 'cinemanio.api'
+
+    def ready(self):
+        from cinemanio.api import signals  # noqa
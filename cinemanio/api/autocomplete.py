@@ -0,0 +1,242 @@
+import heapq
+import operator
+import sys
+from array import array
+from bisect import bisect_left
+from functools import reduce
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple, Type  # noqa
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import F, Model, Value
+from django.db.models.functions import Coalesce
+
+from cinemanio.api.changes import ChangeLog
+from cinemanio.core.models import Movie, Person
+from cinemanio.core.search import normalize_search_text
+
+# positive relations of users to objects, sum of their counts is popularity of object
+POPULARITY_FIELDS = {
+    Movie: ('fav', 'like', 'seen', 'want', 'have'),
+    Person: ('fav', 'like'),
+}  # type: Dict[Type[Model], Tuple[str, ...]]
+# approximate memory used by object and by every key of index besides the string: items of list, array and set
+OBJECT_OVERHEAD = 200
+KEY_OVERHEAD = 32
+# the greatest character, any key starting with prefix is less than prefix followed by it
+MAX_CHARACTER = '\U0010ffff'
+
+
+def get_keys(search_text: str) -> FrozenSet[str]:
+    """
+    Return keys of search text of object: every form of it and its suffixes starting from a word,
+    so "godf" finds "the godfather" and "крестный отец"
+    """
+    keys = set()  # type: Set[str]
+    for form in search_text.split('\n'):
+        words = form.split()
+        keys.update(' '.join(words[i:]) for i in range(len(words)))
+    return frozenset(keys)
+
+
+class PrefixIndex:
+    """
+    Sorted array of keys of objects with parallel array of ids of objects. Objects matching prefix are found
+    by binary search of range of keys starting with it and ranked by popularity. Memory used by index is estimated,
+    when it exceeds memory_limit, the least popular objects are evicted.
+    Index is built by sorting all keys once, changed objects are inserted and removed one by one
+    """
+
+    def __init__(self, memory_limit: int):
+        self.memory_limit = memory_limit
+        self.keys = []  # type: List[str]
+        self.ids = array('q')
+        # popularity and keys of indexed objects by id
+        self.objects = {}  # type: Dict[int, Tuple[int, FrozenSet[str]]]
+        # candidates for eviction, the least popular and the most recent first, entries of replaced objects are stale
+        self.heap = []  # type: List[Tuple[int, int]]
+        self.size = 0
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __contains__(self, pk):
+        return pk in self.objects
+
+    @staticmethod
+    def get_size(keys: FrozenSet[str]) -> int:
+        return OBJECT_OVERHEAD + sum(sys.getsizeof(key) + KEY_OVERHEAD for key in keys)
+
+    def build(self, objects: Iterable[Tuple[int, str, int]]) -> None:
+        """
+        Fill empty index by objects ordered from the most popular ones until memory limit is reached
+        """
+        items = []  # type: List[Tuple[str, int]]
+        for pk, search_text, popularity in objects:
+            keys = get_keys(search_text)
+            if not keys:
+                continue
+            size = self.get_size(keys)
+            if self.size + size > self.memory_limit:
+                break
+            items.extend((key, pk) for key in keys)
+            self.objects[pk] = (popularity, keys)
+            self.size += size
+        items.sort()
+        self.keys = [key for key, _ in items]
+        self.ids = array('q', (pk for _, pk in items))
+        self.heap = [(popularity, -pk) for pk, (popularity, _) in self.objects.items()]
+        heapq.heapify(self.heap)
+
+    def add(self, pk: int, search_text: str, popularity: int) -> bool:
+        """
+        Add object or replace it, return False if object is not indexed, because it's the least popular
+        """
+        self.remove(pk)
+        keys = get_keys(search_text)
+        if not keys:
+            return False
+        for key in keys:
+            index = bisect_left(self.keys, key)
+            self.keys.insert(index, key)
+            self.ids.insert(index, pk)
+        self.objects[pk] = (popularity, keys)
+        self.size += self.get_size(keys)
+        heapq.heappush(self.heap, (popularity, -pk))
+        while self.size > self.memory_limit and self.objects:
+            self.remove(self.pop_least_popular())
+        if len(self.heap) > 2 * len(self.objects):
+            self.heap = [(popularity, -pk) for pk, (popularity, _) in self.objects.items()]
+            heapq.heapify(self.heap)
+        return pk in self.objects
+
+    def remove(self, pk: int) -> None:
+        if pk not in self.objects:
+            return
+        _, keys = self.objects.pop(pk)
+        for key in keys:
+            index = bisect_left(self.keys, key)
+            while self.ids[index] != pk:
+                index += 1
+            del self.keys[index]
+            del self.ids[index]
+        self.size -= self.get_size(keys)
+
+    def pop_least_popular(self) -> int:
+        while True:
+            popularity, pk = heapq.heappop(self.heap)
+            if self.objects.get(-pk, (None,))[0] == popularity:
+                return -pk
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[int, int]]:
+        """
+        Return popularity and id of the most popular objects with keys starting with normalized prefix
+        """
+        start = bisect_left(self.keys, prefix)
+        stop = bisect_left(self.keys, prefix + MAX_CHARACTER, start)
+        results = [(self.objects[pk][0], pk) for pk in set(self.ids[start:stop])]
+        return heapq.nlargest(limit, results, key=lambda result: (result[0], -result[1]))
+
+
+def notify_changed(model: Type[Model], pk: int) -> None:
+    """
+    Append change of object to the log, every worker applies it to its indexes before next lookup
+    """
+    autocomplete.changes.append((model._meta.label, pk))
+
+
+class Autocomplete:
+    """
+    Prefix indexes of titles of movies and names of persons in all languages with transliterations, kept in memory
+    of every worker within settings.AUTOCOMPLETE['MEMORY_LIMIT'] split between models. Indexes are built
+    on the first lookup from search texts of objects, see cinemanio.core.search.get_search_text.
+    Changes of objects and their relations counts are appended to the log in shared cache by notify_changed(),
+    workers reload changed objects before lookup. Indexes are rebuilt if the log is expired or too long
+    """
+    models = (Movie, Person)  # type: Tuple[Type[Model], ...]
+
+    def __init__(self, memory_limit: Optional[int] = None):
+        options = settings.AUTOCOMPLETE
+        self.memory_limit = memory_limit if memory_limit is not None else options['MEMORY_LIMIT']
+        self.min_prefix_length = options['MIN_PREFIX_LENGTH']
+        self.max_changes = options['MAX_CHANGES']
+        self.changes = ChangeLog('autocomplete', options['CHANGES_TIMEOUT'])
+        self.indexes = {}  # type: Dict[Type[Model], PrefixIndex]
+        self.version = None  # type: Optional[int]
+        self.lock = Lock()
+
+    def search(self, prefix: str, models: Optional[Sequence[Type[Model]]] = None,
+               limit: Optional[int] = None) -> List[Model]:
+        """
+        Return the most popular objects of models with titles or names starting with prefix.
+        Shorter prefixes than settings.AUTOCOMPLETE['MIN_PREFIX_LENGTH'] find nothing, they match too many keys
+        """
+        prefix = normalize_search_text(prefix)
+        limit = limit or settings.AUTOCOMPLETE['RESULTS_LIMIT']
+        if len(prefix) < max(self.min_prefix_length, 1):
+            return []
+        with self.lock:
+            self.sync()
+            results = [(popularity, model, pk) for model in models or self.models
+                       for popularity, pk in self.indexes[model].search(prefix, limit)]
+        results = heapq.nlargest(limit, results, key=lambda result: result[0])
+        objects = {model: model.objects.in_bulk([pk for _, m, pk in results if m is model])
+                   for model in {model for _, model, _ in results}}
+        return [objects[model][pk] for _, model, pk in results if pk in objects[model]]
+
+    def sync(self) -> None:
+        """
+        Apply changes from the log in shared cache made since the last sync
+        """
+        version = self.changes.get_version()
+        if self.version is None or version < self.version or version - self.version > self.max_changes:
+            self.build(version)
+            return
+        if version == self.version:
+            return
+        changes = self.changes.get_changes(self.version, version)
+        if changes is None:
+            self.build(version)
+            return
+        changed = {}  # type: Dict[Type[Model], Set[int]]
+        for label, pk in changes:
+            changed.setdefault(apps.get_model(label), set()).add(pk)
+        for model, pks in changed.items():
+            if model in self.indexes:
+                self.reload(model, pks)
+        self.version = version
+
+    def build(self, version: int) -> None:
+        """
+        Build indexes adding objects from the most popular ones until memory limit is reached
+        """
+        self.indexes = {}
+        for model in self.models:
+            index = self.indexes[model] = PrefixIndex(self.memory_limit // len(self.models))
+            index.build(self.get_queryset(model).order_by('-popularity', 'pk').iterator())
+        self.version = version
+
+    def reload(self, model: Type[Model], pks: Set[int]) -> None:
+        index = self.indexes[model]
+        objects = {pk: (search_text, popularity)
+                   for pk, search_text, popularity in self.get_queryset(model).filter(pk__in=pks)}
+        for pk in pks:
+            if pk in objects:
+                index.add(pk, *objects[pk])
+            else:
+                index.remove(pk)
+
+    @staticmethod
+    def get_queryset(model: Type[Model]):
+        popularity = reduce(operator.add, [Coalesce(F(f'relations_count__{field}'), 0)
+                                           for field in POPULARITY_FIELDS[model]], Value(0))
+        return model.objects.annotate(popularity=popularity).values_list('pk', 'search_text', 'popularity')
+
+    def clear(self) -> None:
+        with self.lock:
+            self.indexes = {}
+            self.version = None
+
+
+autocomplete = Autocomplete()
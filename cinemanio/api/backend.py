@@ -0,0 +1,100 @@
+from collections import OrderedDict, namedtuple
+from functools import partial
+from hashlib import sha256
+from threading import Lock
+from typing import Dict  # noqa
+
+from django.conf import settings
+from graphql import parse, validate
+from graphql.backend.base import GraphQLBackend, GraphQLDocument
+from graphql.execution import ExecutionResult, execute
+from promise import is_thenable
+
+from cinemanio.api.cost import QueryCostAnalyzer, get_query_cost_error
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def execute_validated(schema, document_ast, errors, *args, **kwargs):
+    """
+    Execute document validated in advance, return validation errors if there are any.
+    Reject query if its estimated cost exceeds limits, report the cost in extensions of result
+    """
+    if errors:
+        return ExecutionResult(errors=errors, invalid=True)
+
+    variables = kwargs.get('variables') or kwargs.get('variable_values')
+    cost = QueryCostAnalyzer(schema, document_ast, variables, kwargs.get('operation_name')).analyze()
+    extensions = {'cost': cost._asdict()}
+    error = get_query_cost_error(cost)
+    if error:
+        return ExecutionResult(errors=[error], invalid=True, extensions=extensions)
+
+    def add_extensions(result):
+        result.extensions.update(extensions)
+        return result
+
+    result = execute(schema, document_ast, *args, **kwargs)
+    if is_thenable(result):
+        return result.then(add_extensions)
+    return add_extensions(result)
+
+
+class LRUCachedBackend(GraphQLBackend):
+    """
+    Backend keeping parsed and validated documents in bounded LRU cache, keyed by hash of document text
+    """
+
+    def __init__(self, maxsize=None, executor=None):
+        self.maxsize = maxsize if maxsize is not None else settings.GRAPHQL_DOCUMENT_CACHE_SIZE
+        self.execute_params = {'executor': executor} if executor else {}
+        self.cache = OrderedDict()  # type: Dict[str, GraphQLDocument]
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get_key(self, schema, document_string: str) -> str:
+        return f'{id(schema)}:{sha256(document_string.encode("utf-8")).hexdigest()}'
+
+    def document_from_string(self, schema, document_string):
+        key = self.get_key(schema, document_string)
+        with self.lock:
+            document = self.cache.get(key)
+            if document is not None:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return document
+            self.misses += 1
+
+        document = self.create_document(schema, document_string)
+
+        with self.lock:
+            self.cache[key] = document
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return document
+
+    def create_document(self, schema, document_string) -> GraphQLDocument:
+        """
+        Parse and validate document once, execute it without validation every time after
+        """
+        document_ast = parse(document_string)
+        errors = validate(schema, document_ast)
+        return GraphQLDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=partial(execute_validated, schema, document_ast, errors, **self.execute_params),
+        )
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.cache))
+
+    def cache_clear(self) -> None:
+        with self.lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+backend = LRUCachedBackend()
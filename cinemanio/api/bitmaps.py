@@ -0,0 +1,284 @@
+from array import array
+from bisect import bisect_left
+from functools import reduce
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union  # noqa
+
+from django.conf import settings
+
+from cinemanio.api.cache import get_cache
+from cinemanio.api.changes import ChangeLog
+from cinemanio.core.models import Movie
+
+SNAPSHOT_KEY = 'bitmaps:snapshot'
+# flag of scheduled building of snapshot, it's scheduled once for all workers
+BUILD_KEY = 'bitmaps:build'
+# many to many fields of movie indexed by bitmaps
+FIELDS = ('genres', 'countries', 'languages')
+# ids are split into chunks by high bits, chunk with more low bits than ARRAY_MAX is stored as bitmap
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+ARRAY_MAX = 4096
+
+Chunk = Union[array, int]
+
+
+def count_bits(value: int) -> int:
+    return bin(value).count('1')
+
+
+def iterate_bits(value: int) -> Iterator[int]:
+    while value:
+        lowest = value & -value
+        yield lowest.bit_length() - 1
+        value ^= lowest
+
+
+def compact(chunk: Chunk) -> Optional[Chunk]:
+    """
+    Return chunk in the smallest form: sorted array of low bits for sparse chunks, bitmap for dense ones
+    """
+    if isinstance(chunk, int):
+        if count_bits(chunk) <= ARRAY_MAX:
+            chunk = array('H', iterate_bits(chunk))
+    elif len(chunk) > ARRAY_MAX:
+        chunk = sum(1 << low for low in chunk)
+    return chunk if chunk else None
+
+
+def intersect_chunks(chunk1: Chunk, chunk2: Chunk) -> Optional[Chunk]:
+    if isinstance(chunk1, int) and isinstance(chunk2, int):
+        return compact(chunk1 & chunk2)
+    if isinstance(chunk1, int):
+        return intersect_chunks(chunk2, chunk1)
+    if isinstance(chunk2, int):
+        return compact(array('H', [low for low in chunk1 if chunk2 >> low & 1]))
+    return compact(array('H', sorted(set(chunk1).intersection(chunk2))))
+
+
+class Bitmap:
+    """
+    Compressed set of ids in the manner of Roaring bitmaps: ids are split into chunks by high bits, every chunk
+    is stored as sorted array of low bits when it's sparse or as bitmap in Python int when it's dense,
+    so sets take little memory and intersection of dense chunks is a single AND
+    """
+    __slots__ = ('chunks',)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self.chunks = {}  # type: Dict[int, Chunk]
+        for pk in ids:
+            self.add(pk)
+
+    def add(self, pk: int) -> None:
+        high, low = pk >> CHUNK_BITS, pk & CHUNK_MASK
+        chunk = self.chunks.get(high)
+        if chunk is None:
+            self.chunks[high] = array('H', [low])
+        elif isinstance(chunk, int):
+            self.chunks[high] = chunk | 1 << low
+        else:
+            index = bisect_left(chunk, low)
+            if index == len(chunk) or chunk[index] != low:
+                chunk.insert(index, low)
+                if len(chunk) > ARRAY_MAX:
+                    # dense chunk becomes bitmap
+                    self.chunks[high] = sum(1 << low for low in chunk)
+
+    def discard(self, pk: int) -> None:
+        high, low = pk >> CHUNK_BITS, pk & CHUNK_MASK
+        chunk = self.chunks.get(high)
+        if chunk is None:
+            return
+        if isinstance(chunk, int):
+            chunk = compact(chunk & ~(1 << low))
+        else:
+            index = bisect_left(chunk, low)
+            if index < len(chunk) and chunk[index] == low:
+                del chunk[index]
+        if chunk:
+            self.chunks[high] = chunk
+        else:
+            del self.chunks[high]
+
+    def __contains__(self, pk: int) -> bool:
+        chunk = self.chunks.get(pk >> CHUNK_BITS)
+        if chunk is None:
+            return False
+        low = pk & CHUNK_MASK
+        if isinstance(chunk, int):
+            return bool(chunk >> low & 1)
+        index = bisect_left(chunk, low)
+        return index < len(chunk) and chunk[index] == low
+
+    def __len__(self) -> int:
+        return sum(count_bits(chunk) if isinstance(chunk, int) else len(chunk) for chunk in self.chunks.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self.chunks):
+            chunk = self.chunks[high]
+            for low in iterate_bits(chunk) if isinstance(chunk, int) else chunk:
+                yield high << CHUNK_BITS | low
+
+    def get_ranges(self) -> List[Tuple[int, int]]:
+        """
+        Return contiguous ranges of ids as pairs of the least and the greatest ids of range
+        """
+        ranges = []  # type: List[Tuple[int, int]]
+        for pk in self:
+            if ranges and ranges[-1][1] == pk - 1:
+                ranges[-1] = (ranges[-1][0], pk)
+            else:
+                ranges.append((pk, pk))
+        return ranges
+
+    def __and__(self, other: 'Bitmap') -> 'Bitmap':
+        result = Bitmap()
+        for high in self.chunks.keys() & other.chunks.keys():
+            chunk = intersect_chunks(self.chunks[high], other.chunks[high])
+            if chunk is not None:
+                result.chunks[high] = chunk
+        return result
+
+    def copy(self) -> 'Bitmap':
+        result = Bitmap()
+        result.chunks = {high: chunk if isinstance(chunk, int) else array('H', chunk)
+                         for high, chunk in self.chunks.items()}
+        return result
+
+    def __eq__(self, other):
+        return isinstance(other, Bitmap) and list(self) == list(other)
+
+
+class PropertyBitmapIndex:
+    """
+    Bitmaps of ids of movies by genres, countries and languages, kept in memory of every worker, so filters
+    by several values are answered by intersection of bitmaps instead of a join per value.
+    Bitmaps are built from DB by task or management command and saved as snapshot in shared cache, workers load it
+    on the first lookup. Changes of many to many fields are appended to the log in shared cache by notify_changed(),
+    workers reload properties of changed movies before lookup. While there is no snapshot or the log is expired
+    or too long, building of snapshot is scheduled and lookups return nothing, so filters fall back to joins
+    """
+
+    def __init__(self):
+        options = settings.BITMAP_INDEX
+        self.max_changes = options['MAX_CHANGES']
+        self.snapshot_interval = options['SNAPSHOT_INTERVAL']
+        self.build_timeout = options['BUILD_TIMEOUT']
+        self.changes = ChangeLog('bitmaps', options['CHANGES_TIMEOUT'])
+        self.bitmaps = {}  # type: Dict[str, Dict[int, Bitmap]]
+        self.version = None  # type: Optional[int]
+        self.snapshot_version = None  # type: Optional[int]
+        self.lock = Lock()
+
+    def get_ids(self, field: str, values: Iterable[int]) -> Optional[Bitmap]:
+        """
+        Return ids of movies having all values of many to many field, None if bitmaps are not built yet
+        """
+        with self.lock:
+            if not self.sync():
+                return None
+            bitmaps = [self.bitmaps[field].get(value, Bitmap()) for value in values]
+            # bitmaps of the index are changed by other threads
+            return reduce(lambda bitmap1, bitmap2: bitmap1 & bitmap2, bitmaps[1:], bitmaps[0].copy())
+
+    def sync(self) -> bool:
+        """
+        Load snapshot on the first lookup and apply changes from the log made since version of bitmaps.
+        Return False and schedule building of snapshot if there is no snapshot or changes can't be applied to it
+        """
+        version = self.changes.get_version()
+        if self.apply_changes(version):
+            return True
+        snapshot = get_cache().get(SNAPSHOT_KEY)
+        if snapshot is not None:
+            self.version, self.bitmaps = snapshot
+            self.snapshot_version = self.version
+            if self.apply_changes(version):
+                return True
+        self.bitmaps, self.version, self.snapshot_version = {}, None, None
+        self.schedule_build()
+        return False
+
+    def apply_changes(self, version: int) -> bool:
+        """
+        Apply changes made since version of bitmaps up to version, return False if they can't be applied:
+        bitmaps are not loaded, changes are expired, there are too many of them or changed movies are unknown
+        """
+        if self.version is None or version < self.version or version - self.version > self.max_changes:
+            return False
+        if version == self.version:
+            return True
+        changes = self.changes.get_changes(self.version, version)
+        if changes is None or any(pk is None for _, pk in changes):
+            return False
+        changed = {}  # type: Dict[str, Set[int]]
+        for field, pk in changes:
+            changed.setdefault(field, set()).add(pk)
+        for field, pks in changed.items():
+            self.reload(field, pks)
+        self.version = version
+        if self.snapshot_version is None or version - self.snapshot_version >= self.snapshot_interval:
+            self.save()
+        return True
+
+    def schedule_build(self) -> None:
+        """
+        Schedule building of snapshot once for all workers, it's scheduled again after timeout if building failed
+        """
+        if get_cache().add(BUILD_KEY, True, timeout=self.build_timeout):
+            from cinemanio.api.tasks import build_bitmap_index
+            build_bitmap_index.delay()
+
+    def build(self) -> None:
+        """
+        Build bitmaps of all fields from DB and save them as snapshot to shared cache.
+        Tables of many to many fields are scanned, so it's done by task or management command, never by lookups
+        """
+        version = self.changes.get_version()
+        bitmaps = {}  # type: Dict[str, Dict[int, Bitmap]]
+        for field in FIELDS:
+            bitmaps[field] = {}
+            for pk, value in self.get_queryset(field).iterator():
+                bitmaps[field].setdefault(value, Bitmap()).add(pk)
+        get_cache().set(SNAPSHOT_KEY, (version, bitmaps), timeout=None)
+        get_cache().delete(BUILD_KEY)
+
+    def reload(self, field: str, pks: Set[int]) -> None:
+        """
+        Reload values of field of changed movies
+        """
+        bitmaps = self.bitmaps[field]
+        for bitmap in bitmaps.values():
+            for pk in pks:
+                bitmap.discard(pk)
+        for pk, value in self.get_queryset(field).filter(movie_id__in=pks):
+            bitmaps.setdefault(value, Bitmap()).add(pk)
+
+    def save(self) -> None:
+        get_cache().set(SNAPSHOT_KEY, (self.version, self.bitmaps), timeout=None)
+        self.snapshot_version = self.version
+
+    @staticmethod
+    def get_queryset(field: str):
+        """
+        Return pairs of movie id and value of field from the table of many to many field
+        """
+        through = Movie._meta.get_field(field).remote_field.through
+        return through.objects.order_by().values_list('movie_id', Movie._meta.get_field(field).m2m_reverse_name())
+
+    def clear(self) -> None:
+        with self.lock:
+            self.bitmaps = {}
+            self.version = None
+            self.snapshot_version = None
+
+
+def notify_changed(field: str, pk: Optional[int]) -> None:
+    """
+    Append change of many to many field of movie to the log, every worker applies it before next lookup.
+    Unknown movie means that values of field could be changed for any movie
+    """
+    bitmap_index.changes.append((field, pk))
+
+
+bitmap_index = PropertyBitmapIndex()
@@ -0,0 +1,74 @@
+import json
+from hashlib import sha256
+from typing import Any, Dict, Iterable, Optional
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import translation
+
+TAGS = ('movie', 'person')
+TAG_KEY = 'graphql:tag:{}'
+RESPONSE_KEY = 'graphql:response:{}'
+AUTOMATIC_QUERY_KEY = 'graphql:automatic-query:{}'
+
+
+def get_cache():
+    return caches[settings.GRAPHQL_RESPONSE_CACHE]
+
+
+def get_tags_versions(tags: Iterable[str] = TAGS) -> Dict[str, str]:
+    """
+    Return current versions of tags, initialize versions of tags missing in the cache
+    """
+    cache = get_cache()
+    keys = {TAG_KEY.format(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    for key in set(keys) - set(versions):
+        cache.add(key, uuid4().hex, timeout=None)
+        versions[key] = cache.get(key)
+    return {tag: versions[key] for key, tag in keys.items()}
+
+
+def invalidate(*tags: str) -> None:
+    """
+    Bump versions of tags, so all responses cached with previous versions are never requested again
+    """
+    get_cache().set_many({TAG_KEY.format(tag): uuid4().hex for tag in tags or TAGS}, timeout=None)
+
+
+def get_response_key(query: str, variables: Optional[Dict[str, Any]], operation_name: Optional[str]) -> str:
+    """
+    Return cache key of response for operation hash, variables, language and current versions of tags
+    """
+    key = json.dumps([
+        sha256(query.encode('utf-8')).hexdigest(),
+        variables or {},
+        operation_name,
+        translation.get_language(),
+        get_tags_versions(),
+    ], sort_keys=True, default=str)
+    return RESPONSE_KEY.format(sha256(key.encode('utf-8')).hexdigest())
+
+
+def get_response(key: str) -> Optional[Dict[str, Any]]:
+    return get_cache().get(key)
+
+
+def set_response(key: str, data: Dict[str, Any]) -> None:
+    get_cache().set(key, data, timeout=settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT)
+
+
+def get_automatic_query(query_id: str) -> Optional[str]:
+    """
+    Return document registered automatically by sha256 hash (Apollo Automatic Persisted Queries)
+    """
+    return get_cache().get(AUTOMATIC_QUERY_KEY.format(query_id))
+
+
+def set_automatic_query(query_id: str, document: str) -> None:
+    """
+    Keep automatically registered document for a while, apart from persisted queries loaded from manifest
+    """
+    get_cache().set(AUTOMATIC_QUERY_KEY.format(query_id), document,
+                    timeout=settings.GRAPHQL_AUTOMATIC_QUERY_TIMEOUT)
@@ -0,0 +1,45 @@
+from typing import Any, Hashable, List, Optional  # noqa
+
+from cinemanio.api.cache import get_cache
+
+
+class ChangeLog:
+    """
+    Log of changes in shared cache for structures kept in memory of every worker: every change increments
+    version of the log and is stored under it for timeout seconds. Workers apply changes made since version
+    of their structures, or rebuild them if changes are expired
+    """
+
+    def __init__(self, name: str, timeout: int):
+        self.version_key = f'{name}:version'
+        self.change_key = f'{name}:change:{{}}'
+        self.timeout = timeout
+
+    def get_version(self) -> int:
+        cache = get_cache()
+        cache.add(self.version_key, 0, timeout=None)
+        return cache.get(self.version_key) or 0
+
+    def append(self, change: Hashable) -> None:
+        cache = get_cache()
+        cache.add(self.version_key, 0, timeout=None)
+        version = cache.incr(self.version_key)
+        cache.set(self.change_key.format(version), change, timeout=self.timeout)
+
+    def reset(self) -> None:
+        """
+        Increment version without a change, so workers rebuild their structures instead of applying changes
+        """
+        cache = get_cache()
+        cache.add(self.version_key, 0, timeout=None)
+        cache.incr(self.version_key)
+
+    def get_changes(self, since: int, until: int) -> Optional[List[Any]]:
+        """
+        Return changes made after version since up to version until, None if some of them are expired
+        """
+        keys = [self.change_key.format(version) for version in range(since + 1, until + 1)]
+        changes = get_cache().get_many(keys)
+        if len(changes) < len(keys):
+            return None
+        return [changes[key] for key in keys]
@@ -0,0 +1,105 @@
+from collections import namedtuple
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from graphql import GraphQLError
+from graphql.execution.utils import get_operation_root_type
+from graphql.language.ast import Field, FragmentDefinition, FragmentSpread, OperationDefinition
+from graphql.type.definition import get_named_type
+from graphql.type.scalars import GraphQLInt
+from graphql.utils.type_from_ast import type_from_ast
+from graphql.utils.value_from_ast import value_from_ast
+
+QueryCost = namedtuple('QueryCost', ['cost', 'depth'])
+
+# fields wrapping nodes of connections, they don't increase depth of query
+CONNECTION_FIELDS = ('edges', 'node')
+
+
+class QueryCostAnalyzer:
+    """
+    Estimate cost of query statically using AST of validated document and variables before execution.
+    Every field costs its weight from settings.GRAPHQL_QUERY_COST['WEIGHTS'] (1 for objects, 0 for scalars
+    by default), cost of subfields of list fields is multiplied by first/last arguments
+    """
+
+    def __init__(self, schema, document_ast, variables: Optional[Dict[str, Any]] = None,
+                 operation_name: Optional[str] = None):
+        self.schema = schema
+        self.options = settings.GRAPHQL_QUERY_COST
+        self.fragments = {definition.name.value: definition for definition in document_ast.definitions
+                          if isinstance(definition, FragmentDefinition)}
+        self.operation = self.get_operation(document_ast, operation_name)
+        self.variables = dict(variables or {})
+        for definition in self.operation.variable_definitions if self.operation else []:
+            if definition.default_value is not None:
+                self.variables.setdefault(definition.variable.name.value, value_from_ast(
+                    definition.default_value, type_from_ast(schema, definition.type)))
+
+    @staticmethod
+    def get_operation(document_ast, operation_name: Optional[str]) -> Optional[OperationDefinition]:
+        for definition in document_ast.definitions:
+            if isinstance(definition, OperationDefinition) and \
+                    (operation_name is None or definition.name and definition.name.value == operation_name):
+                return definition
+        return None
+
+    def analyze(self) -> QueryCost:
+        if self.operation is None:
+            return QueryCost(0, 0)
+        root_type = get_operation_root_type(self.schema, self.operation)
+        return self.get_selection_set_cost(root_type, self.operation.selection_set)
+
+    def get_selection_set_cost(self, parent_type, selection_set) -> QueryCost:
+        cost, depth = 0, 0
+        for selection in selection_set.selections:
+            if isinstance(selection, Field):
+                selection_cost = self.get_field_cost(parent_type, selection)
+            else:
+                fragment = self.fragments[selection.name.value] if isinstance(selection, FragmentSpread) else selection
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value) \
+                    if fragment.type_condition else parent_type
+                selection_cost = self.get_selection_set_cost(fragment_type, fragment.selection_set)
+            cost += selection_cost.cost
+            depth = max(depth, selection_cost.depth)
+        return QueryCost(cost, depth)
+
+    def get_field_cost(self, parent_type, field) -> QueryCost:
+        name = field.name.value
+        if name.startswith('__'):
+            # introspection
+            return QueryCost(0, 0)
+
+        field_definition = parent_type.fields[name]
+        weight = self.options['WEIGHTS'].get(f'{parent_type.name}.{name}', 0 if field.selection_set is None else 1)
+        if field.selection_set is None:
+            return QueryCost(weight, 0)
+
+        cost = self.get_selection_set_cost(get_named_type(field_definition.type), field.selection_set)
+        return QueryCost(weight + self.get_list_size(field_definition, field) * cost.cost,
+                         cost.depth + (name not in CONNECTION_FIELDS))
+
+    def get_list_size(self, field_definition, field) -> int:
+        """
+        Return expected amount of items of list field using first/last arguments, negative ones count as 0
+        """
+        if 'first' not in field_definition.args and 'last' not in field_definition.args:
+            return 1
+        for argument in field.arguments:
+            if argument.name.value in ['first', 'last']:
+                size = value_from_ast(argument.value, GraphQLInt, self.variables)
+                if size is not None:
+                    return max(size, 0)
+        return self.options['DEFAULT_LIST_SIZE']
+
+
+def get_query_cost_error(cost: QueryCost) -> Optional[GraphQLError]:
+    """
+    Return error if query cost or depth exceed limits of settings.GRAPHQL_QUERY_COST
+    """
+    options = settings.GRAPHQL_QUERY_COST
+    if options['MAX_DEPTH'] and cost.depth > options['MAX_DEPTH']:
+        return GraphQLError(f"Query depth {cost.depth} exceeds maximum depth {options['MAX_DEPTH']}")
+    if options['MAX_COST'] and cost.cost > options['MAX_COST']:
+        return GraphQLError(f"Query cost {cost.cost} exceeds maximum cost {options['MAX_COST']}")
+    return None
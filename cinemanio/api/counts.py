@@ -0,0 +1,94 @@
+import json
+from hashlib import sha256
+from typing import Any, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+from cinemanio.api import cache
+
+COUNT_KEY = 'graphql:count:{}'
+
+
+def get_unordered_sql(queryset) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Return SQL and params of queryset without ordering, raise EmptyResultSet if queryset is empty
+    """
+    query = queryset.query.chain()
+    query.clear_ordering(force_empty=True)
+    return query.get_compiler(queryset.db).as_sql()
+
+
+def get_count_key(queryset) -> Optional[str]:
+    """
+    Return cache key of count for filter signature of queryset: SQL without ordering and its params.
+    Return None if queryset is empty without touching DB
+    """
+    try:
+        sql, params = get_unordered_sql(queryset)
+    except EmptyResultSet:
+        return None
+    key = json.dumps([sql, params, cache.get_tags_versions()], default=str)
+    return COUNT_KEY.format(sha256(key.encode('utf-8')).hexdigest())
+
+
+def is_unfiltered(queryset) -> bool:
+    query = queryset.query
+    return not query.where.children and not query.distinct and not query.combinator \
+        and not query.low_mark and query.high_mark is None
+
+
+def get_exact_count(queryset) -> int:
+    """
+    Count rows of queryset, keep count in cache for settings.GRAPHQL_COUNT_CACHE_TIMEOUT seconds
+    """
+    key = get_count_key(queryset)
+    if key is None:
+        return 0
+    count = cache.get_cache().get(key)
+    if count is None:
+        count = queryset.count()
+        cache.get_cache().set(key, count, timeout=settings.GRAPHQL_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def get_estimated_count(queryset) -> Optional[int]:
+    """
+    Return estimation of Postgres planner without scanning rows: reltuples statistics of table for unfiltered
+    querysets, planned rows for filtered ones. Return None if estimation is not available
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if is_unfiltered(queryset):
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                           [connection.ops.quote_name(queryset.model._meta.db_table)])
+            row = cursor.fetchone()
+            rows = row[0] if row else -1
+        else:
+            try:
+                sql, params = get_unordered_sql(queryset)
+            except EmptyResultSet:
+                return 0
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)  # nosec
+            rows = cursor.fetchone()[0][0]['Plan']['Plan Rows']
+
+    # reltuples is negative for tables never analyzed
+    return int(rows) if rows >= 0 else None
+
+
+def get_count(queryset, approximate: bool = False) -> int:
+    """
+    Return estimated amount of rows of queryset if approximate count requested and could be estimated,
+    otherwise exact count cached per filter signature. Amount of search results is reported by search backend
+    """
+    if getattr(queryset, 'search_term', None) is not None:
+        return queryset.count()
+    if approximate:
+        count = get_estimated_count(queryset)
+        if count is not None:
+            return count
+    return get_exact_count(queryset)
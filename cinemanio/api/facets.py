@@ -0,0 +1,74 @@
+import json
+from collections import defaultdict
+from hashlib import sha256
+from typing import Dict, List, Optional, Tuple  # noqa
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db.models import CharField, Count, F, IntegerField, Value
+from django.db.models.functions import Cast
+
+from cinemanio.api import cache
+from cinemanio.api.counts import get_unordered_sql
+from cinemanio.core.models import Movie
+
+FACETS_KEY = 'graphql:facets:{}'
+# many to many fields of movie with counts of movies by every value
+M2M_FACETS = ('genres', 'countries', 'languages')
+FACETS = M2M_FACETS + ('decades',)
+
+Facets = Dict[str, List[Tuple[int, int]]]
+
+
+def get_facets_key(queryset) -> str:
+    """
+    Return cache key of facets for filter signature of queryset, see cinemanio.api.counts.get_count_key
+    """
+    sql, params = get_unordered_sql(queryset)
+    key = json.dumps([sql, params, cache.get_tags_versions()], default=str)
+    return FACETS_KEY.format(sha256(key.encode('utf-8')).hexdigest())
+
+
+def get_facets_queryset(queryset):
+    """
+    Return union of grouped queries of all facets: name of facet, value and amount of movies of queryset
+    """
+    ids = queryset.order_by().values('pk')
+    querysets = []
+    for name in M2M_FACETS:
+        through = Movie._meta.get_field(name).remote_field.through
+        column = Movie._meta.get_field(name).m2m_reverse_name()
+        querysets.append(through.objects.filter(movie_id__in=ids).order_by()
+                         .values(value=F(column))
+                         .annotate(facet=Value(name, output_field=CharField()), count=Count('*'))
+                         .values_list('facet', 'value', 'count'))
+    decade = Cast(F('year') / 10, IntegerField()) * 10
+    # values() of translated models doesn't accept expressions
+    querysets.append(Movie.objects.filter(pk__in=ids, year__isnull=False).order_by()
+                     .annotate(value=decade).values('value')
+                     .annotate(facet=Value('decades', output_field=CharField()), count=Count('*'))
+                     .values_list('facet', 'value', 'count'))
+    return querysets[0].union(*querysets[1:], all=True)
+
+
+def get_facets(queryset) -> Facets:
+    """
+    Return counts of movies of queryset by genres, countries, languages and decades computed by one grouped query.
+    Every facet is a list of value and count pairs ordered by count. Facets are cached per filter signature
+    of queryset for settings.GRAPHQL_COUNT_CACHE_TIMEOUT seconds
+    """
+    if getattr(queryset, 'search_term', None) is not None:
+        queryset = queryset.filter_by_search()
+    try:
+        key = get_facets_key(queryset)
+    except EmptyResultSet:
+        return {name: [] for name in FACETS}
+
+    facets = cache.get_cache().get(key)  # type: Optional[Facets]
+    if facets is None:
+        counts = defaultdict(list)  # type: Dict[str, List[Tuple[int, int]]]
+        for name, value, count in get_facets_queryset(queryset):
+            counts[name].append((value, count))
+        facets = {name: sorted(counts[name], key=lambda item: (-item[1], item[0])) for name in FACETS}
+        cache.get_cache().set(key, facets, timeout=settings.GRAPHQL_COUNT_CACHE_TIMEOUT)
+    return facets
@@ -1,7 +1,16 @@
+from functools import reduce
+from operator import or_
+
 from graphql_relay.node.node import from_global_id
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
 from django_filters import FilterSet, CharFilter
 from django_filters.filters import ModelMultipleChoiceFilter, ModelMultipleChoiceField
 
+from cinemanio.api.bitmaps import FIELDS as BITMAP_FIELDS, Bitmap, bitmap_index
+from cinemanio.core.models import Movie
+
 
 class BaseFilterSet(FilterSet):
     """
@@ -10,6 +19,14 @@ class BaseFilterSet(FilterSet):
     search = CharFilter(method='filter_by_search_term')
 
     def filter_m2m(self, qs, name, value):
+        """
+        Filter objects having all values of many to many field. Movies are filtered by ids from intersection
+        of bitmaps without joins, by a join per value only while bitmaps are not built
+        """
+        if value and settings.BITMAP_INDEX['ENABLED'] and qs.model is Movie and name in BITMAP_FIELDS:
+            ids = bitmap_index.get_ids(name, [instance.id for instance in value])
+            if ids is not None:
+                return self.filter_ids(qs, ids)
         for instance in value:
             qs = qs.filter(**{name: instance.id})
         return qs
@@ -17,6 +34,27 @@ class BaseFilterSet(FilterSet):
     def filter_by_search_term(self, qs, _, value):
         return qs.search(value)
 
+    @staticmethod
+    def filter_ids(qs, ids: Bitmap):
+        """
+        Filter objects by ids: by list of them if there are not too many, otherwise by contiguous ranges of them,
+        and if there are too many ranges, by array of ids passed as a single param on PostgreSQL
+        """
+        max_ids = settings.BITMAP_INDEX['MAX_IDS']
+        if not ids:
+            return qs.none()
+        if len(ids) <= max_ids:
+            return qs.filter(pk__in=list(ids))
+        ranges = ids.get_ranges()
+        if len(ranges) <= max_ids:
+            return qs.filter(reduce(or_, [Q(pk__range=pk_range) for pk_range in ranges]))
+        if connection.vendor == 'postgresql':
+            # SQL is formatted with names of table and column of primary key only, ids are passed as param
+            opts = qs.model._meta
+            pk = f'{connection.ops.quote_name(opts.db_table)}.{connection.ops.quote_name(opts.pk.column)}'
+            return qs.extra(where=[f'{pk} = ANY(%s)'], params=[list(ids)])  # nosec
+        return qs.filter(pk__in=list(ids))
+
 
 class ModelGlobalIdMultipleChoiceField(ModelMultipleChoiceField):
     """
@@ -0,0 +1,201 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.db.models import Count, F
+from django.db.models.expressions import Random, Window
+from django.db.models.functions import RowNumber
+from django.db.models.sql import Query
+from graphene.utils.str_converters import to_snake_case
+from graphql_relay.connection.arrayconnection import get_offset_with_default
+from promise import Promise
+from promise.dataloader import DataLoader
+
+ROW_NUMBER = 'partition_row_number'
+ROWS_COUNT = 'partition_rows_count'
+
+
+class PartitionSlice(List[Any]):
+    """
+    Slice of objects related to one parent object, with offset of the slice and total amount of related objects
+    """
+
+    def __init__(self, iterable, start: int, total: int):
+        super().__init__(iterable)
+        self.start = start
+        self.total = total
+
+
+class PartitionSliceCompilerMixin:
+    """
+    Wrap select into outer select, filtering rows by row number in partition
+    """
+
+    def as_sql(self, *args, **kwargs):
+        sql, params = super().as_sql(*args, **kwargs)  # type: ignore
+        alias = self.connection.ops.quote_name('partition')  # type: ignore
+        row_number = f'{alias}.{self.connection.ops.quote_name(ROW_NUMBER)}'  # type: ignore
+        start, stop = self.query.row_number_range  # type: ignore
+        sql = f'SELECT * FROM ({sql}) {alias} WHERE {row_number} > %s AND {row_number} <= %s'  # nosec
+        return sql, tuple(params) + (start, stop)
+
+
+class PartitionSliceQuery(Query):
+    """
+    Query of rows with row number in partition within row_number_range
+    """
+    row_number_range = (0, 0)
+
+    def get_compiler(self, using=None, connection=None):
+        if using:
+            connection = connections[using]
+        compiler_class = connection.ops.compiler(self.compiler)
+        compiler_class = type(f'PartitionSlice{compiler_class.__name__}',
+                              (PartitionSliceCompilerMixin, compiler_class), {})
+        return compiler_class(self, connection, using)
+
+
+def get_ordering_expressions(queryset) -> List[Any]:
+    """
+    Convert ordering of queryset (or default ordering of model) to expressions for window function
+    """
+    expressions = []
+    for field in list(queryset.query.order_by or queryset.model._meta.ordering) + ['pk']:
+        if hasattr(field, 'resolve_expression'):
+            expressions.append(field)
+        elif field == '?':
+            expressions.append(Random())
+        elif field.startswith('-'):
+            expressions.append(F(field[1:]).desc())
+        else:
+            expressions.append(F(field).asc())
+    return expressions
+
+
+class QuerySetLoader(DataLoader):
+    """
+    Load lists of objects for many parent objects using one query filtered by key field
+    """
+
+    def __init__(self, queryset, key_field):
+        super().__init__()
+        self.queryset = queryset
+        self.key_field = key_field
+
+    def batch_load_fn(self, keys):  # pylint: disable=method-hidden
+        groups = defaultdict(list)  # type: Dict[Hashable, List]
+        for instance in self.queryset.filter(**{f'{self.key_field}__in': keys}):
+            groups[getattr(instance, self.key_field)].append(instance)
+        return Promise.resolve([groups[key] for key in keys])
+
+
+class PartitionSliceLoader(QuerySetLoader):
+    """
+    Load slices of objects for many parent objects using one query with ROW_NUMBER() OVER (PARTITION BY key_field).
+    Rows are numbered according to ordering of queryset, so slices are the same as queryset slices of every parent
+    """
+
+    def __init__(self, queryset, key_field, start: int, size: int):
+        self.count_queryset = queryset
+        partition_by = [F(key_field)]
+        queryset = queryset.annotate(**{
+            ROW_NUMBER: Window(RowNumber(), partition_by=partition_by,
+                               order_by=get_ordering_expressions(queryset)),
+            ROWS_COUNT: Window(Count('pk'), partition_by=partition_by),
+        })
+        queryset.query = queryset.query.chain(PartitionSliceQuery)
+        queryset.query.row_number_range = (start, start + size)
+        super().__init__(queryset, key_field)
+        self.start = start
+
+    def batch_load_fn(self, keys):  # pylint: disable=method-hidden
+        return super().batch_load_fn(keys).then(lambda groups: self.get_slices(keys, groups))
+
+    def get_slices(self, keys, groups) -> List[PartitionSlice]:
+        # rows beyond the end of partition are not selected, so amount of objects of empty slice is counted separately
+        empty = [key for key, group in zip(keys, groups) if not group]
+        totals = self.get_totals(empty) if empty and self.start else {}
+        return [self.get_slice(group, totals.get(key, 0)) for key, group in zip(keys, groups)]
+
+    def get_totals(self, keys) -> Dict[Hashable, int]:
+        """
+        Return amounts of related objects of parent objects by one grouped query
+        """
+        return dict(self.count_queryset.filter(**{f'{self.key_field}__in': keys})
+                    .values_list(self.key_field).annotate(count=Count('pk')).order_by())
+
+    def get_slice(self, group, total: int) -> PartitionSlice:
+        group = sorted(group, key=lambda instance: getattr(instance, ROW_NUMBER))
+        if group:
+            total = getattr(group[0], ROWS_COUNT)
+        return PartitionSlice(group, start=self.start, total=total)
+
+
+def get_loader(info, name: str, factory: Callable[[], DataLoader], shared: bool = False) -> DataLoader:
+    """
+    Get loader from the request context, create it using factory if it's not there yet.
+    Loaders are stored per field path without list indexes, so all nodes of one list share the same batch.
+    Shared loaders are stored per name, so all fields of the request share the same batch
+    """
+    loaders = getattr(info.context, 'dataloaders', None)  # type: Optional[Dict[Tuple[str, ...], DataLoader]]
+    if loaders is None:
+        loaders = info.context.dataloaders = {}
+    key = (name,)  # type: Tuple[str, ...]
+    if not shared:
+        key += tuple(part for part in info.path if not isinstance(part, int))
+    if key not in loaders:
+        loaders[key] = factory()
+    return loaders[key]
+
+
+def filter_connection_queryset(info, queryset, **kwargs):
+    """
+    Apply filterset of current connection field to queryset the same way DjangoFilterConnectionField does
+    """
+    field = info.parent_type.graphene_type._meta.fields[to_snake_case(info.field_name)]
+    filter_kwargs = {k: v for k, v in kwargs.items() if k in field.filtering_args}
+    return field.filterset_class(data=filter_kwargs, queryset=queryset, request=info.context).qs
+
+
+def get_partition_slice(queryset, first=None, after=None, last=None, before=None, **_) -> Optional[Tuple[int, int]]:
+    """
+    Return start and size of slice, if connection arguments allow to fetch only a slice of every parent's objects
+    """
+    if not isinstance(first, int) or last is not None or before is not None:
+        return None
+    if not connections[queryset.db].features.supports_over_clause:
+        return None
+    return get_offset_with_default(after, -1) + 1, first
+
+
+def get_related_loader(queryset, key_field: str, **kwargs) -> DataLoader:
+    partition_slice = get_partition_slice(queryset, **kwargs)
+    if partition_slice:
+        return PartitionSliceLoader(queryset, key_field, *partition_slice)
+    return QuerySetLoader(queryset, key_field)
+
+
+def load_related(info, node, key_field: str, key, **kwargs) -> Promise:
+    """
+    Load list of node objects related to parent object by key_field
+    """
+
+    def factory():
+        queryset = filter_connection_queryset(info, node.get_queryset(info, columns=[key_field]), **kwargs)
+        return get_related_loader(queryset, key_field, **kwargs)
+
+    return get_loader(info, 'related', factory).load(key)
+
+
+def load_generic_related(info, node, instance, **kwargs) -> Promise:
+    """
+    Load list of node objects related to parent instance using generic relation
+    """
+
+    def factory():
+        queryset = node.get_queryset(info, columns=['object_id'])
+        queryset = queryset.filter(content_type=ContentType.objects.get_for_model(instance))
+        return get_related_loader(filter_connection_queryset(info, queryset, **kwargs), 'object_id', **kwargs)
+
+    return get_loader(info, 'generic_related', factory).load(instance.pk)
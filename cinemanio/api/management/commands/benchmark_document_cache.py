@@ -0,0 +1,123 @@
+import time
+
+from django.core.management.base import BaseCommand
+from graphql import validate
+from graphql.backend.core import GraphQLCoreBackend
+
+from cinemanio.api.backend import LRUCachedBackend
+from cinemanio.schema import schema
+
+DOCUMENTS = [
+    '''
+    query Movies($first: Int!, $after: String, $genres: [ID!], $order: String) {
+      movies(first: $first, after: $after, genres: $genres, orderBy: $order) {
+        totalCount
+        edges {
+          node {
+            id, year, titleEn, titleRu
+            genres { id, nameEn, nameRu }
+            countries { id, nameEn, nameRu }
+            poster { shortCard }
+            relation { ... on MovieRelationNode { fav, like, seen, dislike, want, ignore, have } }
+          }
+          cursor
+        }
+        pageInfo { endCursor, hasNextPage }
+      }
+    }
+    ''',
+    '''
+    query Movie($id: ID!) {
+      movie(id: $id) {
+        id, year, runtime, titleEn, titleRu, titleOriginal
+        genres { id, nameEn, nameRu }
+        countries { id, nameEn, nameRu }
+        languages { id, nameEn, nameRu }
+        imdb { id, rating, votes, url }
+        kinopoisk { id, rating, votes, info, url }
+        cast {
+          edges {
+            node {
+              name, nameEn, nameRu
+              person { id, firstNameEn, lastNameEn, firstNameRu, lastNameRu }
+              role { id, nameEn, nameRu }
+            }
+          }
+        }
+        images { edges { node { image { type, original, fullCard, detail } } } }
+        wikipedia { edges { node { title, lang, content } } }
+        relationsCount { ... on MovieRelationCountNode { fav, like, seen, dislike, want, ignore, have } }
+      }
+    }
+    ''',
+    '''
+    query Persons($first: Int!, $after: String, $roles: [ID!], $order: String) {
+      persons(first: $first, after: $after, roles: $roles, orderBy: $order) {
+        totalCount
+        edges {
+          node {
+            id, nameEn, nameRu
+            country { id, nameEn, nameRu }
+            roles { id, nameEn, nameRu }
+            photo { shortCard }
+          }
+          cursor
+        }
+        pageInfo { endCursor, hasNextPage }
+      }
+    }
+    ''',
+    '''
+    query Person($id: ID!) {
+      person(id: $id) {
+        id, nameEn, nameRu, gender, dateBirth, dateDeath
+        country { id, nameEn, nameRu }
+        roles { id, nameEn, nameRu }
+        imdb { id, url }
+        kinopoisk { id, info, url }
+        career {
+          edges {
+            node {
+              name, nameEn, nameRu
+              movie { id, year, titleEn, titleRu }
+              role { id, nameEn, nameRu }
+            }
+          }
+        }
+        images { edges { node { image { type, original, fullCard, detail } } } }
+        wikipedia { edges { node { title, lang, content } } }
+      }
+    }
+    ''',
+]
+
+
+class Command(BaseCommand):
+    """
+    Management command to measure CPU time of parsing and validation of GraphQL documents with and without cache
+    """
+    help = 'Compare CPU time per request spent before execution of typical GraphQL documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Number of requests to simulate')
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        uncached = self.measure(GraphQLCoreBackend(), requests, validate_document=True)
+        cached = self.measure(LRUCachedBackend(maxsize=len(DOCUMENTS)), requests)
+
+        self.stdout.write(f'Without cache: {uncached * 1000:.3f}ms per request')
+        self.stdout.write(f'With LRU cache: {cached * 1000:.3f}ms per request')
+        self.stdout.write(self.style.SUCCESS(f'CPU time saved: {(uncached - cached) * 1000:.3f}ms per request'))
+
+    def measure(self, backend, requests, validate_document=False) -> float:
+        """
+        Return CPU time per request spent on getting document ready for execution.
+        GraphQLCoreBackend validates document during execution, so validation is called explicitly for it
+        """
+        started = time.process_time()
+        for i in range(requests):
+            document = backend.document_from_string(schema, DOCUMENTS[i % len(DOCUMENTS)])
+            if validate_document:
+                validate(schema, document.document_ast)
+        return (time.process_time() - started) / requests
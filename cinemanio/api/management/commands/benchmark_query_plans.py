@@ -0,0 +1,61 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from cinemanio.api.backend import LRUCachedBackend
+from cinemanio.api.helpers import global_id
+from cinemanio.api.management.commands.benchmark_document_cache import DOCUMENTS
+from cinemanio.api.plans import query_plans
+from cinemanio.core.models import Movie, Person
+from cinemanio.schema import schema
+
+
+class Command(BaseCommand):
+    """
+    Management command to measure CPU time of execution of GraphQL documents with and without cache of query plans.
+    Documents are executed against current database, so it should contain movies and persons with relations
+    """
+    help = 'Compare CPU time per request spent on execution of typical GraphQL documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Number of requests to simulate')
+
+    def handle(self, *args, **options):
+        movie, person = Movie.objects.first(), Person.objects.first()
+        if movie is None or person is None:
+            raise CommandError("There are no movies or persons in database, run seed_test_data command first")
+
+        requests = options['requests']
+        # variables of DOCUMENTS: list of movies, movie, list of persons, person
+        variables_list = [dict(first=20), dict(id=global_id(movie)), dict(first=20), dict(id=global_id(person))]
+        backend = LRUCachedBackend(maxsize=len(DOCUMENTS))
+
+        maxsize = query_plans.maxsize
+        try:
+            query_plans.maxsize = 0
+            uncached = self.measure(backend, variables_list, requests)
+            query_plans.maxsize = maxsize
+            cached = self.measure(backend, variables_list, requests)
+        finally:
+            query_plans.maxsize = maxsize
+            query_plans.cache_clear()
+
+        self.stdout.write(f'Without plans cache: {uncached * 1000:.3f}ms per request')
+        self.stdout.write(f'With plans cache: {cached * 1000:.3f}ms per request')
+        self.stdout.write(self.style.SUCCESS(f'CPU time saved: {(uncached - cached) * 1000:.3f}ms per request'))
+
+    def measure(self, backend, variables_list, requests) -> float:
+        """
+        Return CPU time per request spent on execution of document, including resolvers and queries to database
+        """
+        started = time.process_time()
+        for i in range(requests):
+            request = RequestFactory().post('/graphql/')
+            request.user = AnonymousUser()
+            document = backend.document_from_string(schema, DOCUMENTS[i % len(DOCUMENTS)])
+            result = document.execute(context_value=request, variable_values=variables_list[i % len(DOCUMENTS)])
+            if result.errors:
+                raise CommandError(f"Document executed with errors: {result.errors}")
+        return (time.process_time() - started) / requests
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from cinemanio.api.bitmaps import bitmap_index
+
+
+class Command(BaseCommand):
+    """
+    Management command to build snapshot of bitmaps of movies in shared cache, so workers load it instead
+    of falling back to joins until the scheduled building is done, e.g. after deploy or flush of the cache
+    """
+    help = 'Build snapshot of bitmap index of movies'
+
+    def handle(self, *args, **options):
+        bitmap_index.build()
+        self.stdout.write(self.style.SUCCESS('Successfully built snapshot of bitmap index'))
@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.transaction import atomic
+
+from cinemanio.api.models import PersistedQuery
+
+
+class Command(BaseCommand):
+    """
+    Management command to register persisted queries from operation manifest of the frontend build
+    """
+    help = 'Load persisted queries from operation manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='Path to JSON manifest: apollo-persisted-query-manifest format '
+                                             'or mapping of sha256 hash to document')
+        parser.add_argument('--prune', action='store_true', help='Delete persisted queries absent in manifest')
+
+    def handle(self, *args, **options):
+        with open(options['manifest']) as f:
+            manifest = json.load(f)
+
+        operations = self.get_operations(manifest)
+        with atomic():
+            for query_id, document, operation_name in operations:
+                try:
+                    PersistedQuery.objects.register(document, query_id, operation_name)
+                except ValueError as e:
+                    raise CommandError(e)
+
+            if options['prune']:
+                ids = [query_id for query_id, _, _ in operations]
+                deleted = PersistedQuery.objects.exclude(id__in=ids).delete()[0]
+                self.stdout.write(f'Deleted {deleted} persisted queries')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully loaded {len(operations)} persisted queries'))
+
+    def get_operations(self, manifest):
+        if 'operations' in manifest:
+            return [(operation['id'], operation['body'], operation.get('name') or '')
+                    for operation in manifest['operations']]
+        return [(query_id, document, '') for query_id, document in manifest.items()]
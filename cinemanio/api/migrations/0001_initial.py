@@ -0,0 +1,27 @@
+# Generated by Django 2.2.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersistedQuery',
+            fields=[
+                ('id', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='SHA256 hash')),
+                ('document', models.TextField(verbose_name='Document')),
+                ('operation_name', models.CharField(blank=True, default='', max_length=100, verbose_name='Operation name')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+            ],
+            options={
+                'verbose_name': 'persisted query',
+                'verbose_name_plural': 'persisted queries',
+            },
+        ),
+    ]
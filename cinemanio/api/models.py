@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import Optional
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+from graphql import parse, validate
+from graphql.error import GraphQLSyntaxError
+
+
+class PersistedQueryManager(models.Manager):
+    # documents are immutable, so they are kept in memory of worker once requested,
+    # least recently requested ones are evicted above settings.GRAPHQL_PERSISTED_QUERY_CACHE_SIZE
+    documents = OrderedDict()  # type: OrderedDict[str, str]
+    lock = Lock()
+
+    def get_document(self, query_id: str) -> Optional[str]:
+        """
+        Return text of persisted document by sha256 hash or None if it's not registered
+        """
+        with self.lock:
+            document = self.documents.get(query_id)
+            if document is not None:
+                self.documents.move_to_end(query_id)
+                return document
+
+        try:
+            document = self.get(id=query_id).document
+        except self.model.DoesNotExist:
+            return None
+
+        with self.lock:
+            self.documents[query_id] = document
+            while len(self.documents) > settings.GRAPHQL_PERSISTED_QUERY_CACHE_SIZE:
+                self.documents.popitem(last=False)
+        return document
+
+    def register(self, document: str, query_id: Optional[str] = None, operation_name: str = '') -> 'PersistedQuery':
+        """
+        Validate document against schema and save it with sha256 hash of its text as ID
+        """
+        document_hash = self.validate_document(document, query_id, operation_name)
+        defaults = dict(document=document, operation_name=operation_name)
+        return self.update_or_create(id=document_hash, defaults=defaults)[0]
+
+    def validate_document(self, document: str, query_id: Optional[str] = None, operation_name: str = '') -> str:
+        """
+        Validate document against schema and provided sha256 hash, return the hash or raise ValueError
+        """
+        from cinemanio.schema import schema
+
+        document_hash = sha256(document.encode('utf-8')).hexdigest()
+        if query_id and query_id != document_hash:
+            raise ValueError(f"Provided sha256 hash {query_id} does not match the document")
+
+        try:
+            errors = validate(schema, parse(document))
+        except GraphQLSyntaxError as e:
+            errors = [e]
+        if errors:
+            raise ValueError(f"Document {operation_name or document_hash} is invalid: "
+                             + '; '.join(str(error) for error in errors))
+        return document_hash
+
+
+class PersistedQuery(models.Model):
+    """
+    GraphQL document registered to be executed by sha256 hash of its text
+    """
+    id = models.CharField(_('SHA256 hash'), max_length=64, primary_key=True)
+    document = models.TextField(_('Document'))
+    operation_name = models.CharField(_('Operation name'), max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(_('Created at'), auto_now_add=True)
+
+    objects = PersistedQueryManager()
+
+    class Meta:
+        verbose_name = _('persisted query')
+        verbose_name_plural = _('persisted queries')
+
+    def __repr__(self):
+        return f'{self.operation_name or "Anonymous"} ({self.id})'
+
+    def __str__(self):
+        return repr(self)
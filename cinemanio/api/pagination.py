@@ -0,0 +1,88 @@
+from typing import Optional, Tuple
+
+from cursor_pagination import CursorPaginator, InvalidCursor
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import OrderBy
+
+KEYSET_VALUE = 'keyset_value'
+
+
+def get_keyset_ordering(queryset) -> Tuple[Optional[str], bool]:
+    """
+    Return sort key and direction of queryset ordered by OrderingWithNullsFilter, sort key is None for unordered
+    """
+    if getattr(queryset, 'search_term', None) is not None or getattr(queryset, 'search_result_ids', None):
+        raise ValueError("Keyset pagination is not available for search results ordered by relevance")
+    order_by = queryset.query.order_by
+    if not order_by:
+        return None, False
+    if len(order_by) == 1 and isinstance(order_by[0], OrderBy) and isinstance(order_by[0].expression, F):
+        return order_by[0].expression.name, order_by[0].descending
+    raise ValueError("Keyset pagination is available only for ordering by one field")
+
+
+class KeysetPaginator(CursorPaginator):
+    """
+    Paginator by stable (sort key, id) cursor: rows after cursor are filtered instead of skipped by OFFSET,
+    so every page costs the same. Nulls of sort key go first in ascending order and last in descending one,
+    the same way as OrderingWithNullsFilter orders them
+    """
+
+    def __init__(self, queryset, key: Optional[str] = None, descending: bool = False):
+        self.key = key
+        self.descending = descending
+        prefix = '-' if descending else ''
+        super().__init__(queryset, ([f'{prefix}{key}'] if key else []) + [f'{prefix}pk'])
+        if key:
+            ordering = F(key).desc(nulls_last=True) if descending else F(key).asc(nulls_first=True)
+            self.queryset = queryset.annotate(**{KEYSET_VALUE: F(key)}).order_by(ordering, f'{prefix}pk')
+
+    def page(self, first=None, last=None, after=None, before=None):
+        if last is not None or before is not None:
+            raise ValueError("Keyset pagination supports only first and after arguments")
+        try:
+            return super().page(first=first, after=after)
+        except InvalidCursor:
+            raise ValueError(f"Invalid cursor {after}")
+
+    def position_from_instance(self, instance):
+        values = [getattr(instance, KEYSET_VALUE)] if self.key else []
+        return ['' if value is None else str(value) for value in values + [instance.pk]]
+
+    def decode_position(self, cursor):
+        position = self.decode_cursor(cursor)
+        if len(position) != len(self.ordering):
+            raise InvalidCursor(self.invalid_cursor_message)
+        fields = ([self.get_field(self.key)] if self.key else []) + [self.queryset.model._meta.pk]
+        try:
+            return [None if value == '' else field.to_python(value) for field, value in zip(fields, position)]
+        except ValidationError:
+            raise InvalidCursor(self.invalid_cursor_message)
+
+    def get_field(self, path: str):
+        model = self.queryset.model
+        *relations, name = path.split(LOOKUP_SEP)
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+    def apply_cursor(self, cursor, queryset, reverse=False):
+        *values, pk = self.decode_position(cursor)
+        after = 'lt' if self.descending else 'gt'
+        pk_after = Q(**{f'pk__{after}': pk})
+        if not self.key:
+            return queryset.filter(pk_after)
+
+        value = values[0]
+        is_null = Q(**{f'{self.key}__isnull': True})
+        if value is None:
+            condition = is_null & pk_after
+            if not self.descending:
+                condition |= ~is_null
+        else:
+            condition = Q(**{f'{self.key}__{after}': value}) | Q(**{self.key: value}) & pk_after
+            if self.descending:
+                condition |= is_null
+        return queryset.filter(condition)
@@ -0,0 +1,57 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from typing import Any, Callable, Hashable, Tuple  # noqa
+
+from django.conf import settings
+
+from cinemanio.api.backend import CacheInfo
+
+QueryPlan = namedtuple('QueryPlan', ['fields', 'select_related', 'prefetch_related', 'only'])
+
+
+class QueryPlanCache:
+    """
+    Bounded LRU cache of query plans: select_related, prefetch_related and only arguments of node querysets,
+    derived from selections of the field. Plans are keyed by node and AST of the field, so plans are reused
+    while document is kept in the cache of cinemanio.api.backend.LRUCachedBackend
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize if maxsize is not None else settings.GRAPHQL_QUERY_PLAN_CACHE_SIZE
+        self.cache = OrderedDict()  # type: OrderedDict[Hashable, QueryPlan]
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(self, key: Tuple[Any, ...], factory: Callable[[], QueryPlan]) -> QueryPlan:
+        """
+        Return plan by key, create it using factory if it's not there yet.
+        Key holds AST node of the field, so id of the node is never reused by another node while plan is cached
+        """
+        with self.lock:
+            plan = self.cache.get(key)
+            if plan is not None:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return plan
+            self.misses += 1
+
+        plan = factory()
+
+        with self.lock:
+            self.cache[key] = plan
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return plan
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.cache))
+
+    def cache_clear(self) -> None:
+        with self.lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+query_plans = QueryPlanCache()
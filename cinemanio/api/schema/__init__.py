@@ -1,3 +1,4 @@
+from cinemanio.api.schema.autocomplete import AutocompleteQuery
 from cinemanio.api.schema.movie import MovieQuery
 from cinemanio.api.schema.person import PersonQuery
 from cinemanio.api.schema.user import UserQuery
@@ -10,7 +11,7 @@ from cinemanio.api.schema.imdb import ImdbMovieNode, ImdbPersonNode  # noqa
 from cinemanio.api.schema.kinopoisk import KinopoiskMovieNode, KinopoiskPersonNode  # noqa
 
 
-class Query(MovieQuery, PersonQuery, PropertiesQuery, UserQuery):
+class Query(MovieQuery, PersonQuery, PropertiesQuery, UserQuery, AutocompleteQuery):
     pass
 
 
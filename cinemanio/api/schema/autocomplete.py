@@ -0,0 +1,31 @@
+import graphene
+from django.conf import settings
+
+from cinemanio.api.autocomplete import autocomplete
+from cinemanio.api.schema.movie import MovieNode
+from cinemanio.api.schema.person import PersonNode
+
+
+class AutocompleteKind(graphene.Enum):
+    MOVIE = 'movie'
+    PERSON = 'person'
+
+
+class AutocompleteNode(graphene.Union):
+    class Meta:
+        types = (MovieNode, PersonNode)
+
+
+class AutocompleteQuery:
+    autocomplete = graphene.List(AutocompleteNode, prefix=graphene.String(required=True), kind=AutocompleteKind(),
+                                 first=graphene.Int())
+
+    def resolve_autocomplete(self, info, prefix, kind=None, first=None):
+        """
+        Return the most popular movies and persons with title or name starting with prefix in any language
+        or alphabet, served from in-memory prefix index, see cinemanio.api.autocomplete
+        """
+        if first is not None and not 0 < first <= settings.AUTOCOMPLETE['MAX_RESULTS_LIMIT']:
+            raise ValueError(f"Argument first should be between 1 and {settings.AUTOCOMPLETE['MAX_RESULTS_LIMIT']}")
+        nodes = [node for node in (MovieNode, PersonNode) if kind is None or node._meta.model._meta.model_name == kind]
+        return autocomplete.search(prefix, [node._meta.model for node in nodes], first)
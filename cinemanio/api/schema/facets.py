@@ -0,0 +1,74 @@
+import graphene
+
+from cinemanio.api.facets import get_facets
+from cinemanio.api.schema.properties import CountryNode, GenreNode, LanguageNode
+from cinemanio.api.utils import CountableConnectionBase
+from cinemanio.core.models import Country, Genre, Language
+
+
+class GenreFacet(graphene.ObjectType):
+    genre = graphene.Field(GenreNode)
+    count = graphene.Int()
+
+
+class CountryFacet(graphene.ObjectType):
+    country = graphene.Field(CountryNode)
+    count = graphene.Int()
+
+
+class LanguageFacet(graphene.ObjectType):
+    language = graphene.Field(LanguageNode)
+    count = graphene.Int()
+
+
+class DecadeFacet(graphene.ObjectType):
+    decade = graphene.Int()
+    count = graphene.Int()
+
+
+def get_property_facet(facet, model, facet_type):
+    """
+    Return facet items with property objects loaded by one query
+    """
+    objects = model.objects.in_bulk([value for value, _ in facet])
+    return [facet_type(count=count, **{model._meta.model_name: objects[value]})
+            for value, count in facet if value in objects]
+
+
+class MovieFacets(graphene.ObjectType):
+    """
+    Amounts of movies of connection by values of properties, computed together and cached, see cinemanio.api.facets
+    """
+    genres = graphene.List(GenreFacet)
+    countries = graphene.List(CountryFacet)
+    languages = graphene.List(LanguageFacet)
+    decades = graphene.List(DecadeFacet)
+
+    def resolve_genres(self, info):
+        return get_property_facet(self['genres'], Genre, GenreFacet)
+
+    def resolve_countries(self, info):
+        return get_property_facet(self['countries'], Country, CountryFacet)
+
+    def resolve_languages(self, info):
+        return get_property_facet(self['languages'], Language, LanguageFacet)
+
+    def resolve_decades(self, info):
+        return [DecadeFacet(decade=decade, count=count) for decade, count in self['decades']]
+
+
+class MovieConnection(CountableConnectionBase):
+    """
+    Connection of movies with facets of all movies of connection
+    """
+
+    class Meta:
+        abstract = True
+
+    facets = graphene.Field(MovieFacets)
+
+    def resolve_facets(self, _):
+        if isinstance(self.iterable, list):
+            # nested connections resolved by loaders
+            return None
+        return get_facets(self.iterable)
@@ -1,35 +1,64 @@
-from graphene import String
+from graphene import Boolean, String
 from graphene_django import DjangoObjectType
+from promise import Promise
+from promise.dataloader import DataLoader
 
+from cinemanio.api.loaders import get_loader
 from cinemanio.api.utils import DjangoObjectTypeMixin
-from cinemanio.images.models import Image, ImageLink
+from cinemanio.images.models import Image, ImageLink, Thumbnail, ThumbnailFormat
+from cinemanio.images.tasks import schedule_thumbnails
+
+
+class ThumbnailLoader(DataLoader):
+    """
+    Load URLs of thumbnails by (image id, size, format) keys from thumbnails manifest using one query.
+    Generation of missing thumbnails is scheduled in background, URLs of them are None until then
+    """
+
+    def batch_load_fn(self, keys):  # pylint: disable=method-hidden
+        urls = {(image_id, size, thumbnail_format): url
+                for image_id, size, thumbnail_format, url in Thumbnail.objects.filter(
+                    image_id__in={image_id for image_id, _, _ in keys},
+                    size__in={size for _, size, _ in keys}).values_list('image_id', 'size', 'format', 'url')}
+        missing = {key[0] for key in keys if key not in urls}
+        if missing:
+            schedule_thumbnails(missing)
+        return Promise.resolve([urls.get(key) for key in keys])
 
 
 class ImageNode(DjangoObjectTypeMixin, DjangoObjectType):
-    full_card = String()
-    short_card = String()
-    detail = String()
-    icon = String()
+    full_card = String(webp=Boolean(default_value=False))
+    short_card = String(webp=Boolean(default_value=False))
+    detail = String(webp=Boolean(default_value=False))
+    icon = String(webp=Boolean(default_value=False))
 
     class Meta:
         model = Image
-        only_fields = ('type', 'original')
+        only_fields = ('type', 'original', 'blurhash', 'color')
         use_connection = True
 
     def resolve_original(self, _, **__):
         return self.original.url
 
-    def resolve_full_card(self, _, **__):
-        return self.get_thumbnail(*Image.FULL_CARD_SIZE).url
+    def resolve_full_card(self, info, webp=False, **_):
+        return ImageNode.load_thumbnail(self, info, Image.FULL_CARD_SIZE, webp)
+
+    def resolve_short_card(self, info, webp=False, **_):
+        return ImageNode.load_thumbnail(self, info, Image.SHORT_CARD_SIZE, webp)
 
-    def resolve_short_card(self, _, **__):
-        return self.get_thumbnail(*Image.SHORT_CARD_SIZE).url
+    def resolve_detail(self, info, webp=False, **_):
+        return ImageNode.load_thumbnail(self, info, Image.DETAIL_SIZE, webp)
 
-    def resolve_detail(self, _, **__):
-        return self.get_thumbnail(*Image.DETAIL_SIZE).url
+    def resolve_icon(self, info, webp=False, **_):
+        return ImageNode.load_thumbnail(self, info, Image.ICON_SIZE, webp)
 
-    def resolve_icon(self, _, **__):
-        return self.get_thumbnail(*Image.ICON_SIZE).url
+    def load_thumbnail(self, info, size, webp=False):
+        """
+        Load URL of thumbnail in JPEG or WebP format using one query for all images of the request
+        """
+        thumbnail_format = ThumbnailFormat.WEBP if webp else ThumbnailFormat.JPEG
+        return get_loader(info, 'thumbnails', ThumbnailLoader, shared=True).load(
+            (self.pk, Image.get_size(*size), thumbnail_format))
 
 
 class ImageLinkNode(DjangoObjectTypeMixin, DjangoObjectType):
@@ -35,14 +35,10 @@ class RelationsMixin:
         if not user or not user.is_authenticated:
             return queryset
 
-        selections = cls.get_selections(info)
-        fields_to_select = cls.convert_selections_to_fields(selections, info)
-
-        for field_to_select in fields_to_select:
-            if field_to_select == 'relation':
-                model = cls._meta.model._meta.get_field('relations').related_model
-                queryset = queryset.prefetch_related(Prefetch(
-                    'relations', to_attr='user_relation_prefetched',
-                    queryset=model.objects.filter(user_id=user.id)))
+        if 'relation' in cls.get_query_plan(info, kwargs.get('columns', ())).fields:
+            model = cls._meta.model._meta.get_field('relations').related_model
+            queryset = queryset.prefetch_related(Prefetch(
+                'relations', to_attr='user_relation_prefetched',
+                queryset=model.objects.filter(user_id=user.id)))
 
         return queryset
@@ -2,15 +2,16 @@ import graphene
 from graphene import relay, Field
 from graphene_django import DjangoObjectType
 
+from cinemanio.api.loaders import load_related
 from cinemanio.api.schema.mixins import ImagesMixin, RelationsMixin, WikipediaMixin
 from cinemanio.api.schema.cast import CastNode
+from cinemanio.api.schema.facets import MovieConnection
 from cinemanio.api.filtersets import MovieFilterSet
 from cinemanio.api.utils import (DjangoObjectTypeMixin, DjangoFilterConnectionField,
-                                 DjangoFilterConnectionSearchableField, CountableConnectionBase)
+                                 DjangoFilterConnectionSearchableField)
 from cinemanio.api.schema.image import ImageNode
 from cinemanio.core.models import Movie
 from cinemanio.core.utils.languages import translated_fields
-from cinemanio.images.models import ImageType
 
 
 class MovieNode(RelationsMixin, DjangoObjectTypeMixin, DjangoObjectType, ImagesMixin, WikipediaMixin):
@@ -28,13 +29,10 @@ class MovieNode(RelationsMixin, DjangoObjectTypeMixin, DjangoObjectType, ImagesM
             'imdb', 'kinopoisk',
         )
         interfaces = (relay.Node,)
-        connection_class = CountableConnectionBase
+        connection_class = MovieConnection
 
-    def resolve_cast(self, info, **_):
-        return CastNode.get_queryset(info).filter(movie=self)
-
-    def resolve_poster(self, _, **__):
-        return MovieNode.get_random_image(self, ImageType.POSTER)
+    def resolve_cast(self, info, **kwargs):
+        return load_related(info, CastNode, 'movie_id', self.pk, **kwargs)
 
 
 class MovieQuery:
@@ -1,6 +1,7 @@
 from graphene import relay, String, Field
 from graphene_django import DjangoObjectType
 
+from cinemanio.api.loaders import load_related
 from cinemanio.api.schema.mixins import ImagesMixin, RelationsMixin, WikipediaMixin
 from cinemanio.api.schema.cast import CastNode
 from cinemanio.api.filtersets import PersonFilterSet
@@ -9,7 +10,6 @@ from cinemanio.api.utils import (DjangoObjectTypeMixin, DjangoFilterConnectionFi
 from cinemanio.api.schema.image import ImageNode
 from cinemanio.core.models import Person
 from cinemanio.core.utils.languages import translated_fields
-from cinemanio.images.models import ImageType
 
 
 class PersonNode(RelationsMixin, DjangoObjectTypeMixin, DjangoObjectType, ImagesMixin, WikipediaMixin):
@@ -19,6 +19,12 @@ class PersonNode(RelationsMixin, DjangoObjectTypeMixin, DjangoObjectType, Images
     name_en = String()
     name_ru = String()
 
+    field_columns = {
+        'name': translated_fields('first_name', 'last_name', with_base=True),
+        'name_en': ('first_name_en', 'last_name_en'),
+        'name_ru': ('first_name_ru', 'last_name_ru'),
+    }
+
     class Meta:
         model = Person
         only_fields = translated_fields('first_name', 'last_name') + (
@@ -30,11 +36,8 @@ class PersonNode(RelationsMixin, DjangoObjectTypeMixin, DjangoObjectType, Images
         interfaces = (relay.Node,)
         connection_class = CountableConnectionBase
 
-    def resolve_career(self, info, **_):
-        return CastNode.get_queryset(info).filter(person=self)
-
-    def resolve_photo(self, _, **__):
-        return PersonNode.get_random_image(self, ImageType.PHOTO)
+    def resolve_career(self, info, **kwargs):
+        return load_related(info, CastNode, 'person_id', self.pk, **kwargs)
 
 
 class PersonQuery:
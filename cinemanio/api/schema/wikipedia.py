@@ -8,6 +8,10 @@ from cinemanio.sites.wikipedia.models import WikipediaPage
 class WikipediaPageNode(DjangoObjectTypeMixin, DjangoObjectType):
     url = String()
 
+    field_columns = {
+        'url': ('title', 'lang'),
+    }
+
     class Meta:
         model = WikipediaPage
         filter_fields = ('lang',)
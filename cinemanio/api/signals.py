@@ -0,0 +1,133 @@
+from typing import List
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from cinemanio.api import autocomplete, bitmaps
+from cinemanio.api.cache import TAGS, invalidate
+from cinemanio.core.models import Movie, Person, Cast
+from cinemanio.images.models import ImageLink
+from cinemanio.images.signals import placeholders_generated, thumbnails_generated
+from cinemanio.relations.models import MovieRelationCount, PersonRelationCount
+from cinemanio.sites.signals import site_synced, site_imported
+from cinemanio.sites.wikipedia.models import WikipediaPage
+
+
+def get_tags(instance) -> List[str]:
+    """
+    Return tags of cached responses depending on instance: movie, person or both
+    """
+    if isinstance(instance, (Movie, Person)):
+        return [instance._meta.model_name]
+    if hasattr(instance, 'content_type_id'):
+        return [tag for tag in TAGS if tag == ContentType.objects.get_for_id(instance.content_type_id).model]
+    return [tag for tag in TAGS if hasattr(instance, f'{tag}_id')]
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_save, sender=Person)
+@receiver(post_save, sender=Cast)
+@receiver(post_save, sender=ImageLink)
+@receiver(post_save, sender=WikipediaPage)
+@receiver(post_delete, sender=Movie)
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=Cast)
+@receiver(post_delete, sender=ImageLink)
+@receiver(post_delete, sender=WikipediaPage)
+@receiver(site_synced)
+def invalidate_response_cache_signal(instance, **_):
+    """
+    Invalidate cached GraphQL responses depending on changed instance after commit,
+    so responses aren't cached again from not committed data under new versions of tags
+    """
+    tags = get_tags(instance)
+    if tags:
+        transaction.on_commit(lambda: invalidate(*tags))
+
+
+@receiver(site_imported)
+def invalidate_imported_signal(models, **_):
+    """
+    Invalidate cached GraphQL responses and structures of workers after bulk import of models, after commit,
+    so responses aren't cached again from not committed data
+    """
+    tags = [model._meta.model_name for model in models]
+
+    def invalidate_imported():
+        invalidate(*tags)
+        autocomplete.autocomplete.changes.reset()
+        bitmaps.bitmap_index.changes.reset()
+
+    transaction.on_commit(invalidate_imported)
+
+
+@receiver([thumbnails_generated, placeholders_generated])
+def invalidate_response_cache_thumbnails_signal(image_ids, **_):
+    """
+    Invalidate cached GraphQL responses of objects linked to images, they could miss URLs of generated thumbnails
+    or placeholders
+    """
+    content_type_ids = ImageLink.objects.filter(image_id__in=image_ids).order_by() \
+        .values_list('content_type_id', flat=True).distinct()
+    models = {ContentType.objects.get_for_id(content_type_id).model for content_type_id in content_type_ids}
+    tags = [tag for tag in TAGS if tag in models]
+    if tags:
+        invalidate(*tags)
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Movie)
+@receiver(post_delete, sender=Person)
+def update_autocomplete_signal(sender, instance, **_):
+    """
+    Notify workers about changed title or name, after commit, so they reload committed object
+    """
+    transaction.on_commit(lambda: autocomplete.notify_changed(sender, instance.pk))
+
+
+@receiver(post_save, sender=MovieRelationCount)
+@receiver(post_save, sender=PersonRelationCount)
+def update_autocomplete_popularity_signal(sender, instance, **_):
+    """
+    Notify workers about changed popularity of movie or person
+    """
+    model = sender._meta.get_field('object').related_model
+    transaction.on_commit(lambda: autocomplete.notify_changed(model, instance.object_id))
+
+
+def get_bitmap_fields_by_through():
+    return {Movie._meta.get_field(field).remote_field.through: field for field in bitmaps.FIELDS}
+
+
+def update_bitmaps_signal(sender, instance, action, reverse, pk_set, **_):
+    """
+    Notify workers about changed genres, countries or languages of movies, after commit
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear' if reverse else 'post_clear'):
+        return
+    field = get_bitmap_fields_by_through()[sender]
+    if not reverse:
+        pks = [instance.pk]
+    elif action == 'pre_clear':
+        # movies losing the value are known only before clear, unknown movies would make workers rebuild bitmaps
+        pks = list(sender.objects.filter(**{Movie._meta.get_field(field).m2m_reverse_field_name(): instance.pk})
+                   .values_list('movie_id', flat=True))
+    else:
+        pks = list(pk_set)
+    transaction.on_commit(lambda: [bitmaps.notify_changed(field, pk) for pk in pks])
+
+
+for through in get_bitmap_fields_by_through():
+    m2m_changed.connect(update_bitmaps_signal, sender=through)
+
+
+@receiver(post_delete, sender=Movie)
+def update_bitmaps_movie_deleted_signal(instance, **_):
+    """
+    Notify workers about deleted movie, rows of many to many fields are deleted without m2m_changed signal
+    """
+    pk = instance.pk
+    transaction.on_commit(lambda: [bitmaps.notify_changed(field, pk) for field in bitmaps.FIELDS])
@@ -0,0 +1,10 @@
+from cinemanio.api.bitmaps import bitmap_index
+from cinemanio.celery import app
+
+
+@app.task
+def build_bitmap_index():
+    """
+    Build snapshot of bitmaps of movies for all workers, scheduled by workers when they are unable to sync bitmaps
+    """
+    bitmap_index.build()
@@ -1,10 +1,20 @@
 from .auth import AuthTestCase
+from .autocomplete import AutocompleteTestCase
+from .backend import BackendTestCase
+from .bitmaps import BitmapIndexTestCase
+from .cache import ResponseCacheTestCase
+from .cost import QueryCostTestCase
+from .facets import FacetsQueryTestCase
 from .images import ImagesQueryTestCase
+from .loaders import LoadersQueryTestCase
 from .movie import MovieQueryTestCase
 from .movies import MoviesQueryTestCase
 from .pagination import PaginationQueryTestCase
+from .persisted import PersistedQueriesTestCase
+from .plans import QueryPlansTestCase
 from .person import PersonQueryTestCase
 from .persons import PersonsQueryTestCase
+from .projection import ColumnProjectionTestCase
 from .properties import PropertiesQueryTestCase
 from .register import (
     RegisterUserTestCase, ActivateUserTestCase, ResetPasswordRequestTestCase, ResetPasswordTestCase,
@@ -25,9 +35,19 @@ __all__ = [
     'RelationsQueryTestCase',
     'PaginationQueryTestCase',
     'ImagesQueryTestCase',
+    'LoadersQueryTestCase',
     'WikipediaQueryTestCase',
     'SearchQueryTestCase',
+    'PersistedQueriesTestCase',
     'AuthTestCase',
+    'AutocompleteTestCase',
+    'BackendTestCase',
+    'BitmapIndexTestCase',
+    'ResponseCacheTestCase',
+    'QueryCostTestCase',
+    'FacetsQueryTestCase',
+    'ColumnProjectionTestCase',
+    'QueryPlansTestCase',
     'UserQueryTestCase',
     # register
     'RegisterUserTestCase',
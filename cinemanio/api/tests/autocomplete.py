@@ -0,0 +1,113 @@
+from unittest import mock
+
+from cinemanio.api.autocomplete import PrefixIndex, autocomplete, get_keys, notify_changed
+from cinemanio.api.cache import get_cache
+from cinemanio.api.helpers import global_id
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import MovieFactory, PersonFactory
+from cinemanio.core.models import Movie
+from cinemanio.relations.factories import MovieRelationCountFactory, PersonRelationCountFactory
+
+
+class AutocompleteTestCase(QueryBaseTestCase):
+    query = '''
+        query Autocomplete($prefix: String!, $kind: AutocompleteKind, $first: Int) {
+          autocomplete(prefix: $prefix, kind: $kind, first: $first) {
+            __typename
+            ... on MovieNode { id }
+            ... on PersonNode { id }
+          }
+        }
+    '''
+
+    def setUp(self):
+        super().setUp()
+        # forget indexes built by previous tests
+        autocomplete.clear()
+
+    def create_movie(self, popularity, **kwargs):
+        return MovieRelationCountFactory(object=MovieFactory(title='', title_original='', **kwargs),
+                                         fav=popularity).object
+
+    def get_ids(self, **values):
+        return [item['id'] for item in self.execute(self.query, values)['autocomplete']]
+
+    def test_autocomplete_query(self):
+        m1 = self.create_movie(10, title_en='The Godfather', title_ru='Крестный отец')
+        m2 = self.create_movie(20, title_en='The Godfather Part II', title_ru='Крестный отец 2')
+        self.create_movie(30, title_en='Apocalypse Now', title_ru='Апокалипсис сегодня')
+        p = PersonRelationCountFactory(object=PersonFactory(first_name_en='Francis', last_name_en='Godfrey'),
+                                       fav=15).object
+
+        with self.assertNumQueries(4):
+            self.assertEqual(self.get_ids(prefix='godf'), [global_id(m2), global_id(p), global_id(m1)])
+        # indexes are built once, only found objects are loaded
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_ids(prefix='The Godf', kind='MOVIE'), [global_id(m2), global_id(m1)])
+        self.assertEqual(self.get_ids(prefix='Крестный отец 2'), [global_id(m2)])
+        self.assertEqual(self.get_ids(prefix='krestnyi', first=1), [global_id(m2)])
+        self.assertEqual(self.get_ids(prefix='годфр'), [global_id(p)])
+        self.assertEqual(self.get_ids(prefix='godfather', kind='PERSON'), [])
+        self.assertEqual(self.get_ids(prefix=' '), [])
+        # too short prefix
+        self.assertEqual(self.get_ids(prefix='go'), [])
+
+    def test_autocomplete_query_wrong_first(self):
+        result = self._execute(self.query, dict(prefix='godf', first=1000))
+        self.assertIn('Argument first should be between', str(result.errors[0]))
+
+    @mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+    def test_changes_applied_incrementally(self, _):
+        m1 = self.create_movie(10, title_en='The Godfather')
+        self.assertEqual(self.get_ids(prefix='godf'), [global_id(m1)])
+
+        m2 = self.create_movie(20, title_en='Godfather')
+        m1.title_en = 'Apocalypse Now'
+        m1.save()
+        with mock.patch.object(autocomplete, 'build') as build:
+            self.assertEqual(self.get_ids(prefix='godf'), [global_id(m2)])
+            self.assertEqual(self.get_ids(prefix='apoc'), [global_id(m1)])
+            m2.delete()
+            self.assertEqual(self.get_ids(prefix='godf'), [])
+        build.assert_not_called()
+
+    @mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+    def test_expired_changes_rebuild_indexes(self, _):
+        self.assertEqual(self.get_ids(prefix='godf'), [])
+        m = MovieFactory(title_en='Godfather')
+        get_cache().delete(autocomplete.changes.change_key.format(autocomplete.version + 1))
+        self.assertEqual(self.get_ids(prefix='godf'), [global_id(m)])
+
+    def test_notify_changed(self):
+        autocomplete.search('godf')
+        version = autocomplete.version
+        notify_changed(Movie, 1)
+        self.assertEqual(autocomplete.changes.get_changes(version, version + 1), [('core.Movie', 1)])
+
+    def test_keys(self):
+        self.assertEqual(get_keys('\nthe godfather\nкрестныи отец\n'),
+                         {'the godfather', 'godfather', 'крестныи отец', 'отец'})
+
+    def test_prefix_index_evicts_least_popular(self):
+        index = PrefixIndex(memory_limit=PrefixIndex.get_size(get_keys('\ngodfather\n')) * 2)
+        self.assertTrue(index.add(1, '\ngodfather\n', 10))
+        self.assertTrue(index.add(2, '\ngodzilla\n', 5))
+        self.assertTrue(index.add(3, '\ngodspeed\n', 20))
+        self.assertEqual(index.search('god', 10), [(20, 3), (10, 1)])
+        self.assertFalse(index.add(4, '\ngodot\n', 1))
+        self.assertEqual(len(index), 2)
+        # replaced object
+        self.assertTrue(index.add(1, '\ngoodfellas\n', 30))
+        self.assertEqual(index.search('go', 10), [(30, 1), (20, 3)])
+        self.assertEqual(index.search('godf', 10), [])
+        index.remove(1)
+        self.assertEqual(index.keys, ['godspeed'])
+
+    def test_prefix_index_build(self):
+        index = PrefixIndex(memory_limit=PrefixIndex.get_size(get_keys('\ngodfather\n')) * 2)
+        index.build([(3, '\ngodspeed\n', 20), (4, '', 15), (1, '\ngodfather\n', 10), (2, '\ngodzilla\n', 5)])
+        self.assertEqual(index.keys, ['godfather', 'godspeed'])
+        self.assertEqual(index.search('god', 10), [(20, 3), (10, 1)])
+        # changes are applied to built index
+        self.assertTrue(index.add(2, '\ngodzilla\n', 30))
+        self.assertEqual(index.search('god', 10), [(30, 2), (20, 3)])
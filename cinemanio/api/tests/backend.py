@@ -0,0 +1,45 @@
+from cinemanio.api.backend import LRUCachedBackend, CacheInfo
+from cinemanio.api.helpers import global_id
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import MovieFactory
+
+
+class BackendTestCase(QueryBaseTestCase):
+    query = '''
+        query Movie($id: ID!) {
+          movie(id: $id) {
+            id
+          }
+        }
+    '''
+
+    def test_cache_hits_and_misses(self):
+        backend = LRUCachedBackend(maxsize=2)
+        m = MovieFactory()
+
+        for i in range(3):
+            result = self.execute(self.query, dict(id=global_id(m)), backend=backend)
+            self.assertEqual(result['movie']['id'], global_id(m))
+
+        self.assertEqual(backend.cache_info(), CacheInfo(hits=2, misses=1, maxsize=2, currsize=1))
+
+    def test_cache_evicts_least_recently_used(self):
+        backend = LRUCachedBackend(maxsize=2)
+        queries = [self.query, self.query.replace('id\n', 'id, year\n', 1), self.query.replace('id\n', 'year\n', 1)]
+
+        for query in [queries[0], queries[1], queries[0], queries[2], queries[0], queries[1]]:
+            self.execute(query, dict(id=global_id(MovieFactory())), backend=backend)
+
+        # queries[1] was evicted by queries[2] as the least recently used one
+        self.assertEqual(backend.cache_info(), CacheInfo(hits=2, misses=4, maxsize=2, currsize=2))
+
+    def test_cache_validation_errors(self):
+        backend = LRUCachedBackend(maxsize=2)
+        query = self.query.replace('id\n', 'wrongField\n', 1)
+
+        for i in range(2):
+            result = self.execute_with_errors(query, dict(id=global_id(MovieFactory())), backend=backend)
+            self.assertTrue(result.invalid)
+            self.assertIn('wrongField', str(result.errors[0]))
+
+        self.assertEqual(backend.cache_info(), CacheInfo(hits=1, misses=1, maxsize=2, currsize=1))
@@ -4,6 +4,8 @@ from typing import Dict
 from graphql_jwt.shortcuts import get_token, get_user_by_token
 from django.contrib.auth.models import AnonymousUser
 
+from cinemanio.api.bitmaps import bitmap_index
+from cinemanio.api.cache import get_cache
 from cinemanio.api.helpers import global_id
 from cinemanio.core.tests.base import BaseTestCase
 from cinemanio.users.models import User
@@ -31,6 +33,12 @@ class QueryBaseTestCase(BaseTestCase):
     user = None
     password = 'secret'
 
+    def setUp(self):
+        super().setUp()
+        # forget snapshot and bitmaps of movies of previous tests
+        get_cache().clear()
+        bitmap_index.clear()
+
     def get_context(self, user=None):
         kwargs = {}
         if user:
@@ -50,16 +58,17 @@ class QueryBaseTestCase(BaseTestCase):
         user.save()
         return user
 
-    def _execute(self, query, values=None, context=None):
-        return schema.execute(query, variable_values=values, context_value=context or self.get_context(self.user))
+    def _execute(self, query, values=None, context=None, **kwargs):
+        return schema.execute(query, variable_values=values, context_value=context or self.get_context(self.user),
+                              **kwargs)
 
-    def execute(self, query, values=None, context=None):
-        result = self._execute(query, values, context)
+    def execute(self, query, values=None, context=None, **kwargs):
+        result = self._execute(query, values, context, **kwargs)
         self.assertIsNone(result.errors, result.to_dict())
         return result.data
 
-    def execute_with_errors(self, query, values=None, context=None):
-        result = self._execute(query, values, context)
+    def execute_with_errors(self, query, values=None, context=None, **kwargs):
+        result = self._execute(query, values, context, **kwargs)
         self.assertIsNotNone(result.errors, result.data)
         return result
 
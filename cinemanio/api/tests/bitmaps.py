@@ -0,0 +1,140 @@
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from cinemanio.api.bitmaps import ARRAY_MAX, CHUNK_BITS, SNAPSHOT_KEY, Bitmap, bitmap_index
+from cinemanio.api.cache import get_cache
+from cinemanio.api.helpers import global_id
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import MovieFactory
+from cinemanio.core.models import Genre
+
+
+class BitmapIndexTestCase(QueryBaseTestCase):
+    query = '''
+        query Movies($genres: [ID!]) {
+          movies(genres: $genres) {
+            edges {
+              node {
+                id
+              }
+            }
+          }
+        }
+    '''
+
+    def setUp(self):
+        super().setUp()
+        self.drama, self.comedy, self.horror = Genre.objects.all()[:3]
+        self.m1 = MovieFactory(genres=[self.drama, self.comedy])
+        self.m2 = MovieFactory(genres=[self.drama])
+        self.m3 = MovieFactory(genres=[self.comedy, self.horror])
+
+    def get_ids(self, *genres):
+        result = self.execute(self.query, dict(genres=[global_id(genre) for genre in genres]))
+        return sorted(edge['node']['id'] for edge in result['movies']['edges'])
+
+    def assert_ids(self, genres, movies):
+        self.assertEqual(self.get_ids(*genres), sorted(global_id(movie) for movie in movies))
+
+    def test_bitmap(self):
+        dense = range(1 << CHUNK_BITS, (1 << CHUNK_BITS) + ARRAY_MAX + 10)
+        bitmap1 = Bitmap([1, 5, 100, *dense])
+        bitmap2 = Bitmap([5, 100, 200, *range(dense[0], dense[-1] + 10, 2)])
+        self.assertIsInstance(bitmap1.chunks[0], type(bitmap2.chunks[0]))
+        self.assertIsInstance(bitmap1.chunks[1], int)
+        self.assertEqual(len(bitmap1), 3 + len(dense))
+        self.assertIn(dense[5], bitmap1)
+        self.assertNotIn(2, bitmap1)
+        self.assertEqual(bitmap1.get_ranges(), [(1, 1), (5, 5), (100, 100), (dense[0], dense[-1])])
+
+        intersection = bitmap1 & bitmap2
+        self.assertEqual(list(intersection), [5, 100, *dense[::2]])
+        # intersection of dense chunks is compacted to array
+        self.assertNotIsInstance(intersection.chunks[1], int)
+
+        for pk in dense[ARRAY_MAX // 2:]:
+            bitmap1.discard(pk)
+        bitmap1.discard(5)
+        bitmap1.discard(7)
+        self.assertEqual(list(bitmap1), [1, 100, *dense[:ARRAY_MAX // 2]])
+        self.assertNotIsInstance(bitmap1.chunks[1], int)
+
+    def test_filter_by_intersection(self):
+        bitmap_index.build()
+        # movies are filtered by ids of intersection without joins
+        with self.assertNumQueries(2):
+            self.assert_ids([self.drama, self.comedy], [self.m1])
+        # only genres are validated for empty intersection
+        with self.assertNumQueries(1):
+            self.assert_ids([self.drama, self.horror], [])
+        self.assert_ids([self.comedy], [self.m1, self.m3])
+
+    @override_settings(BITMAP_INDEX={**settings.BITMAP_INDEX, 'MAX_IDS': 1})
+    def test_filter_by_ranges_of_ids(self):
+        bitmap_index.build()
+        through_table = self.m1.genres.through._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            self.assert_ids([self.drama], [self.m1, self.m2])
+        # contiguous ids are filtered by range without joins
+        self.assertIn('BETWEEN', queries[-1]['sql'])
+        self.assertNotIn(through_table, queries[-1]['sql'])
+        with CaptureQueriesContext(connection) as queries:
+            self.assert_ids([self.comedy], [self.m1, self.m3])
+        self.assertNotIn(through_table, queries[-1]['sql'])
+
+    def test_fall_back_to_joins_until_built(self):
+        with mock.patch('cinemanio.api.tasks.build_bitmap_index.delay') as delay:
+            with self.assertNumQueries(2):
+                self.assert_ids([self.drama, self.comedy], [self.m1])
+            self.assert_ids([self.comedy], [self.m1, self.m3])
+        # building is scheduled once for all workers
+        delay.assert_called_once_with()
+        self.assertIsNone(get_cache().get(SNAPSHOT_KEY))
+
+        call_command('build_bitmap_index', stdout=StringIO())
+        with self.assertNumQueries(2):
+            self.assert_ids([self.drama, self.comedy], [self.m1])
+
+    def test_snapshot(self):
+        bitmap_index.build()
+        self.assertEqual(get_cache().get(SNAPSHOT_KEY)[1]['genres'][self.drama.id], Bitmap([self.m1.id, self.m2.id]))
+        bitmap_index.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(list(bitmap_index.get_ids('genres', [self.drama.id])), [self.m1.id, self.m2.id])
+
+    @mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+    def test_changes_applied_incrementally(self, _):
+        bitmap_index.build()
+        self.assert_ids([self.drama], [self.m1, self.m2])
+        with mock.patch.object(bitmap_index, 'schedule_build') as schedule_build:
+            self.m3.genres.add(self.drama)
+            self.assert_ids([self.drama], [self.m1, self.m2, self.m3])
+            self.m1.genres.remove(self.drama)
+            self.assert_ids([self.drama, self.comedy], [self.m3])
+            self.horror.movies.add(self.m2)
+            self.assert_ids([self.horror], [self.m2, self.m3])
+            self.comedy.movies.clear()
+            self.assert_ids([self.comedy], [])
+            self.m2.delete()
+            self.assert_ids([self.drama], [self.m3])
+        schedule_build.assert_not_called()
+
+    @mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+    def test_expired_changes_rebuild_bitmaps(self, _):
+        bitmap_index.build()
+        self.assert_ids([self.horror], [self.m3])
+        self.m1.genres.add(self.horror)
+        get_cache().delete(bitmap_index.changes.change_key.format(bitmap_index.version + 1))
+        # results are found by joins while snapshot is rebuilt by task
+        with mock.patch('cinemanio.api.tasks.build_bitmap_index.delay') as delay:
+            self.assert_ids([self.horror], [self.m1, self.m3])
+        delay.assert_called_once_with()
+        bitmap_index.build()
+        with self.assertNumQueries(2):
+            self.assert_ids([self.horror], [self.m1, self.m3])
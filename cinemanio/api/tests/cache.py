@@ -0,0 +1,135 @@
+import json
+from unittest import mock
+
+from django.utils import translation
+from graphql_jwt.shortcuts import get_token
+from parameterized import parameterized
+
+from cinemanio.api import cache
+from cinemanio.api.helpers import global_id
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import MovieFactory, CastFactory, PersonFactory
+from cinemanio.core.models import Movie
+from cinemanio.images.factories import ImageFactory, ImageLinkFactory
+from cinemanio.images.models import ImageLink
+from cinemanio.images.tasks import generate_thumbnails
+from cinemanio.sites.imdb.factories import ImdbMovieFactory
+from cinemanio.sites.models import SitesBaseModel
+from cinemanio.sites.wikipedia.factories import WikipediaPageFactory
+
+
+def save_synced(instance):
+    SitesBaseModel.sync(instance)
+    with mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func()):
+        instance.save()
+
+
+def link_image(instance):
+    # without signals
+    image = ImageFactory()
+    ImageLink.objects.bulk_create([ImageLink(image=image, object=instance)])
+    return image
+
+
+class ResponseCacheTestCase(QueryBaseTestCase):
+    query = '''
+        query Movie($id: ID!) {
+          movie(id: $id) {
+            titleEn
+          }
+        }
+    '''
+
+    def setUp(self):
+        super().setUp()
+        cache.get_cache().clear()
+        self.movie = MovieFactory(title_en='Title')
+
+    def request(self, query=None, **headers):
+        data = dict(query=query or self.query, variables=dict(id=global_id(self.movie)))
+        response = self.client.post('/graphql/', json.dumps(data), content_type='application/json', **headers)
+        return json.loads(response.content)
+
+    def get_title(self, **headers):
+        return self.request(**headers)['data']['movie']['titleEn']
+
+    def update_title(self):
+        # update without signals
+        Movie.objects.filter(id=self.movie.id).update(title_en='New title')
+
+    def test_anonymous_response_cached(self):
+        self.assertEqual(self.get_title(), 'Title')
+        self.update_title()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_title(), 'Title')
+
+    def test_response_key(self):
+        key = cache.get_response_key(self.query, dict(id=1), None)
+        self.assertEqual(key, cache.get_response_key(self.query, dict(id=1), None))
+        self.assertNotEqual(key, cache.get_response_key(self.query, dict(id=2), None))
+        self.assertNotEqual(key, cache.get_response_key(self.query, dict(id=1), 'Movie'))
+        with translation.override('ru'):
+            self.assertNotEqual(key, cache.get_response_key(self.query, dict(id=1), None))
+        cache.invalidate('person')
+        self.assertNotEqual(key, cache.get_response_key(self.query, dict(id=1), None))
+
+    def test_authorized_response_not_cached(self):
+        user = self.create_user()
+        headers = dict(HTTP_AUTHORIZATION=f'JWT {get_token(user)}')
+        self.assertEqual(self.get_title(**headers), 'Title')
+        self.update_title()
+        self.assertEqual(self.get_title(**headers), 'New title')
+
+    def test_response_with_errors_not_cached(self):
+        query = self.query.replace('titleEn', 'wrongField')
+        self.assertIn('errors', self.request(query))
+        self.assertEqual(cache.get_cache().get(cache.get_response_key(query, None, None)), None)
+
+    @parameterized.expand([
+        ('movie', lambda movie: movie.save()),
+        ('cast', lambda movie: CastFactory(movie=movie)),
+        ('image', lambda movie: ImageLinkFactory(object=movie)),
+        ('wikipedia', lambda movie: WikipediaPageFactory(content_object=movie)),
+        ('site sync', lambda movie: save_synced(ImdbMovieFactory(movie=movie))),
+        ('thumbnails', lambda movie: generate_thumbnails([link_image(movie).id])),
+    ])
+    @mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+    def test_response_invalidated(self, _, change, __):
+        self.assertEqual(self.get_title(), 'Title')
+        self.update_title()
+        self.movie.refresh_from_db()
+        versions = cache.get_tags_versions()
+        change(self.movie)
+        self.assertNotEqual(cache.get_tags_versions()['movie'], versions['movie'])
+        self.assertEqual(self.get_title(), 'New title')
+
+    def test_response_not_invalidated_before_commit(self):
+        versions = cache.get_tags_versions()
+        with mock.patch('django.db.transaction.on_commit') as on_commit:
+            self.movie.save()
+        self.assertEqual(cache.get_tags_versions(), versions)
+        with mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func()):
+            for args, _ in on_commit.call_args_list:
+                args[0]()
+        self.assertNotEqual(cache.get_tags_versions()['movie'], versions['movie'])
+
+    def test_response_not_invalidated_before_synced_instance_saved(self):
+        imdb_movie = ImdbMovieFactory(movie=self.movie)
+        versions = cache.get_tags_versions()
+        with mock.patch('django.db.transaction.on_commit') as on_commit:
+            SitesBaseModel.sync(imdb_movie)
+            self.assertEqual(cache.get_tags_versions(), versions)
+            imdb_movie.save()
+            imdb_movie.save()
+        # signal is sent once after commit
+        self.assertEqual(on_commit.call_count, 1)
+        with mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func()):
+            on_commit.call_args[0][0]()
+        self.assertNotEqual(cache.get_tags_versions()['movie'], versions['movie'])
+
+    def test_thumbnails_invalidate_responses_of_linked_objects(self):
+        versions = cache.get_tags_versions()
+        generate_thumbnails([link_image(PersonFactory()).id])
+        new_versions = cache.get_tags_versions()
+        self.assertEqual(new_versions['movie'], versions['movie'])
+        self.assertNotEqual(new_versions['person'], versions['person'])
@@ -0,0 +1,85 @@
+import json
+
+from django.conf import settings
+from django.test import override_settings
+from graphql import parse
+from parameterized import parameterized
+
+from cinemanio.api import cache
+from cinemanio.api.backend import LRUCachedBackend
+from cinemanio.api.cost import QueryCostAnalyzer
+from cinemanio.api.helpers import global_id
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import MovieFactory
+from cinemanio.schema import schema
+
+
+class QueryCostTestCase(QueryBaseTestCase):
+    movie_query = '''
+        query Movie($id: ID!) {
+          movie(id: $id) {
+            id
+            titleEn
+          }
+        }
+    '''
+    movies_query = '''
+        query Movies {
+          movies(first: 10) {
+            edges {
+              node {
+                id
+                cast(first: 5) {
+                  edges {
+                    node {
+                      person { id }
+                    }
+                  }
+                }
+              }
+            }
+          }
+        }
+    '''
+
+    def analyze(self, query, variables=None):
+        return QueryCostAnalyzer(schema, parse(query), variables).analyze()
+
+    @parameterized.expand([
+        (movie_query, None, 1, 1),
+        # movies + 10 * (edges + node + cast + 5 * (edges + node + person))
+        (movies_query, None, 181, 3),
+        ('query { movies(first: $first) { edges { node { id } } } }', dict(first=10), 21, 1),
+        ('query Movies($first: Int = 3) { movies(first: $first) { edges { node { id } } } }', None, 7, 1),
+        # negative list size
+        ('query { movies(first: -100) { edges { node { id } } } }', None, 1, 1),
+        # default list size
+        ('query { movies { edges { node { id } } } }', None, 201, 1),
+        # weights of thumbnails
+        ('query { movie(id: 1) { ...Poster } } fragment Poster on MovieNode { poster { shortCard icon } }',
+         None, 12, 2),
+        ('query { __schema { types { name } } }', None, 0, 0),
+    ])
+    def test_query_cost(self, query, variables, cost, depth):
+        self.assertEqual(self.analyze(query, variables), (cost, depth))
+
+    @parameterized.expand([
+        ('MAX_COST', 100, 'Query cost 181 exceeds maximum cost 100'),
+        ('MAX_DEPTH', 2, 'Query depth 3 exceeds maximum depth 2'),
+    ])
+    def test_query_rejected(self, option, value, message):
+        MovieFactory()
+        with override_settings(GRAPHQL_QUERY_COST=dict(settings.GRAPHQL_QUERY_COST, **{option: value})):
+            with self.assertNumQueries(0):
+                result = self.execute_with_errors(self.movies_query, backend=LRUCachedBackend())
+        self.assertEqual(result.errors[0].message, message)
+        self.assertEqual(result.extensions['cost'], dict(cost=181, depth=3))
+
+    def test_cost_in_response_extensions(self):
+        cache.get_cache().clear()
+        movie = MovieFactory()
+        data = dict(query=self.movie_query, variables=dict(id=global_id(movie)))
+        response = self.client.post('/graphql/', json.dumps(data), content_type='application/json')
+        content = json.loads(response.content)
+        self.assertEqual(content['data']['movie']['id'], global_id(movie))
+        self.assertEqual(content['extensions'], dict(cost=dict(cost=1, depth=1)))
@@ -0,0 +1,77 @@
+from cinemanio.api.cache import get_cache, invalidate
+from cinemanio.api.helpers import global_id
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import MovieFactory
+from cinemanio.core.models import Country, Genre, Language
+
+
+class FacetsQueryTestCase(QueryBaseTestCase):
+    query = '''
+        query Movies($genres: [ID!], $yearGte: Float, $search: String) {
+          movies(genres: $genres, year_Gte: $yearGte, search: $search, first: 1) {
+            facets {
+              genres { genre { id nameEn } count }
+              countries { country { id } count }
+              languages { language { id } count }
+              decades { decade count }
+            }
+          }
+        }
+    '''
+
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        self.drama, self.comedy = Genre.objects.all()[:2]
+        self.usa = Country.objects.first()
+        self.english = Language.objects.first()
+        MovieFactory(title_en='Godfather', year=1972, genres=[self.drama], countries=[self.usa], languages=[])
+        MovieFactory(title_en='Godfather II', year=1974, genres=[self.drama, self.comedy], countries=[self.usa],
+                     languages=[self.english])
+        MovieFactory(title_en='Apocalypse Now', year=1979, genres=[self.comedy], countries=[], languages=[])
+        MovieFactory(title_en='Gladiator', year=2000, genres=[], countries=[], languages=[self.english])
+        MovieFactory(title_en='Untitled', year=None, genres=[], countries=[], languages=[])
+
+    def get_facets(self, **values):
+        facets = self.execute(self.query, values)['movies']['facets']
+        return {
+            'genres': [(item['genre']['id'], item['count']) for item in facets['genres']],
+            'countries': [(item['country']['id'], item['count']) for item in facets['countries']],
+            'languages': [(item['language']['id'], item['count']) for item in facets['languages']],
+            'decades': [(item['decade'], item['count']) for item in facets['decades']],
+        }
+
+    def test_facets(self):
+        # movies, facets by one query, properties of 3 facets
+        with self.assertNumQueries(5):
+            facets = self.get_facets()
+        drama, comedy = sorted([self.drama, self.comedy], key=lambda genre: genre.id)
+        self.assertEqual(facets, {
+            'genres': [(global_id(drama), 2), (global_id(comedy), 2)],
+            'countries': [(global_id(self.usa), 2)],
+            'languages': [(global_id(self.english), 2)],
+            'decades': [(1970, 3), (2000, 1)],
+        })
+
+    def test_facets_respect_filters(self):
+        facets = self.get_facets(genres=[global_id(self.drama)], yearGte=1973)
+        drama, comedy = sorted([self.drama, self.comedy], key=lambda genre: genre.id)
+        self.assertEqual(facets, {
+            'genres': [(global_id(drama), 1), (global_id(comedy), 1)],
+            'countries': [(global_id(self.usa), 1)],
+            'languages': [(global_id(self.english), 1)],
+            'decades': [(1970, 1)],
+        })
+        facets = self.get_facets(search='godfather')
+        self.assertEqual(facets['decades'], [(1970, 2)])
+        self.assertEqual(facets['genres'][0], (global_id(self.drama), 2))
+
+    def test_facets_cached_per_filters(self):
+        self.get_facets()
+        with self.assertNumQueries(4):
+            self.get_facets()
+        with self.assertNumQueries(5):
+            self.get_facets(yearGte=1973)
+        invalidate('movie')
+        with self.assertNumQueries(5):
+            self.get_facets()
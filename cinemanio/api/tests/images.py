@@ -1,15 +1,24 @@
+from unittest import mock
+
 from parameterized import parameterized
 
+from cinemanio.api.cache import get_cache
 from cinemanio.api.helpers import global_id
 from cinemanio.api.schema.movie import MovieNode
 from cinemanio.api.schema.person import PersonNode
 from cinemanio.api.tests.base import QueryBaseTestCase
 from cinemanio.core.factories import MovieFactory, PersonFactory
 from cinemanio.images.factories import ImageLinkFactory
-from cinemanio.images.models import ImageType
+from cinemanio.images.models import ImageType, ThumbnailFormat
+from cinemanio.images.tasks import generate_thumbnails
 
 
 class ImagesQueryTestCase(QueryBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # forget thumbnails scheduled by previous tests
+        get_cache().clear()
+
     @parameterized.expand([
         (MovieFactory, MovieNode, ImageType.POSTER),
         (PersonFactory, PersonNode, ImageType.PHOTO),
@@ -33,6 +42,9 @@ class ImagesQueryTestCase(QueryBaseTestCase):
                         shortCard
                         detail
                         icon
+                        iconWebp: icon(webp: true)
+                        blurhash
+                        color
                       }
                     }
                   }
@@ -40,14 +52,28 @@ class ImagesQueryTestCase(QueryBaseTestCase):
               }
             }
         ''' % query_name
-        # TODO: reduce number of queries
-        with self.assertNumQueries(3 + (4 * 10)):
+        # thumbnails are not generated yet, generation is scheduled
+        with mock.patch('cinemanio.images.tasks.generate_thumbnails.delay') as delay:
+            result = self.execute(query, dict(id=global_id(instance)))
+        self.assertEqual(sorted(delay.call_args[0][0]), sorted(instance.images.values_list('image_id', flat=True)))
+        first = result[query_name]['images']['edges'][0]['node']['image']
+        self.assertIsNone(first['icon'])
+
+        generate_thumbnails(delay.call_args[0][0])
+
+        # object, images, thumbnails of all images
+        with self.assertNumQueries(3):
             result = self.execute(query, dict(id=global_id(instance)))
         self.assertEqual(len(result[query_name]['images']['edges']), instance.images.count())
         first = result[query_name]['images']['edges'][0]['node']['image']
         self.assertEqual(first['type'], image_type.name)
         self.assertTrue(len(first['original']) > 0)
         self.assertTrue(len(first['icon']) > 0)
+        self.assertNotEqual(first['icon'], first['detail'])
+        self.assertTrue(first['icon'].endswith('.jpg'))
+        self.assertTrue(first['iconWebp'].endswith('.webp'))
+        self.assertEqual(first['color'], '#0000fe')
+        self.assertEqual(len(first['blurhash']), 28)
 
     @parameterized.expand([
         (MovieFactory, MovieNode, ImageType.POSTER, 'poster'),
@@ -74,19 +100,24 @@ class ImagesQueryTestCase(QueryBaseTestCase):
         values = dict(id=global_id(instance))
 
         # no images
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(1):
             result_nothing = self.execute(query, values)
         self.assertEqual(result_nothing[query_name][field], None)
 
-        # images
-        for i in range(100):
-            ImageLinkFactory(object=instance, image__type=image_type)
+        # images, the first linked image of the type is primary
+        ImageLinkFactory(object=instance, image__type=None)
+        links = [ImageLinkFactory(object=instance, image__type=image_type) for i in range(10)]
+        for link in links[:2]:
+            link.image.generate_thumbnails()
 
-        with self.assertNumQueries(3 + 4):
+        with self.assertNumQueries(2):
             result = self.execute(query, values)
         self.assertEqual(result[query_name][field]['type'], image_type.name)
-        self.assertTrue(len(result[query_name][field]['original']) > 0)
+        self.assertEqual(result[query_name][field]['original'], links[0].image.original.url)
+        icon = links[0].image.thumbnails.get(size='30x40', format=ThumbnailFormat.JPEG)
+        self.assertEqual(result[query_name][field]['icon'], icon.url)
 
-        # try again to check random image
-        result_another = self.execute(query, values)
-        self.assertNotEqual(result[query_name][field]['original'], result_another[query_name][field]['original'])
+        # primary image is replaced by the next one after unlinking
+        links[0].delete()
+        result = self.execute(query, values)
+        self.assertEqual(result[query_name][field]['original'], links[1].image.original.url)
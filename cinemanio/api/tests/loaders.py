@@ -0,0 +1,127 @@
+from graphql_relay.connection.arrayconnection import offset_to_cursor
+from parameterized import parameterized
+
+from cinemanio.api.helpers import global_id
+from cinemanio.api.loaders import PartitionSliceLoader
+from cinemanio.api.tests.base import ListQueryBaseTestCase
+from cinemanio.core.factories import MovieFactory, PersonFactory, CastFactory
+from cinemanio.core.models import Cast
+from cinemanio.images.factories import ImageLinkFactory
+from cinemanio.images.models import ImageType
+from cinemanio.sites.wikipedia.factories import WikipediaPageFactory
+
+
+class LoadersQueryTestCase(ListQueryBaseTestCase):
+    count = 20
+    query = '''
+        query Objects($first: Int!) {
+          %s(first: $first) {
+            edges {
+              node {
+                id
+                %s {
+                  edges {
+                    node {
+                      name
+                      role { id }
+                    }
+                  }
+                }
+                images {
+                  edges {
+                    node {
+                      image { type }
+                    }
+                  }
+                }
+                wikipedia {
+                  edges {
+                    node {
+                      title
+                    }
+                  }
+                }
+                %s { type }
+              }
+            }
+          }
+        }
+    '''
+
+    def create_objects(self, factory, cast_field, image_type):
+        for i in range(self.count):
+            instance = factory()
+            for j in range(2):
+                CastFactory(**{cast_field: instance})
+                ImageLinkFactory(object=instance, image__type=image_type)
+            WikipediaPageFactory(content_object=instance)
+
+    @parameterized.expand([
+        (MovieFactory, 'movies', 'cast', 'movie', 'poster', ImageType.POSTER),
+        (PersonFactory, 'persons', 'career', 'person', 'photo', ImageType.PHOTO),
+    ])
+    def test_nested_fields_fixed_number_of_queries(self, factory, query_name, cast_name, cast_field, image_name,
+                                                   image_type):
+        self.create_objects(factory, cast_field, image_type)
+        query = self.query % (query_name, cast_name, image_name)
+
+        for first in [5, self.count]:
+            # select of list with primary images, cast, images, wikipedia pages
+            with self.assertNumQueries(4):
+                result = self.execute(query, dict(first=first))
+            self.assert_count_equal(result[query_name], first)
+            for edge in result[query_name]['edges']:
+                self.assertEqual(len(edge['node'][cast_name]['edges']), 2)
+                self.assertEqual(len(edge['node']['images']['edges']), 2)
+                self.assertEqual(len(edge['node']['wikipedia']['edges']), 1)
+                self.assertEqual(edge['node'][image_name]['type'], image_type.name)
+
+    @parameterized.expand([
+        (MovieFactory, 'movies', 'cast', 'movie'),
+        (PersonFactory, 'persons', 'career', 'person'),
+    ])
+    def test_nested_connection_slice_per_parent(self, factory, query_name, cast_name, cast_field):
+        instances = {}
+        for i in range(5):
+            instance = factory()
+            instances[global_id(instance)] = instance
+            for j in range(4):
+                CastFactory(**{cast_field: instance})
+        query = '''
+            query Objects($first: Int!, $after: String) {
+              %s {
+                edges {
+                  node {
+                    id
+                    %s(first: $first, after: $after) {
+                      edges {
+                        node { id }
+                      }
+                      pageInfo { hasNextPage }
+                    }
+                  }
+                }
+              }
+            }
+        ''' % (query_name, cast_name)
+
+        for after, has_next_page in [(None, True), (offset_to_cursor(2), False)]:
+            with self.assertNumQueries(2):
+                result = self.execute(query, dict(first=3, after=after))
+            self.assert_count_equal(result[query_name], 5)
+            for edge in result[query_name]['edges']:
+                start = 0 if after is None else 3
+                cast = getattr(instances[edge['node']['id']], cast_name).all()[start:start + 3]
+                connection = edge['node'][cast_name]
+                self.assertEqual([int(e['node']['id']) for e in connection['edges']], [c.id for c in cast])
+                self.assertEqual(connection['pageInfo']['hasNextPage'], has_next_page)
+
+    def test_partition_slice_beyond_end(self):
+        movies = MovieFactory.create_batch(2)
+        CastFactory.create_batch(4, movie=movies[0])
+        loader = PartitionSliceLoader(Cast.objects.all(), 'movie_id', start=9, size=3)
+        # amounts of objects of empty slices are counted by one query
+        with self.assertNumQueries(2):
+            slices = loader.batch_load_fn([movie.id for movie in movies]).get()
+        self.assertEqual([(list(partition_slice), partition_slice.total) for partition_slice in slices],
+                         [([], 4), ([], 0)])
@@ -110,6 +110,6 @@ class MovieQueryTestCase(ObjectQueryBaseTestCase):
               }
             }
         '''
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(2):
             result = self.execute(query, dict(id=global_id(m), role=global_id(cast.role)))
         self.assertEqual(len(result['movie']['cast']['edges']), m.cast.filter(role=cast.role).count())
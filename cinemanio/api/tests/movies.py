@@ -1,5 +1,6 @@
 from parameterized import parameterized
 
+from cinemanio.api.bitmaps import bitmap_index
 from cinemanio.api.helpers import global_id
 from cinemanio.api.schema.properties import GenreNode, CountryNode, LanguageNode
 from cinemanio.api.tests.base import ListQueryBaseTestCase
@@ -9,6 +10,7 @@ from cinemanio.core.models import Movie, Genre, Country, Language
 
 class MoviesQueryTestCase(ListQueryBaseTestCase):
     def setUp(self):
+        super().setUp()
         for i in range(self.count):
             MovieFactory()
 
@@ -28,7 +30,7 @@ class MoviesQueryTestCase(ListQueryBaseTestCase):
               }
             }
         '''
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             result = self.execute(query)
         self.assert_count_equal(result['movies'], self.count)
 
@@ -60,7 +62,7 @@ class MoviesQueryTestCase(ListQueryBaseTestCase):
               languages { nameEn }
             }
         '''
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             result = self.execute(query)
         self.assert_count_equal(result['movies'], self.count)
 
@@ -77,7 +79,7 @@ class MoviesQueryTestCase(ListQueryBaseTestCase):
               }
             }
         '''
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             result = self.execute(query, dict(min=1940, max=1980))
         self.assert_count_equal(result['movies'], Movie.objects.filter(year__gte=1940, year__lte=1980).count())
         for movie in result['movies']['edges']:
@@ -105,8 +107,9 @@ class MoviesQueryTestCase(ListQueryBaseTestCase):
               }
             }
         ''' % fieldname
+        bitmap_index.build()
         # TODO: decrease number of queries by 1
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(2):
             result = self.execute(query, dict(rels=(global_id(item1), global_id(item2))))
         self.assert_count_equal(result['movies'], (Movie.objects
                                                    .filter(**{fieldname: item1})
@@ -139,6 +142,6 @@ class MoviesQueryTestCase(ListQueryBaseTestCase):
               }
             }
         '''
-        self.assert_response_orders(query, 'movies', order_by='year', queries_count=2, model=Movie,
+        self.assert_response_orders(query, 'movies', order_by='year', queries_count=1, model=Movie,
                                     get_value_instance=lambda n: n.year,
                                     get_value_result=lambda n: n['year'])
@@ -1,7 +1,11 @@
+from unittest import mock
+
 from parameterized import parameterized
 
+from cinemanio.api.helpers import global_id
 from cinemanio.api.tests.base import ListQueryBaseTestCase
 from cinemanio.core.factories import MovieFactory, PersonFactory
+from cinemanio.relations.factories import MovieRelationCountFactory, PersonRelationCountFactory
 
 
 class PaginationQueryTestCase(ListQueryBaseTestCase):
@@ -34,8 +38,8 @@ class PaginationQueryTestCase(ListQueryBaseTestCase):
               }
             }
         ''' % query_name
-        # TODO: remove one extra SELECT COUNT(*) AS "__count" FROM "core_movie"
-        with self.assertNumQueries(3):
+        # select and count, count is cached for the next pages
+        with self.assertNumQueries(2):
             result = self.execute(query, dict(after=''))
         self.assert_count_equal(result[query_name], 10)
         self.assertEqual(result[query_name]['totalCount'], 100)
@@ -46,13 +50,156 @@ class PaginationQueryTestCase(ListQueryBaseTestCase):
         for i in range(10):
             values = dict(after=result[query_name]['pageInfo']['endCursor'])
             if i == 9:
-                with self.assertNumQueries(2):
+                with self.assertNumQueries(1):
                     result = self.execute(query, values)
                 self.assertEqual(len(result[query_name]['edges']), 0)
+                self.assertFalse(result[query_name]['pageInfo']['hasNextPage'])
             else:
-                with self.assertNumQueries(3):
+                with self.assertNumQueries(1):
                     result = self.execute(query, values)
                 self.assert_count_equal(result[query_name], 10)
+                self.assertEqual(result[query_name]['totalCount'], 100)
+                self.assertEqual(result[query_name]['pageInfo']['hasNextPage'], i < 8)
                 self.populated_cursors(cursors, result[query_name])
 
         self.assertEqual(len(cursors), 100)
+
+    @parameterized.expand([
+        (MovieFactory,),
+        (PersonFactory,),
+    ])
+    def test_object_pagination_without_count(self, factory):
+        for i in range(15):
+            instance = factory()
+        query_name = instance._meta.model_name + 's'
+        query = '''
+            query Objects($after: String!){
+              %s(first: 10, after: $after) {
+                edges {
+                  node {
+                    id
+                  }
+                }
+                pageInfo {
+                  endCursor
+                  hasNextPage
+                }
+              }
+            }
+        ''' % query_name
+        with self.assertNumQueries(1):
+            result = self.execute(query, dict(after=''))
+        self.assert_count_equal(result[query_name], 10)
+        self.assertTrue(result[query_name]['pageInfo']['hasNextPage'])
+
+        with self.assertNumQueries(1):
+            result = self.execute(query, dict(after=result[query_name]['pageInfo']['endCursor']))
+        self.assert_count_equal(result[query_name], 5)
+        self.assertFalse(result[query_name]['pageInfo']['hasNextPage'])
+
+    @parameterized.expand([
+        (MovieFactory, {}),
+        (MovieFactory, {'year_Gte': 2000}),
+        (PersonFactory, {}),
+    ])
+    def test_total_count(self, factory, filters):
+        for i in range(10):
+            factory(**({'year': 1990 + i * 2} if filters else {}))
+        query_name = factory._meta.model._meta.model_name + 's'
+        arguments = ', '.join(f'{key}: {value}' for key, value in filters.items())
+        query = '''
+            query Objects($approximate: Boolean!){
+              %s(first: 1 %s) {
+                totalCount(approximate: $approximate)
+              }
+            }
+        ''' % (query_name, arguments)
+        count = 5 if filters else 10
+
+        with self.assertNumQueries(2):
+            result = self.execute(query, dict(approximate=False))
+        self.assertEqual(result[query_name]['totalCount'], count)
+        # count is cached per filter signature
+        with self.assertNumQueries(1):
+            result = self.execute(query, dict(approximate=False))
+        self.assertEqual(result[query_name]['totalCount'], count)
+        # estimation is not available for sqlite, cached exact count is used
+        with self.assertNumQueries(1):
+            result = self.execute(query, dict(approximate=True))
+        self.assertEqual(result[query_name]['totalCount'], count)
+
+        # cached count is invalidated by new object after commit
+        with mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func()):
+            factory(**({'year': 2020} if filters else {}))
+        with self.assertNumQueries(2):
+            result = self.execute(query, dict(approximate=False))
+        self.assertEqual(result[query_name]['totalCount'], count + 1)
+
+    keyset_query = '''
+        query Objects($after: String, $order: String){
+          %s(first: 7, after: $after, orderBy: $order, keyset: true) {
+            edges {
+              node {
+                id
+              }
+            }
+            pageInfo {
+              endCursor
+              hasNextPage
+            }
+          }
+        }
+    '''
+
+    def get_keyset_pages(self, query_name, order):
+        ids = []
+        after = None
+        while True:
+            with self.assertNumQueries(1):
+                result = self.execute(self.keyset_query % query_name, dict(after=after, order=order))
+            ids += [edge['node']['id'] for edge in result[query_name]['edges']]
+            if not result[query_name]['pageInfo']['hasNextPage']:
+                return ids
+            after = result[query_name]['pageInfo']['endCursor']
+
+    def assert_keyset_pages(self, query_name, order, instances, get_value):
+        """
+        Check keyset pages contain all instances ordered by value with nulls first (last for descending) and by id
+        """
+        descending = order.startswith('-')
+        instances = sorted(instances, key=lambda i: (get_value(i) is not None, get_value(i) or 0, i.id),
+                           reverse=descending)
+        self.assertEqual(self.get_keyset_pages(query_name, order), [global_id(i) for i in instances])
+
+    @parameterized.expand([('',), ('year',), ('-year',)])
+    def test_movies_keyset_pagination(self, order):
+        movies = [MovieFactory(year=None if i % 5 == 0 else 1990 + i % 4) for i in range(30)]
+        self.assert_keyset_pages('movies', order, movies, lambda m: m.year if order else None)
+
+    @parameterized.expand([
+        (MovieRelationCountFactory, 'relations_count__fav'),
+        (MovieRelationCountFactory, '-relations_count__fav'),
+        (PersonRelationCountFactory, 'relations_count__fav'),
+        (PersonRelationCountFactory, '-relations_count__fav'),
+    ])
+    def test_relations_keyset_pagination(self, factory, order):
+        instances = []
+        for i in range(30):
+            rel = factory(fav=i % 3)
+            instances.append(rel.object)
+            # absent relations_count instance is ordered as null
+            if i % 4 == 0:
+                rel.delete()
+        query_name = instances[0]._meta.model_name + 's'
+        counts = {rel.object_id: rel.fav for rel in factory._meta.model.objects.all()}
+        self.assert_keyset_pages(query_name, order, instances, lambda i: counts.get(i.id))
+
+    def test_keyset_pagination_errors(self):
+        m = MovieFactory()
+        result = self.execute_with_errors(self.keyset_query % 'movies', dict(after='wrong'))
+        self.assertEqual(result.errors[0].message, 'Invalid cursor wrong')
+
+        query = self.keyset_query.replace('orderBy: $order', 'orderBy: $order, search: "term"')
+        with mock.patch('cinemanio.core.search.SimpleSearchBackend.search', return_value=[m.id]):
+            result = self.execute_with_errors(query % 'movies', dict(order=''))
+        self.assertIn('not available for search results', result.errors[0].message)
@@ -0,0 +1,112 @@
+import json
+from hashlib import sha256
+from io import StringIO
+from tempfile import NamedTemporaryFile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from cinemanio.api.cache import get_automatic_query
+from cinemanio.api.helpers import global_id
+from cinemanio.api.models import PersistedQuery
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import MovieFactory
+
+
+class PersistedQueriesTestCase(QueryBaseTestCase):
+    query = '''
+        query Movie($id: ID!) {
+          movie(id: $id) {
+            id
+          }
+        }
+    '''
+
+    def setUp(self):
+        super().setUp()
+        PersistedQuery.objects.documents.clear()
+        self.movie = MovieFactory()
+        self.query_id = sha256(self.query.encode('utf-8')).hexdigest()
+
+    def request(self, **data):
+        data['variables'] = dict(id=global_id(self.movie))
+        response = self.client.post('/graphql/', json.dumps(data), content_type='application/json')
+        return response.status_code, json.loads(response.content)
+
+    def extensions(self, query_id):
+        return dict(persistedQuery=dict(version=1, sha256Hash=query_id))
+
+    def assert_movie(self, content):
+        self.assertEqual(content['data'], dict(movie=dict(id=global_id(self.movie))))
+
+    def test_execute_registered_query_by_hash(self):
+        PersistedQuery.objects.register(self.query)
+
+        self.assert_movie(self.request(extensions=self.extensions(self.query_id))[1])
+        self.assert_movie(self.request(id=self.query_id)[1])
+
+    def test_unknown_hash(self):
+        status, content = self.request(extensions=self.extensions(self.query_id))
+        self.assertEqual(content['errors'][0]['message'], 'PersistedQueryNotFound')
+
+    def test_register_query_automatically(self):
+        self.assert_movie(self.request(query=self.query, extensions=self.extensions(self.query_id))[1])
+        self.assertEqual(get_automatic_query(self.query_id), self.query)
+        self.assertEqual(PersistedQuery.objects.count(), 0)
+        self.assert_movie(self.request(extensions=self.extensions(self.query_id))[1])
+
+        # automatically registered queries don't satisfy persisted only mode
+        with override_settings(GRAPHQL_PERSISTED_QUERIES_ONLY=True):
+            status, content = self.request(extensions=self.extensions(self.query_id))
+        self.assertEqual(content['errors'][0]['message'], 'PersistedQueryNotFound')
+
+    def test_register_query_with_wrong_hash(self):
+        status, content = self.request(query=self.query, extensions=self.extensions('0' * 64))
+        self.assertEqual(status, 400)
+        self.assertIn('does not match', content['errors'][0]['message'])
+        self.assertIsNone(get_automatic_query('0' * 64))
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ONLY=True)
+    def test_reject_ad_hoc_queries(self):
+        status, content = self.request(query=self.query)
+        self.assertEqual(status, 403)
+
+        status, content = self.request(query=self.query, extensions=self.extensions(self.query_id))
+        self.assertEqual(content['errors'][0]['message'], 'PersistedQueryNotFound')
+        self.assertEqual(PersistedQuery.objects.count(), 0)
+
+        PersistedQuery.objects.register(self.query)
+        self.assert_movie(self.request(extensions=self.extensions(self.query_id))[1])
+
+    @override_settings(GRAPHQL_PERSISTED_QUERY_CACHE_SIZE=1)
+    def test_documents_in_memory_are_bounded(self):
+        other = PersistedQuery.objects.register('{ genres { id } }')
+        PersistedQuery.objects.register(self.query)
+        self.assertEqual(PersistedQuery.objects.get_document(other.id), other.document)
+        self.assertEqual(PersistedQuery.objects.get_document(self.query_id), self.query)
+        self.assertEqual(list(PersistedQuery.objects.documents), [self.query_id])
+
+    def test_load_manifest_command(self):
+        PersistedQuery.objects.register('{ genres { id } }')
+        manifest = {
+            'format': 'apollo-persisted-query-manifest',
+            'version': 1,
+            'operations': [{'id': self.query_id, 'name': 'Movie', 'type': 'query', 'body': self.query}],
+        }
+        with NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(manifest, f)
+            f.flush()
+            call_command('load_persisted_queries', f.name, '--prune', stdout=StringIO())
+
+        self.assertEqual(PersistedQuery.objects.get().operation_name, 'Movie')
+
+    def test_load_manifest_command_invalid_document(self):
+        query = self.query.replace('id\n', 'wrongField\n', 1)
+        with NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump({sha256(query.encode('utf-8')).hexdigest(): query}, f)
+            f.flush()
+            with self.assertRaises(CommandError):
+                call_command('load_persisted_queries', f.name)
+
+        self.assertEqual(PersistedQuery.objects.count(), 0)
@@ -90,6 +90,6 @@ class PersonQueryTestCase(ObjectQueryBaseTestCase):
               }
             }
         '''
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(2):
             result = self.execute(query, dict(id=global_id(p), role=global_id(cast.role)))
         self.assertEqual(len(result['person']['career']['edges']), p.career.filter(role=cast.role).count())
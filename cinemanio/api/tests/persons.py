@@ -29,7 +29,7 @@ class PersonsQueryTestCase(ListQueryBaseTestCase):
               }
             }
         '''
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             result = self.execute(query)
         self.assert_count_equal(result['persons'], self.count)
 
@@ -47,7 +47,7 @@ class PersonsQueryTestCase(ListQueryBaseTestCase):
               }
             }
         '''
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             result = self.execute(query, dict(year=year))
         self.assert_count_equal(result['persons'], Person.objects.filter(date_birth__year=year).count())
 
@@ -64,7 +64,7 @@ class PersonsQueryTestCase(ListQueryBaseTestCase):
               }
             }
         '''
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             result = self.execute(query, dict(country=global_id(country)))
         self.assert_count_equal(result['persons'], Person.objects.filter(country=country).count())
 
@@ -86,7 +86,7 @@ class PersonsQueryTestCase(ListQueryBaseTestCase):
             }
         ''' % fieldname
         # TODO: decrease number of queries by 1
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(2):
             result = self.execute(query, dict(rels=[global_id(item1), global_id(item2)]))
         self.assert_count_equal(result['persons'], (Person.objects
                                                     .filter(**{fieldname: item1})
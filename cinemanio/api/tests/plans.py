@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from cinemanio.api.backend import CacheInfo, LRUCachedBackend
+from cinemanio.api.helpers import global_id
+from cinemanio.api.plans import QueryPlanCache, query_plans
+from cinemanio.api.schema.movie import MovieNode
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import CastFactory, MovieFactory
+from cinemanio.sites.imdb.factories import ImdbMovieFactory
+
+
+class QueryPlansTestCase(QueryBaseTestCase):
+    query = '''
+        query Movie($id: ID!) {
+          movie(id: $id) {
+            ...MovieFields
+            imdb { rating }
+            genres { nameEn }
+          }
+        }
+        fragment MovieFields on MovieNode {
+          titleEn
+        }
+    '''
+
+    def setUp(self):
+        super().setUp()
+        query_plans.cache_clear()
+
+    def test_plan_reused_for_cached_document(self):
+        backend = LRUCachedBackend(maxsize=1)
+        m = ImdbMovieFactory().movie
+
+        for i in range(3):
+            with self.assertNumQueries(2):
+                result = self.execute(self.query, dict(id=global_id(m)), backend=backend)
+            self.assertEqual(result['movie']['titleEn'], m.title_en)
+            self.assertEqual(result['movie']['imdb']['rating'], m.imdb.rating)
+
+        self.assertEqual(query_plans.cache_info().misses, 1)
+        self.assertEqual(query_plans.cache_info().hits, 2)
+
+    def test_plan(self):
+        self.execute(self.query, dict(id=global_id(MovieFactory())))
+
+        (key, plan), = query_plans.cache.items()
+        self.assertEqual(key[0], MovieNode)
+        self.assertEqual(plan.fields, {'title_en', 'imdb', 'genres'})
+        self.assertEqual(plan.select_related, ('imdb',))
+        self.assertEqual(plan.prefetch_related, ('genres',))
+        self.assertIn('title_en', plan.only)
+        self.assertIn('imdb__rating', plan.only)
+        self.assertNotIn('title_ru', plan.only)
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = QueryPlanCache(maxsize=2)
+        for key in ['a', 'b', 'a', 'c', 'a', 'b']:
+            cache.get((key,), lambda: key)
+        # b was evicted by c as the least recently used one
+        self.assertEqual(cache.cache_info(), CacheInfo(hits=2, misses=4, maxsize=2, currsize=2))
+
+    def test_benchmark_command(self):
+        CastFactory()
+        stdout = StringIO()
+        call_command('benchmark_query_plans', '--requests', '4', stdout=stdout)
+        self.assertIn('CPU time saved', stdout.getvalue())
+        self.assertEqual(query_plans.cache_info().currsize, 0)
+
+    def test_benchmark_command_without_data(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_query_plans', stdout=StringIO())
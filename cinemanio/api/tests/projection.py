@@ -0,0 +1,115 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from cinemanio.api.helpers import global_id
+from cinemanio.api.tests.base import QueryBaseTestCase
+from cinemanio.core.factories import MovieFactory, PersonFactory, CastFactory
+from cinemanio.sites.kinopoisk.factories import KinopoiskPersonFactory
+from cinemanio.sites.wikipedia.factories import WikipediaPageFactory
+
+
+class ColumnProjectionTestCase(QueryBaseTestCase):
+    def execute_and_capture(self, query, values=None, queries_count=1):
+        with CaptureQueriesContext(connection) as context:
+            result = self.execute(query, values)
+        self.assertEqual(len(context.captured_queries), queries_count)
+        return result, [captured['sql'] for captured in context.captured_queries]
+
+    def test_movies_translated_title(self):
+        MovieFactory()
+        query = '''
+            query {
+              movies {
+                edges {
+                  node {
+                    titleEn
+                  }
+                }
+              }
+            }
+        '''
+        result, (sql,) = self.execute_and_capture(query)
+        self.assertEqual(len(result['movies']['edges']), 1)
+        self.assertIn('"title_en"', sql)
+        self.assertNotIn('"title_ru"', sql)
+        self.assertNotIn('"year"', sql)
+
+    def test_person_name(self):
+        p = PersonFactory(biography='Long biography')
+        query = '''
+            query Person($id: ID!) {
+              person(id: $id) {
+                name, nameRu
+              }
+            }
+        '''
+        result, (sql,) = self.execute_and_capture(query, dict(id=global_id(p)))
+        self.assertEqual(result['person']['name'], p.name)
+        self.assertEqual(result['person']['nameRu'], p.name_ru)
+        self.assertIn('"first_name_ru"', sql)
+        self.assertIn('"last_name_en"', sql)
+        self.assertNotIn('"biography"', sql)
+
+    def test_person_related_site_info(self):
+        p = KinopoiskPersonFactory(info='Long information').person
+        query = '''
+            query Person($id: ID!) {
+              person(id: $id) {
+                kinopoisk { %s }
+              }
+            }
+        '''
+        result, (sql,) = self.execute_and_capture(query % 'id', dict(id=global_id(p)))
+        self.assertEqual(result['person']['kinopoisk']['id'], p.kinopoisk.id)
+        self.assertNotIn('"info"', sql)
+
+        result, (sql,) = self.execute_and_capture(query % 'id, info', dict(id=global_id(p)))
+        self.assertEqual(result['person']['kinopoisk']['info'], p.kinopoisk.info)
+        self.assertIn('"info"', sql)
+
+    def test_wikipedia_content(self):
+        m = MovieFactory()
+        page = WikipediaPageFactory(content_object=m, lang='en', content='Long content')
+        query = '''
+            query Movie($id: ID!) {
+              movie(id: $id) {
+                wikipedia {
+                  edges {
+                    node {
+                      %s
+                    }
+                  }
+                }
+              }
+            }
+        '''
+        result, (_, sql) = self.execute_and_capture(query % 'url', dict(id=global_id(m)), queries_count=2)
+        self.assertEqual(result['movie']['wikipedia']['edges'][0]['node']['url'], page.url)
+        self.assertNotIn('"content"', sql)
+
+        result, (_, sql) = self.execute_and_capture(query % 'content', dict(id=global_id(m)), queries_count=2)
+        self.assertEqual(result['movie']['wikipedia']['edges'][0]['node']['content'], page.content)
+        self.assertIn('"content"', sql)
+
+    def test_cast_person_biography(self):
+        cast = CastFactory(person__biography='Long biography')
+        query = '''
+            query Movie($id: ID!) {
+              movie(id: $id) {
+                cast {
+                  edges {
+                    node {
+                      name
+                      person { nameEn }
+                    }
+                  }
+                }
+              }
+            }
+        '''
+        result, (_, sql) = self.execute_and_capture(query, dict(id=global_id(cast.movie)), queries_count=2)
+        node = result['movie']['cast']['edges'][0]['node']
+        self.assertEqual(node['name'], cast.name)
+        self.assertEqual(node['person']['nameEn'], cast.person.name_en)
+        self.assertIn('"first_name_en"', sql)
+        self.assertNotIn('"biography"', sql)
@@ -217,7 +217,7 @@ class RelationsQueryTestCase(ListQueryBaseTestCase, RelationsTestMixin):
             rel = self.create_relation(factory, **{code: True for code in codes})
             query_name = rel.object._meta.model_name + 's'
 
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(2):
             result = self.execute(self.objects_relation_query % self.get_objects_vars(rel))
 
         self.assertEqual(len(result[query_name]['edges']), self.count)
@@ -235,7 +235,7 @@ class RelationsQueryTestCase(ListQueryBaseTestCase, RelationsTestMixin):
             query_name = instance._meta.model_name + 's'
         rel = relation(object=instance)
 
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(2):
             result = self.execute(self.objects_relation_query % self.get_objects_vars(rel))
 
         self.assertEqual(len(result[query_name]['edges']), self.count)
@@ -252,7 +252,7 @@ class RelationsQueryTestCase(ListQueryBaseTestCase, RelationsTestMixin):
             rel = self.create_relation(factory, **{code: True for code in codes})
             query_name = rel.object._meta.model_name + 's'
 
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             result = self.execute(self.objects_relation_query % self.get_objects_vars(rel),
                                   None,
                                   self.get_context())
@@ -281,7 +281,7 @@ class RelationsQueryTestCase(ListQueryBaseTestCase, RelationsTestMixin):
               }
             }
         ''' % (query_name, query_name)
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             result = self.execute(query, dict(relation='fav'))
 
         self.assertEqual(len(result[query_name]['edges']), 50)
@@ -323,6 +323,6 @@ class RelationsQueryTestCase(ListQueryBaseTestCase, RelationsTestMixin):
             except factory._meta.model.DoesNotExist:
                 return factory._meta.model().fav
 
-        self.assert_response_orders(query, query_name, order_by='relations_count__fav', queries_count=2, model=model,
+        self.assert_response_orders(query, query_name, order_by='relations_count__fav', queries_count=1, model=model,
                                     get_value_instance=get_value_instance,
                                     get_value_result=lambda n: n['relationsCount']['fav'])
@@ -1,11 +1,14 @@
 from unittest import mock
+from django.test import override_settings
 from parameterized import parameterized
 
+from cinemanio.api.cache import get_cache
 from cinemanio.api.helpers import global_id
 from cinemanio.api.tests.base import ListQueryBaseTestCase
 from cinemanio.core.factories import MovieFactory, PersonFactory
 
 
+@override_settings(SEARCH_BACKEND='cinemanio.core.search.AlgoliaSearchBackend')
 class SearchQueryTestCase(ListQueryBaseTestCase):
     search_query = '''
         query Objects($search: String!, $order: String!){
@@ -19,15 +22,20 @@ class SearchQueryTestCase(ListQueryBaseTestCase):
         }
     '''
 
+    def setUp(self):
+        super().setUp()
+        # forget search results of previous tests
+        get_cache().clear()
+
     def prepare_stuff(self, factory, raw_search):
         instances = []
         for i in range(100):
             instances.append(factory())
 
-        raw_search.return_value = {'hits': [
-            {'objectID': instances[0].id},
-            {'objectID': instances[1].id},
-            {'objectID': instances[2].id},
+        raw_search.return_value = {'nbHits': 3, 'hits': [
+            {'objectID': str(instances[0].id)},
+            {'objectID': str(instances[1].id)},
+            {'objectID': str(instances[2].id)},
         ]}
 
         query_name = instances[0]._meta.model_name + 's'
@@ -37,11 +45,11 @@ class SearchQueryTestCase(ListQueryBaseTestCase):
         (MovieFactory,),
         (PersonFactory,),
     ])
-    @mock.patch('cinemanio.core.models.base.raw_search')
+    @mock.patch('cinemanio.core.search.raw_search')
     def test_search_query(self, factory, raw_search):
         instances, query_name = self.prepare_stuff(factory, raw_search)
 
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             result = self.execute(self.search_query % query_name, dict(search='term', order=''))
 
         self.assert_count_equal(result[query_name], 3)
@@ -49,7 +57,7 @@ class SearchQueryTestCase(ListQueryBaseTestCase):
         self.assertEqual(result[query_name]['edges'][1]['node']['id'], global_id(instances[1]))
         self.assertEqual(result[query_name]['edges'][2]['node']['id'], global_id(instances[2]))
 
-    @mock.patch('cinemanio.core.models.base.raw_search')
+    @mock.patch('cinemanio.core.search.raw_search')
     def test_search_query_with_order_specified(self, raw_search):
         instances, query_name = self.prepare_stuff(MovieFactory, raw_search)
 
@@ -60,10 +68,42 @@ class SearchQueryTestCase(ListQueryBaseTestCase):
         instances[2].year = 2001
         instances[2].save()
 
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             result = self.execute(self.search_query % query_name, dict(search='term', order='year'))
 
         self.assert_count_equal(result[query_name], 3)
         self.assertEqual(result[query_name]['edges'][0]['node']['id'], global_id(instances[2]))
         self.assertEqual(result[query_name]['edges'][1]['node']['id'], global_id(instances[0]))
         self.assertEqual(result[query_name]['edges'][2]['node']['id'], global_id(instances[1]))
+
+    @parameterized.expand([
+        (MovieFactory,),
+        (PersonFactory,),
+    ])
+    @mock.patch('cinemanio.core.search.raw_search')
+    def test_search_query_pagination(self, factory, raw_search):
+        instances, query_name = self.prepare_stuff(factory, raw_search)
+        raw_search.return_value = {'nbHits': 3, 'hits': [{'objectID': str(instances[i].id)} for i in (2, 0, 1)]}
+        query = '''
+            query Objects($search: String!, $after: String){
+              %s(search: $search, first: 2, after: $after) {
+                totalCount
+                pageInfo { endCursor }
+                edges {
+                  node {
+                    id
+                  }
+                }
+              }
+            }
+        ''' % query_name
+
+        # count of search results is reported by search engine, page is selected by DB
+        with self.assertNumQueries(1):
+            result = self.execute(query, dict(search='term'))
+        self.assertEqual(result[query_name]['totalCount'], 3)
+        self.assertEqual([edge['node']['id'] for edge in result[query_name]['edges']],
+                         [global_id(instances[2]), global_id(instances[0])])
+
+        result = self.execute(query, dict(search='term', after=result[query_name]['pageInfo']['endCursor']))
+        self.assertEqual([edge['node']['id'] for edge in result[query_name]['edges']], [global_id(instances[1])])
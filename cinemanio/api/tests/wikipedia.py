@@ -35,7 +35,7 @@ class WikipediaQueryTestCase(QueryBaseTestCase):
             }
         ''' % query_name
 
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(2):
             result = self.execute(query, dict(id=global_id(instance)))
 
         self.assertEqual(len(result[query_name]['wikipedia']['edges']), 2)
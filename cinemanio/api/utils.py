@@ -1,18 +1,30 @@
-from typing import List
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple  # noqa
 
 import graphene
 from classproperties import classproperty
+from django.db.models import QuerySet, TextField
 from django.db.models.fields.related import ForeignKey
 from django.db.models.fields.reverse_related import OneToOneRel
 from django.db.models.options import Options
+from graphene.relay import PageInfo
 from graphene.utils.str_converters import to_snake_case
 from graphene_django.filter import DjangoFilterConnectionField as _DjangoFilterConnectionField
-from graphql.language.ast import FragmentSpread
+from graphene_django.utils import maybe_queryset
+from graphql.language.ast import FragmentSpread, InlineFragment
+from graphql_relay.connection.arrayconnection import connection_from_list_slice, get_offset_with_default
+
+from cinemanio.api.counts import get_count
+from cinemanio.api.loaders import PartitionSlice
+from cinemanio.api.pagination import KeysetPaginator, get_keyset_ordering
+from cinemanio.api.plans import QueryPlan, query_plans
 
 
 class DjangoFilterConnectionField(_DjangoFilterConnectionField):
     """
-    Preserve select_related and prefetch_related attributes of old queryset during querysets merge
+    Preserve select_related and prefetch_related attributes of old queryset during querysets merge.
+    Build connection from PartitionSlice of loaders with respect to its offset and total amount.
+    Build connection from queryset without counting rows: fetch one extra row to know if there is next page
     """
 
     def __init__(self, node, **kwargs):
@@ -29,23 +41,115 @@ class DjangoFilterConnectionField(_DjangoFilterConnectionField):
         queryset_merged._prefetch_related_lookups = queryset._prefetch_related_lookups
         return queryset_merged
 
+    @classmethod
+    def resolve_connection(cls, connection, default_manager, args, iterable):
+        if isinstance(iterable, PartitionSlice):
+            return cls.connection_from_slice(connection, args, iterable, iterable, iterable.start, iterable.total)
+
+        iterable = maybe_queryset(default_manager if iterable is None else iterable)
+        if not isinstance(iterable, QuerySet) or args.get('last') is not None or args.get('before') is not None:
+            return super().resolve_connection(connection, default_manager, args, iterable)
+
+        iterable = cls.merge_iterable(default_manager, iterable)
+        start = get_offset_with_default(args.get('after'), -1) + 1
+        first = args.get('first')
+        objects = list(iterable[start:start + first + 1] if isinstance(first, int) else iterable[start:])
+        # amount of rows is unknown, it's enough to know if there are rows after the slice
+        return cls.connection_from_slice(connection, args, iterable, objects, start, start + len(objects))
+
+    @classmethod
+    def merge_iterable(cls, default_manager, iterable):
+        if iterable is not default_manager:
+            iterable = cls.merge_querysets(maybe_queryset(default_manager), iterable)
+        return iterable
+
+    @classmethod
+    def connection_from_slice(cls, connection, args, iterable, objects, start, length):
+        connection = connection_from_list_slice(
+            objects,
+            args,
+            slice_start=start,
+            list_length=length,
+            list_slice_length=len(objects),
+            connection_type=connection,
+            edge_type=connection.Edge,
+            pageinfo_type=PageInfo,
+        )
+        connection.iterable = iterable
+        connection.length = length
+        return connection
+
 
 class DjangoFilterConnectionSearchableField(DjangoFilterConnectionField):
     """
-    Preserve queryset.search_result_ids during querysets merge
+    Preserve queryset.search_term and queryset.search_result_ids during querysets merge.
+    Paginate by (sort key, id) cursor instead of offset if keyset argument is true, see cinemanio.api.pagination
     """
 
+    def __init__(self, node, **kwargs):
+        super().__init__(node, keyset=graphene.Boolean(default_value=False), **kwargs)
+
+    @classmethod
+    def resolve_connection(cls, connection, default_manager, args, iterable):
+        if not args.get('keyset'):
+            return super().resolve_connection(connection, default_manager, args, iterable)
+
+        iterable = cls.merge_iterable(default_manager, maybe_queryset(default_manager if iterable is None else iterable))
+        paginator = KeysetPaginator(iterable, *get_keyset_ordering(iterable))
+        page = paginator.page(first=args.get('first'), last=args.get('last'),
+                              after=args.get('after'), before=args.get('before'))
+        edges = [connection.Edge(node=instance, cursor=paginator.cursor(instance)) for instance in page]
+        connection = connection(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=page.has_previous,
+                has_next_page=page.has_next,
+            ),
+        )
+        connection.iterable = iterable
+        connection.length = None
+        return connection
+
     @classmethod
     def merge_querysets(cls, default_queryset, queryset):
+        queryset.search_term = default_queryset.search_term
         queryset.search_result_ids = default_queryset.search_result_ids
         return super().merge_querysets(default_queryset, queryset)
 
 
+def get_field_columns(model, names: Iterable[str], field_columns: Optional[Dict[str, Tuple[str, ...]]] = None,
+                      heavy_only: bool = False) -> List[str]:
+    """
+    Return names of concrete fields of model required to resolve requested fields: primary and foreign keys,
+    requested fields with all their translations and columns of computed fields from field_columns.
+    If heavy_only is True, only unrequested text fields are skipped
+    """
+    names = set(names)
+    for name in list(names):
+        names.update((field_columns or {}).get(name, ()))
+    columns = []
+    for field in model._meta.concrete_fields:
+        translated_field = getattr(field, 'translated_field', None)
+        if field.primary_key or field.is_relation or field.name in names \
+                or translated_field is not None and translated_field.name in names \
+                or heavy_only and not isinstance(field, TextField):
+            columns.append(field.name)
+    return columns
+
+
 class DjangoObjectTypeMixin:
     """
-    Cast select_related to queryset for ForeignKeys of model
+    Cast select_related to queryset for ForeignKeys of model.
+    Load only columns required by requested fields, related objects are loaded without unrequested text fields.
+    Plans of querysets are cached per AST of the field, see cinemanio.api.plans.
+    The same queryset is used by loaders (cinemanio.api.loaders) to batch nested fields of lists
     """
 
+    # columns required to resolve fields, which are not model fields
+    field_columns = {}  # type: Dict[str, Tuple[str, ...]]
+
     @classproperty
     def _meta(self) -> Options:
         raise NotImplementedError()
@@ -58,21 +162,49 @@ class DjangoObjectTypeMixin:
             return None
 
     @classmethod
-    def get_queryset(cls, info, *_, **__):
+    def get_queryset(cls, info, *_, columns: Iterable[str] = (), **__):
+        """
+        Return queryset for requested fields, columns are loaded in addition to them, like key fields of loaders
+        """
+        plan = cls.get_query_plan(info, columns)
         queryset = cls._meta.model.objects.all()
+        if plan.select_related:
+            queryset = queryset.select_related(*plan.select_related)
+        if plan.prefetch_related:
+            queryset = queryset.prefetch_related(*plan.prefetch_related)
+        return queryset.only(*plan.only)
+
+    @classmethod
+    def get_query_plan(cls, info, columns: Iterable[str] = ()) -> QueryPlan:
+        """
+        Return plan of queryset for the field, reusing plan created for the same AST of the field before
+        """
+        key_columns = tuple(columns)
+        return query_plans.get((cls, info.field_asts[0], key_columns),
+                               lambda: cls.create_query_plan(info, key_columns))
+
+    @classmethod
+    def create_query_plan(cls, info, columns: Tuple[str, ...]) -> QueryPlan:
+        model = cls._meta.model
         fields = cls.select_foreign_keys() + cls.select_o2o_related_objects()
         fields_m2m = cls.select_m2m_fields()
         selections = cls.get_selections(info)
-        fields_to_select = cls.convert_selections_to_fields(selections, info)
+        fields_to_select = [to_snake_case(field) for field in cls.convert_selections_to_fields(selections, info)]
+        select_related, prefetch_related = [], []
+        only = get_field_columns(model, fields_to_select + list(columns), cls.field_columns)
 
-        for field_to_select in fields_to_select:
-            field_to_select = to_snake_case(field_to_select)
+        for field_to_select in OrderedDict.fromkeys(fields_to_select):
             if field_to_select in fields:
-                queryset = queryset.select_related(field_to_select)
+                select_related.append(field_to_select)
+                related_model = model._meta.get_field(field_to_select).related_model
+                related_fields = [to_snake_case(field) for field in cls.convert_selections_to_fields(
+                    cls.get_subselections(selections, field_to_select, info), info)]
+                only += [f'{field_to_select}__{column}'
+                         for column in get_field_columns(related_model, related_fields, heavy_only=True)]
             if field_to_select in fields_m2m:
-                queryset = queryset.prefetch_related(field_to_select)
+                prefetch_related.append(field_to_select)
 
-        return queryset
+        return QueryPlan(frozenset(fields_to_select), tuple(select_related), tuple(prefetch_related), tuple(only))
 
     @classmethod
     def convert_selections_to_fields(cls, selections, info):
@@ -81,22 +213,37 @@ class DjangoObjectTypeMixin:
             if isinstance(selection, FragmentSpread):
                 fields += cls.convert_selections_to_fields(
                     info.fragments[selection.name.value].selection_set.selections, info)
+            elif isinstance(selection, InlineFragment):
+                fields += cls.convert_selections_to_fields(selection.selection_set.selections, info)
             else:
                 fields.append(selection.name.value)
         return fields
 
+    @classmethod
+    def get_subselections(cls, selections, field: str, info) -> List[Any]:
+        """
+        Return selections of all occurrences of field among selections, including fragments
+        """
+        subselections = []  # type: List[Any]
+        for selection in selections:
+            if isinstance(selection, FragmentSpread):
+                subselections += cls.get_subselections(
+                    info.fragments[selection.name.value].selection_set.selections, field, info)
+            elif isinstance(selection, InlineFragment):
+                subselections += cls.get_subselections(selection.selection_set.selections, field, info)
+            elif to_snake_case(selection.name.value) == field and selection.selection_set:
+                subselections += selection.selection_set.selections
+        return subselections
+
     @classmethod
     def get_selections(cls, info):
         selections = [info.field_asts[0]]
         found = False
         i = 0
-        while True:
+        while i < len(selections):
             if selections[i].selection_set is None:
-                if i >= len(selections):
-                    break
-                else:
-                    i += 1
-                    continue
+                i += 1
+                continue
 
             if selections[i].name.value in [cls._meta.model._meta.model_name, 'node']:
                 found = True
@@ -126,10 +273,19 @@ class DjangoObjectTypeMixin:
 
 
 class CountableConnectionBase(graphene.relay.Connection):
+    """
+    Connection with total amount of objects, counted only if requested, see cinemanio.api.counts
+    """
+
     class Meta:
         abstract = True
 
-    total_count = graphene.Int()
+    total_count = graphene.Int(approximate=graphene.Boolean(default_value=False))
 
-    def resolve_total_count(self, _):
-        return self.iterable.count()
+    def resolve_total_count(self, _, approximate=False):
+        if isinstance(self.iterable, PartitionSlice):
+            return self.iterable.total
+        if isinstance(self.iterable, list):
+            # nested connections resolved by loaders
+            return len(self.iterable)
+        return get_count(self.iterable, approximate)
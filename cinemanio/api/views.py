@@ -0,0 +1,116 @@
+import json
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from graphene_django.views import GraphQLView as GraphQLViewBase, HttpError
+from graphql.execution import ExecutionResult
+
+from cinemanio.api import cache
+from cinemanio.api.backend import backend
+from cinemanio.api.models import PersistedQuery
+
+
+class GraphQLView(GraphQLViewBase):
+    """
+    GraphQL view reusing parsed and validated documents between requests.
+    Support persisted queries: document could be requested by sha256 hash in `id` parameter
+    or in `extensions.persistedQuery.sha256Hash` (Apollo Automatic Persisted Queries).
+    Ad-hoc and automatically registered documents are rejected if settings.GRAPHQL_PERSISTED_QUERIES_ONLY is True.
+    Results of queries of anonymous users are cached, see cinemanio.api.cache.
+    Cost of query is reported in extensions of response, see cinemanio.api.cost
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('backend', backend)
+        super().__init__(**kwargs)
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, query_id = super().get_graphql_params(request, data)
+        query_id = self.get_persisted_query_id(request, data) or query_id
+
+        if query_id:
+            query = self.get_persisted_query(query_id, query)
+        elif query and settings.GRAPHQL_PERSISTED_QUERIES_ONLY:
+            raise HttpError(HttpResponseForbidden("Only persisted queries are allowed."))
+
+        return query, variables, operation_name, query_id
+
+    @staticmethod
+    def get_persisted_query_id(request, data):
+        extensions = request.GET.get('extensions') or data.get('extensions') or {}
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        return (extensions.get('persistedQuery') or {}).get('sha256Hash')
+
+    @staticmethod
+    def get_persisted_query(query_id, query):
+        """
+        Return document by hash: persisted query loaded from manifest or, if ad-hoc queries are allowed,
+        document registered automatically. Register provided document automatically if ad-hoc queries are allowed
+        """
+        document = PersistedQuery.objects.get_document(query_id)
+        if document is not None:
+            return document
+        if settings.GRAPHQL_PERSISTED_QUERIES_ONLY:
+            raise HttpError(HttpResponse("PersistedQueryNotFound"))
+
+        document = cache.get_automatic_query(query_id)
+        if document is not None:
+            return document
+
+        if query:
+            try:
+                PersistedQuery.objects.validate_document(query, query_id)
+            except ValueError as e:
+                raise HttpError(HttpResponseBadRequest(str(e)))
+            cache.set_automatic_query(query_id, query)
+            return query
+
+        raise HttpError(HttpResponse("PersistedQueryNotFound"))
+
+    def get_response(self, request, data, show_graphiql=False):
+        """
+        Build response the same way as original view does, add extensions of execution result, like query cost
+        """
+        query, variables, operation_name, query_id = self.get_graphql_params(request, data)
+        result = self.execute_graphql_request(request, data, query, variables, operation_name, show_graphiql)
+        if not result:
+            return None, 200
+
+        status_code = 400 if result.invalid else 200
+        response = result.to_dict(format_error=self.format_error, dict_class=dict)
+        if result.extensions:
+            response['extensions'] = result.extensions
+        if self.batch:
+            response['id'] = query_id
+            response['status'] = status_code
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, *args, **kwargs):
+        if not query or not self.is_cacheable(request, query, operation_name):
+            return super().execute_graphql_request(request, data, query, variables, operation_name, *args, **kwargs)
+
+        key = cache.get_response_key(query, variables, operation_name)
+        response = cache.get_response(key)
+        if response is not None:
+            return ExecutionResult(data=response)
+
+        result = super().execute_graphql_request(request, data, query, variables, operation_name, *args, **kwargs)
+        if result and not result.errors and not result.invalid:
+            cache.set_response(key, result.data)
+        return result
+
+    def is_cacheable(self, request, query, operation_name) -> bool:
+        """
+        Cache only queries of anonymous users: request without JWT token in Authorization header
+        """
+        if not request.user.is_anonymous or request.META.get('HTTP_AUTHORIZATION'):
+            return False
+        try:
+            document = self.get_backend(request).document_from_string(self.schema, query)
+        except Exception:  # pylint: disable=broad-except
+            return False
+        return document.get_operation_type(operation_name) == 'query'
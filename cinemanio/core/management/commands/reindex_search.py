@@ -0,0 +1,44 @@
+from typing import List, Type  # noqa
+
+from django.core.management.base import BaseCommand
+from django.db.models import Model
+
+from cinemanio.core.models import Movie, Person
+from cinemanio.core.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild search index of the whole catalog: search texts of movies and persons,
+    when rules of normalization or transliteration are changed, and index of search backend.
+    Objects are streamed from DB and indexed by chunks
+    """
+    help = 'Rebuild search texts and search index of movies and persons'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of objects indexed at once')
+
+    def handle(self, *args, **options):
+        self.backend = get_search_backend()
+        chunk_size = options['chunk_size']
+        for model in [Movie, Person]:
+            count = 0
+            chunk = []  # type: List[Model]
+            for instance in model.objects.order_by('id').iterator(chunk_size=chunk_size):
+                chunk.append(instance)
+                if len(chunk) == chunk_size:
+                    count += self.index(model, chunk)
+                    chunk = []
+            count += self.index(model, chunk)
+            self.stdout.write(self.style.SUCCESS(f'Reindexed {count} {model._meta.verbose_name_plural}'))
+
+    def index(self, model: Type[Model], objects: List[Model]) -> int:
+        stale = []
+        for instance in objects:
+            search_text = instance.get_search_text()
+            if instance.search_text != search_text:
+                instance.search_text = search_text
+                stale.append(instance)
+        model.objects.bulk_update(stale, ['search_text'])
+        self.backend.update(model, objects)
+        return len(objects)
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+# fields of primary image of models and type of images they refer to: POSTER, PHOTO
+PRIMARY_IMAGE_FIELDS = (
+    ('movie', 'poster', 1),
+    ('person', 'photo', 2),
+)
+
+
+def set_primary_images(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    ImageLink = apps.get_model('images', 'ImageLink')
+    for model_name, field, image_type in PRIMARY_IMAGE_FIELDS:
+        model = apps.get_model('core', model_name)
+        try:
+            content_type = ContentType.objects.get(app_label='core', model=model_name)
+        except ContentType.DoesNotExist:
+            continue
+        links = (ImageLink.objects.filter(content_type=content_type, image__type=image_type)
+                 .order_by('object_id', 'id').values_list('object_id', 'image_id'))
+        primary_images = {}
+        for object_id, image_id in links:
+            primary_images.setdefault(object_id, image_id)
+        for object_id, image_id in primary_images.items():
+            model.objects.filter(pk=object_id).update(**{f'{field}_id': image_id})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0001_initial'),
+        ('core', '0013_cast_sources'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='poster',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='images.Image', verbose_name='Poster'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='photo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='images.Image', verbose_name='Photo'),
+        ),
+        migrations.RunPython(set_primary_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# searchable texts of tables: columns joined by space, the same as search_fields of models
+SEARCH_FIELDS = (
+    ('core_movie', (('title',), ('title_en',), ('title_ru',), ('title_original',))),
+    ('core_person', (('first_name', 'last_name'), ('first_name_en', 'last_name_en'),
+                     ('first_name_ru', 'last_name_ru'))),
+)
+SEPARATOR = " || ' ' || "
+
+
+def get_expression(columns):
+    return SEPARATOR.join(f'coalesce("{column}", \'\')' for column in columns)
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    Create GIN indexes for full text search and trigram similarity, used by PostgresSearchBackend
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, fields in SEARCH_FIELDS:
+        expressions = [get_expression(columns) for columns in fields]
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {table}_search_vector ON "{table}" '
+                              f"USING gin (to_tsvector('simple', {SEPARATOR.join(expressions)}))")
+        for columns, expression in zip(fields, expressions):
+            schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {table}_{columns[-1]}_trigram ON "{table}" '
+                                  f'USING gin (({expression}) gin_trgm_ops)')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, fields in SEARCH_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_vector')
+        for columns in fields:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{columns[-1]}_trigram')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_primary_images'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
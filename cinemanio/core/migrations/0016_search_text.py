@@ -0,0 +1,118 @@
+import re
+from importlib import import_module
+
+from django.db import migrations, models
+from transliterate.base import TranslitLanguagePack
+
+# searchable fields of tables: columns joined by space, the same as search_fields of models
+SEARCH_FIELDS = (
+    ('movie', (('title',), ('title_en',), ('title_ru',), ('title_original',))),
+    ('person', (('first_name', 'last_name'), ('first_name_en', 'last_name_en'), ('first_name_ru', 'last_name_ru'))),
+)
+CHUNK_SIZE = 1000
+previous = import_module('cinemanio.core.migrations.0015_search_indexes')
+
+# frozen copy of normalization of search text, see cinemanio.core.search.get_search_text()
+CYRILLIC = re.compile('[а-яё]', re.IGNORECASE)
+SEARCH_TEXT_FOLDING = str.maketrans({'ё': 'е', 'й': 'и', 'ъ': None, 'ь': None, 'y': 'i'})
+
+
+class RussianLanguagePack(TranslitLanguagePack):
+    """
+    Frozen copy of cinemanio.core.translit.ru.RussianLanguagePack, it's used without registration
+    """
+    language_code = 'ru-search-text-0016'
+    language_name = 'Russian'
+    character_ranges = ((0x0400, 0x04FF), (0x0500, 0x052F))
+    mapping = (
+        'abvgdeziyklmnoprstufhcCABVGDEZIYKLMNOPRSTUFH',
+        'абвгдезийклмнопрстуфхцЦАБВГДЕЗИЙКЛМНОПРСТУФХ',
+    )
+    reversed_specific_mapping = ('эЭыЫ', 'eEyY')
+    pre_processor_mapping = {
+        'yo': 'ё', 'Yo': 'Ё', 'iy': 'ий', 'zh': 'ж', 'ts': 'ц', 'ch': 'ч', 'sh': 'ш', 'sch': 'щ', 'yu': 'ю',
+        'ya': 'я', 'kh': 'х', 'Zh': 'Ж', 'Ts': 'Ц', 'Ch': 'Ч', 'Sh': 'Ш', 'Sch': 'Щ', 'Yu': 'Ю', 'Ya': 'Я',
+        'Kh': 'Х',
+    }
+    reversed_specific_pre_processor_mapping = {'ъ': '', 'Ъ': '', 'ь': '', 'Ь': ''}
+
+
+def normalize_search_text(text):
+    text = re.sub(r'[\W_]+', ' ', text.lower().translate(SEARCH_TEXT_FOLDING))
+    return ' '.join(re.sub('ii+', 'i', re.sub('ии+', 'и', text)).split())
+
+
+def get_search_text(values):
+    language_pack = RussianLanguagePack()
+    forms = []
+    for value in values:
+        value = normalize_search_text(value or '')
+        if not value:
+            continue
+        transliteration = language_pack.translit(value, reversed=bool(CYRILLIC.search(value)))
+        for form in (value, normalize_search_text(transliteration)):
+            if form not in forms:
+                forms.append(form)
+    return '\n' + '\n'.join(forms) + '\n' if forms else ''
+
+
+def update_search_texts(apps, schema_editor):
+    """
+    Fill search text of existing movies and persons
+    """
+    for model_name, fields in SEARCH_FIELDS:
+        model = apps.get_model('core', model_name)
+        columns = sorted({column for columns in fields for column in columns})
+        ids = list(model.objects.order_by('id').values_list('id', flat=True))
+        for i in range(0, len(ids), CHUNK_SIZE):
+            objects = list(model.objects.only(*columns).filter(id__in=ids[i:i + CHUNK_SIZE]))
+            for obj in objects:
+                obj.search_text = get_search_text(' '.join(filter(None, [getattr(obj, column) for column in names]))
+                                                  for names in fields)
+            model.objects.bulk_update(objects, ['search_text'])
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    Replace GIN indexes of every searchable expression by indexes of the single search_text column
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    previous.drop_search_indexes(apps, schema_editor)
+    for model_name, _ in SEARCH_FIELDS:
+        table = f'core_{model_name}'
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {table}_search_vector ON "{table}" '
+                              f"USING gin (to_tsvector('simple', search_text))")
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {table}_search_trigram ON "{table}" '
+                              f'USING gin (search_text gin_trgm_ops)')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, _ in SEARCH_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS core_{model_name}_search_vector')
+        schema_editor.execute(f'DROP INDEX IF EXISTS core_{model_name}_search_trigram')
+    previous.create_search_indexes(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='search_text',
+            field=models.TextField(default='', editable=False, verbose_name='Search text'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='search_text',
+            field=models.TextField(default='', editable=False, verbose_name='Search text'),
+        ),
+        migrations.RunPython(update_search_texts, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,5 +1,6 @@
 from .cast import Cast
 from .movie import Movie
+from .outbox import SearchOutbox
 from .person import Person, Gender
 from .role import Role
 from .properties import Country, Genre, Language
@@ -13,4 +14,5 @@ __all__ = [
     'Genre',
     'Language',
     'Gender',
+    'SearchOutbox',
 ]
@@ -1,17 +1,19 @@
-from typing import Iterator, TYPE_CHECKING
+from typing import TYPE_CHECKING
 
-from algoliasearch_django import raw_search
-from django.db import models
+from django.db import connections, models
+from django.db.models import Case, Expression, F, Func, IntegerField, Value, When
 from django.utils.translation import ugettext_lazy as _
 from transliterate import translit
 from transliterate.base import registry
 
 from cinemanio.api.helpers import global_id
+from cinemanio.core.models.outbox import SearchOutbox
+from cinemanio.core.search import SearchResults, get_search_backend, get_search_text
 from cinemanio.core.translit.ru import RussianLanguagePack
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet  # noqa
-    from typing import Iterable, List  # noqa
+    from typing import List, Optional  # noqa
 
 registry.register(RussianLanguagePack)
 
@@ -26,16 +28,44 @@ class BaseModel(models.Model):
     site_official_url = models.URLField(_('Official site'), null=True, blank=True)
     site_fan_url = models.URLField(_('Fan site'), null=True, blank=True)
 
+    # normalized texts of search_fields with transliterations, see cinemanio.core.search.get_search_text
+    search_text = models.TextField(_('Search text'), default='', editable=False)
+
     class Meta:
         abstract = True
 
     def __str__(self):
         return repr(self)
 
+    def save(self, *args, **kwargs):
+        self.search_text = self.get_search_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'search_text' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['search_text']
+        super().save(*args, **kwargs)
+        SearchOutbox.objects.add([self])
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        SearchOutbox.objects.add([type(self)(pk=pk)])
+        return result
+
     @property
     def global_id(self):
         return global_id(self)
 
+    @property
+    def search_fields(self):
+        raise NotImplementedError()
+
+    def get_search_text(self) -> str:
+        """
+        Return search text of search_fields: every item is a tuple of fields joined by space
+        """
+        return get_search_text(' '.join(filter(None, [getattr(self, field) for field in fields]))
+                               for fields in self.search_fields)
+
     @property
     def transliteratable_fields(self):
         raise NotImplementedError()
@@ -61,54 +91,129 @@ class BaseModel(models.Model):
                             setattr(self, field_en, value_translit)
 
 
+class ArrayPosition(Func):
+    function = 'array_position'
+
+
 class BaseQuerySet(models.QuerySet):
     """
     Base queryset for Movie and Person
     """
+    search_term = None  # type: Optional[str]
     search_result_ids = []  # type: List[int]
 
     def search(self, term: str) -> 'QuerySet':
         """
-        Search by term using algolia search engine, filter results using ids from DB
+        Search by term using search backend from settings.SEARCH_BACKEND. Search is deferred until queryset is
+        sliced, counted or evaluated, so all filters are taken into account. Results are ordered by relevance,
+        ids of them are fetched from backend page by page, see cinemanio.core.search.SearchResults
         :param term: search term
         :return:
         """
-        params = {"hitsPerPage": 100}
-        response = raw_search(self.model, term, params)
-        self.search_result_ids = [hit['objectID'] for hit in response['hits']]
-        return self.filter(id__in=self.search_result_ids)
+        obj = self._chain()
+        obj.search_term = term
+        return obj
 
-    def _chain(self, **kwargs) -> 'QuerySet':
+    def without_search(self) -> 'QuerySet':
+        obj = self._chain()
+        obj.search_term = None
+        obj.search_result_ids = []
+        return obj
+
+    def get_search_results(self) -> SearchResults:
+        if self.search_term is None:
+            raise ValueError("Queryset is not searched by term")
+        return SearchResults(self.without_search(), self.search_term)
+
+    def filter_by_search(self) -> 'QuerySet':
         """
-        Preserve search results order from old queryset to new
+        Return queryset filtered by search term without ordering by relevance
         """
-        obj = super()._chain(**kwargs)
-        obj.search_result_ids = self.search_result_ids
-        return obj
+        if self.search_term is None:
+            return self
+        return get_search_backend().filter(self.without_search(), self.search_term)
 
-    def order_by(self, *field_names):
+    def filter_by_search_result_ids(self, ids: 'List[int]') -> 'QuerySet':
         """
-        Flush search results order, when another order provided
+        Return queryset filtered by ids of search results and ordered by their positions in DB
         """
-        obj = super().order_by(*field_names)
-        obj.search_result_ids = []
-        return obj
+        obj = self.without_search().filter(pk__in=ids)
+        obj.search_result_ids = ids
+        # bypass self.order_by(), it flushes search results
+        return super(BaseQuerySet, obj).order_by(obj.get_search_ordering(), 'pk')
+
+    def get_search_ordering(self) -> Expression:
+        """
+        Return expression of position of row in search results
+        """
+        if connections[self.db].vendor == 'postgresql':
+            return ArrayPosition(Value(self.search_result_ids), F('pk'), output_field=IntegerField())
+        return Case(*[When(pk=pk, then=Value(position)) for position, pk in enumerate(self.search_result_ids)],
+                    output_field=IntegerField())
+
+    def __getitem__(self, k):
+        """
+        Fetch ids of requested slice of search results from backend, return queryset of them ordered by relevance
+        """
+        if self.search_term is None or self._result_cache is not None:
+            return super().__getitem__(k)
+        if isinstance(k, slice):
+            if k.step is not None or (k.start or 0) < 0 or (k.stop or 0) < 0:
+                raise ValueError("Only positive slices without step are supported for search results")
+            return self.filter_by_search_result_ids(self.get_search_results().get_ids(k.start or 0, k.stop))
+        return list(self[k:k + 1])[0]
+
+    def _fetch_all(self):
+        if self.search_term is not None and self._result_cache is None:
+            self._result_cache = list(self[0:None])
+            self._prefetch_done = True
+        super()._fetch_all()
+
+    def count(self) -> int:
+        """
+        Return total amount of search results reported by backend without fetching ids of them
+        """
+        if self.search_term is not None and self._result_cache is None:
+            return self.get_search_results().count()
+        return super().count()
+
+    def exists(self) -> bool:
+        return super(BaseQuerySet, self.filter_by_search()).exists()
+
+    def aggregate(self, *args, **kwargs):
+        return super(BaseQuerySet, self.filter_by_search()).aggregate(*args, **kwargs)
+
+    def update(self, **kwargs):
+        return super(BaseQuerySet, self.filter_by_search()).update(**kwargs)
+
+    def delete(self):
+        return super(BaseQuerySet, self.filter_by_search()).delete()
+
+    def iterator(self, chunk_size=2000):
+        if self.search_term is not None:
+            return iter(self)
+        return super().iterator(chunk_size)
 
     @property
     def ordered(self) -> bool:
         """
-        Return True if search results defined or use regular Django logic
+        Return True if results are ordered by relevance of search or use regular Django logic
         """
-        return bool(self.search_result_ids) or super().ordered
+        return self.search_term is not None or super().ordered
 
-    def __iter__(self) -> Iterator[models.Model]:
+    def _chain(self, **kwargs) -> 'QuerySet':
         """
-        Sort results using search results order if it's defined
+        Preserve search term and results from old queryset to new
         """
-        self._fetch_all()
-        if self.search_result_ids:
-            self._result_cache = sorted(self._result_cache, key=self.search_sort_helper)  # type: Iterable[models.Model]
-        return iter(self._result_cache)
+        obj = super()._chain(**kwargs)
+        obj.search_term = self.search_term
+        obj.search_result_ids = self.search_result_ids
+        return obj
 
-    def search_sort_helper(self, i):
-        return self.search_result_ids.index(i.id if isinstance(i, models.Model) else i)
+    def order_by(self, *field_names):
+        """
+        Flush ordering by relevance of search results, when another order provided
+        """
+        obj = super(BaseQuerySet, self.filter_by_search()).order_by(*field_names)
+        obj.search_result_ids = []
+        return obj
@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
+from cinemanio.core.models.outbox import SearchOutbox
+
 
 class Cast(models.Model):
     """
@@ -38,6 +40,12 @@ class Cast(models.Model):
         if self.role.id not in [Role.ACTOR_ID, Role.ACTOR_VOICE_ID]:
             self.name = ''
         super().save(*args, **kwargs)
+        SearchOutbox.objects.add([self.movie, self.person])
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        SearchOutbox.objects.add([self.movie, self.person])
+        return result
 
     def set_source(self, value):
         new_value = set(self.get_sources())
@@ -39,6 +39,7 @@ class Movie(BaseModel):
     """
     YEARS_RANGE = (1894, timezone.now().year + 10)
     transliteratable_fields = ['title']
+    search_fields = [('title',), ('title_en',), ('title_ru',), ('title_original',)]
 
     title = models.CharField(_('Title'), max_length=200, default='')
     title_original = models.CharField(_('Title original'), max_length=200, default='')
@@ -65,6 +66,10 @@ class Movie(BaseModel):
                                    null=True, on_delete=models.CASCADE)
     novel_isbn = models.IntegerField(_('ISBN'), blank=True, null=True)
 
+    # primary image among linked posters, maintained by ImageLink
+    poster = models.ForeignKey('images.Image', verbose_name=_('Poster'), related_name='+', blank=True, null=True,
+                               on_delete=models.SET_NULL)
+
     objects = MovieQuerySet.as_manager()
 
     class Meta:
@@ -0,0 +1,37 @@
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.utils.translation import ugettext_lazy as _
+
+
+class SearchOutboxManager(models.Manager):
+    def add(self, instances: Iterable[models.Model]) -> None:
+        """
+        Record changes of instances and schedule indexing of them, if search indexing is turned on
+        """
+        if not settings.SEARCH_INDEXING['ENABLED']:
+            return
+        from cinemanio.core.tasks import schedule_search_indexing
+        self.bulk_create([self.model(content_type=ContentType.objects.get_for_model(instance), object_id=instance.pk)
+                          for instance in instances])
+        transaction.on_commit(schedule_search_indexing)
+
+
+class SearchOutbox(models.Model):
+    """
+    Changed movie or person waiting for indexing by search backend, see cinemanio.core.tasks.index_search_outbox
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField(_('Created at'), auto_now_add=True)
+
+    objects = SearchOutboxManager()
+
+    class Meta:
+        verbose_name = _('search outbox change')
+        verbose_name_plural = _('search outbox changes')
+
+    def __repr__(self):
+        return f'SearchOutbox: {self.content_type_id} {self.object_id}'
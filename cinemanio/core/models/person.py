@@ -20,6 +20,7 @@ class Person(BaseModel):
     Person model
     """
     transliteratable_fields = ['first_name', 'last_name']
+    search_fields = [('first_name', 'last_name'), ('first_name_en', 'last_name_en'), ('first_name_ru', 'last_name_ru')]
 
     first_name = models.CharField(_('First name'), max_length=50, db_index=True)
     last_name = models.CharField(_('Last name'), max_length=50, db_index=True)
@@ -34,6 +35,10 @@ class Person(BaseModel):
                                 on_delete=models.CASCADE)
     movies = models.ManyToManyField('Movie', verbose_name=_('Movies'), through='Cast')
 
+    # primary image among linked photos, maintained by ImageLink
+    photo = models.ForeignKey('images.Image', verbose_name=_('Photo'), related_name='+', blank=True, null=True,
+                              on_delete=models.SET_NULL)
+
     objects = PersonQuerySet.as_manager()
 
     class Meta:
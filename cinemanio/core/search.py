@@ -0,0 +1,253 @@
+from hashlib import sha256
+import json
+import re
+from typing import Any, Callable, Iterable, List, Optional, Set, Type, TYPE_CHECKING, Union  # noqa
+
+from algoliasearch_django import algolia_engine, get_adapter, raw_search
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from transliterate import translit
+
+from cinemanio.api.cache import get_cache, get_tags_versions
+from cinemanio.core.translit.ru import RussianLanguagePack  # noqa, register language pack
+
+if TYPE_CHECKING:
+    from django.db.models import Model, QuerySet  # noqa
+
+SEARCH_RESULTS_KEY = 'search:{}'
+CYRILLIC = re.compile('[а-яё]', re.IGNORECASE)
+# letters transliterated ambiguously are folded to the same letter in texts and terms, like voina, voyna and война,
+# repeated i and и are collapsed after that
+SEARCH_TEXT_FOLDING = str.maketrans({'ё': 'е', 'й': 'и', 'ъ': None, 'ь': None, 'y': 'i'})
+
+
+def get_search_backend() -> 'SearchBackend':
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def normalize_term(term: str) -> str:
+    return ' '.join(term.lower().split())
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Lowercase text, fold ambiguously transliterated letters and remove punctuation,
+    so Dmitriy, Dmitry and Дмитрий become dmitri and дмитри
+    """
+    text = re.sub(r'[\W_]+', ' ', text.lower().translate(SEARCH_TEXT_FOLDING))
+    return ' '.join(re.sub('ii+', 'i', re.sub('ии+', 'и', text)).split())
+
+
+def get_search_text(values: Iterable[str]) -> str:
+    """
+    Return search text of values: normalized values with their transliterations from Cyrillic to Latin alphabet
+    and back on separate lines, so term in any alphabet is found by one lookup
+    """
+    forms = []  # type: List[str]
+    for value in values:
+        value = normalize_search_text(value or '')
+        if not value:
+            continue
+        transliteration = translit(value, 'ru', reversed=True) if CYRILLIC.search(value) else translit(value, 'ru')
+        for form in (value, normalize_search_text(transliteration)):
+            if form not in forms:
+                forms.append(form)
+    return '\n' + '\n'.join(forms) + '\n' if forms else ''
+
+
+class SearchBackend:
+    """
+    Search backend returns ids of objects of queryset found by term, ordered by relevance, page by page
+    """
+
+    def search(self, queryset: 'QuerySet', term: str, offset: int, limit: int) -> List[int]:
+        raise NotImplementedError()
+
+    def count(self, queryset: 'QuerySet', term: str) -> int:
+        raise NotImplementedError()
+
+    def filter(self, queryset: 'QuerySet', term: str) -> 'QuerySet':
+        """
+        Return queryset filtered by term without ordering by relevance.
+        Engines, that can't filter in DB, return first settings.SEARCH_RESULTS_LIMIT found objects
+        """
+        return queryset.filter(pk__in=self.search(queryset, term, 0, settings.SEARCH_RESULTS_LIMIT))
+
+    def update(self, model: Type['Model'], objects: List['Model']) -> None:
+        """
+        Index changed or created objects of model in bulk
+        """
+
+    def delete(self, model: Type['Model'], ids: Set[int]) -> None:
+        """
+        Remove deleted objects of model from index in bulk
+        """
+
+
+class AlgoliaSearchBackend(SearchBackend):
+    """
+    Search using Algolia search engine, filters of queryset are applied to found objects after that.
+    Records of registered models are sent to Algolia index in bulk by outbox, see cinemanio.core.tasks
+    """
+
+    def search(self, queryset, term, offset, limit):
+        response = raw_search(queryset.model, term, {'offset': offset, 'length': limit})
+        # Algolia returns IDs of objects as strings
+        return [int(hit['objectID']) for hit in response['hits']]
+
+    def count(self, queryset, term):
+        return raw_search(queryset.model, term, {'hitsPerPage': 0})['nbHits']
+
+    def update(self, model, objects):
+        if algolia_engine.is_registered(model) and objects:
+            adapter = get_adapter(model)
+            algolia_engine.client.init_index(adapter.index_name).save_objects(
+                [adapter.get_raw_record(instance) for instance in objects])
+
+    def delete(self, model, ids):
+        if algolia_engine.is_registered(model) and ids:
+            adapter = get_adapter(model)
+            algolia_engine.client.init_index(adapter.index_name).delete_objects(
+                [adapter.objectID(model(pk=pk)) for pk in ids])
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """
+    Search backend filtering and ranking objects in DB by search_text column, so all filters of queryset
+    are taken into account. Term is normalized the same way as search text, see get_search_text().
+    Search text is written by save() of model and DB maintains indexes of it, so there is nothing to update
+    """
+
+    def search(self, queryset, term, offset, limit):
+        term = normalize_search_text(term)
+        if not term:
+            return []
+        return list(self.get_queryset(queryset, term).values_list('pk', flat=True)[offset:offset + limit])
+
+    def count(self, queryset, term):
+        return self.filter(queryset, term).count()
+
+    def filter(self, queryset, term):
+        # term of punctuation only matches nothing, instead of every object
+        term = normalize_search_text(term)
+        if not term:
+            return queryset.none()
+        return self.filter_normalized(queryset, term)
+
+    def filter_normalized(self, queryset: 'QuerySet', term: str) -> 'QuerySet':
+        raise NotImplementedError()
+
+    def get_queryset(self, queryset: 'QuerySet', term: str) -> 'QuerySet':
+        """
+        Return queryset filtered by term and ordered by relevance
+        """
+        raise NotImplementedError()
+
+
+class PostgresSearchBackend(DatabaseSearchBackend):
+    """
+    Search in PostgreSQL database using full text search by words and trigram word similarity for misspelled terms.
+    Expressions of queries are the same as expressions of GIN indexes created by migrations,
+    see cinemanio.core.migrations.0016_search_text
+    """
+    config = 'simple'
+
+    def get_column(self, queryset) -> str:
+        return f'"{queryset.model._meta.db_table}"."search_text"'
+
+    def get_vector(self, queryset) -> str:
+        return f"to_tsvector('{self.config}', {self.get_column(queryset)})"
+
+    def get_query(self) -> str:
+        return f"plainto_tsquery('{self.config}', %s)"
+
+    def filter_normalized(self, queryset, term):
+        # <% is a trigram word similarity operator, % is doubled to escape it from params formatting
+        where = f'{self.get_vector(queryset)} @@ {self.get_query()} OR %s <%% {self.get_column(queryset)}'
+        # SQL is formatted with name of table and constant config only, term is passed as param
+        return queryset.extra(where=[where], params=[term, term])  # nosec
+
+    def get_queryset(self, queryset, term):
+        """
+        Return queryset filtered by term and ordered by rank of full text search and trigram word similarity
+        """
+        rank = f'ts_rank({self.get_vector(queryset)}, {self.get_query()}) ' \
+            f'+ word_similarity(%s, {self.get_column(queryset)})'
+        # SQL is formatted with name of table and constant config only, term is passed as param
+        search_rank = RawSQL(rank, [term, term])  # nosec
+        return self.filter_normalized(queryset, term).annotate(search_rank=search_rank).order_by('-search_rank', 'pk')
+
+
+class SimpleSearchBackend(DatabaseSearchBackend):
+    """
+    Search using substring lookups in search text in any database without indexes, for development and tests.
+    Exact matches of any of texts go first, then matches by prefix, then others
+    """
+
+    def filter_normalized(self, queryset, term):
+        return queryset.filter(search_text__contains=term)
+
+    def get_queryset(self, queryset, term):
+        rank = Case(When(search_text__contains=f'\n{term}\n', then=Value(3)),
+                    When(search_text__contains=f'\n{term}', then=Value(2)),
+                    default=Value(1), output_field=IntegerField())
+        return self.filter_normalized(queryset, term).annotate(search_rank=rank).order_by('-search_rank', 'pk')
+
+
+class SearchResults:
+    """
+    Ids of objects of queryset found by term. Ids are fetched from search backend page by page, when they are
+    requested, pages and total amount of results are cached in the shared cache per normalized term, filters
+    of queryset and versions of tags of changed objects for settings.SEARCH_CACHE_TIMEOUT seconds,
+    so paginating client queries backend once per page
+    """
+
+    def __init__(self, queryset: 'QuerySet', term: str, backend: Optional[SearchBackend] = None):
+        self.queryset = queryset
+        self.term = normalize_term(term)
+        self.backend = backend or get_search_backend()
+        self.page_size = settings.SEARCH_PAGE_SIZE
+        self.key = self.get_key()
+
+    def get_key(self) -> str:
+        try:
+            sql = str(self.queryset.order_by().values('pk').query)
+        except EmptyResultSet:
+            sql = ''
+        signature = json.dumps([type(self.backend).__name__, self.queryset.model._meta.label, sql, self.term,
+                                get_tags_versions()])
+        return SEARCH_RESULTS_KEY.format(sha256(signature.encode('utf-8')).hexdigest())
+
+    def get_cached(self, name: Union[str, int], fetch: Callable[[], Any]):
+        key = f'{self.key}:{name}'
+        value = get_cache().get(key)
+        if value is None:
+            value = fetch()
+            get_cache().set(key, value, timeout=settings.SEARCH_CACHE_TIMEOUT)
+        return value
+
+    def count(self) -> int:
+        return self.get_cached('count', lambda: self.backend.count(self.queryset, self.term))
+
+    def get_page(self, number: int) -> List[int]:
+        return self.get_cached(number, lambda: self.backend.search(self.queryset, self.term,
+                                                                   number * self.page_size, self.page_size))
+
+    def get_ids(self, start: int = 0, stop: Optional[int] = None) -> List[int]:
+        """
+        Return ids of results from start to stop position, fetch only pages covering them
+        """
+        if stop is None:
+            stop = self.count()
+        ids = []  # type: List[int]
+        first_page = start // self.page_size
+        for number in range(first_page, (stop - 1) // self.page_size + 1):
+            page = self.get_page(number)
+            ids += page
+            if len(page) < self.page_size:
+                break
+        offset = first_page * self.page_size
+        return ids[start - offset:stop - offset]
@@ -0,0 +1,49 @@
+from collections import defaultdict
+from typing import Dict, Set  # noqa
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+
+from cinemanio.api.cache import get_cache
+from cinemanio.celery import app
+from cinemanio.core.models import SearchOutbox
+from cinemanio.core.search import get_search_backend
+
+# flag of scheduled indexing is kept in the cache shared by all processes
+SCHEDULED_SEARCH_INDEXING_KEY = 'search:indexing:scheduled'
+
+
+def schedule_search_indexing() -> None:
+    """
+    Schedule indexing of search outbox once per settings.SEARCH_INDEXING['DELAY'] seconds,
+    so changes of many objects made by sync of a site are indexed together
+    """
+    delay = settings.SEARCH_INDEXING['DELAY']
+    if get_cache().add(SCHEDULED_SEARCH_INDEXING_KEY, True, timeout=delay):
+        index_search_outbox.apply_async(countdown=delay)
+
+
+@app.task
+def index_search_outbox():
+    """
+    Drain search outbox by batches: repeated changes of the same object are coalesced, existing objects
+    are updated in index of search backend in bulk, missing ones are deleted from it.
+    Changes are removed from the outbox only after they are indexed
+    """
+    # changes made from now on need another run
+    get_cache().delete(SCHEDULED_SEARCH_INDEXING_KEY)
+    backend = get_search_backend()
+    while True:
+        changes = list(SearchOutbox.objects.order_by('id').values_list('id', 'content_type_id', 'object_id')
+                       [:settings.SEARCH_INDEXING['BATCH_SIZE']])
+        if not changes:
+            break
+        changed = defaultdict(set)  # type: Dict[int, Set[int]]
+        for _, content_type_id, object_id in changes:
+            changed[content_type_id].add(object_id)
+        for content_type_id, ids in changed.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            objects = list(model.objects.filter(pk__in=ids))
+            backend.update(model, objects)
+            backend.delete(model, ids - {instance.pk for instance in objects})
+        SearchOutbox.objects.filter(id__in=[change_id for change_id, _, _ in changes]).delete()
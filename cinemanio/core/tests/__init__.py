@@ -1,8 +1,9 @@
 from .models import ModelsTest
 from .admin import AdminTest
 from .factories import FactoriesTest
+from .outbox import SearchOutboxTest
 from .translit import TranslitTest
-from .search import SearchTest
+from .search import SearchTest, SearchResultsTest, SearchBackendsTest
 
 __all__ = [
     'ModelsTest',
@@ -10,4 +11,7 @@ __all__ = [
     'FactoriesTest',
     'TranslitTest',
     'SearchTest',
+    'SearchResultsTest',
+    'SearchBackendsTest',
+    'SearchOutboxTest',
 ]
@@ -1,9 +1,12 @@
+from unittest import mock
+
 from vcr_unittest import VCRMixin as VCRMixinBase
 
 from django.test import TestCase
 from django.utils import translation
 
 from cinemanio.core.models import Role
+from cinemanio.images.downloader import downloader
 
 
 class BaseTestCase(TestCase):
@@ -52,4 +55,12 @@ class BaseTestCase(TestCase):
 
 
 class VCRMixin(VCRMixinBase):
-    pass
+    def setUp(self):
+        super().setUp()
+        # VCR swaps connection classes of urllib3 globally, so parallel downloads race with each other,
+        # and connections pooled by sessions of downloader outlive the cassette of test
+        patcher = mock.patch.object(downloader, 'concurrency', 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        downloader.close()
+        self.addCleanup(downloader.close)
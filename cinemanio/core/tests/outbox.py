@@ -0,0 +1,77 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from cinemanio.api.cache import get_cache
+from cinemanio.core.factories import CastFactory, MovieFactory, PersonFactory
+from cinemanio.core.models import Movie, Person, SearchOutbox
+from cinemanio.core.search import AlgoliaSearchBackend
+from cinemanio.core.tasks import index_search_outbox, schedule_search_indexing
+from cinemanio.core.tests.base import BaseTestCase
+
+
+@override_settings(SEARCH_INDEXING={'ENABLED': True, 'DELAY': 10, 'BATCH_SIZE': 2})
+class SearchOutboxTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+
+    def get_changes(self):
+        return sorted(SearchOutbox.objects.values_list('content_type__model', 'object_id'))
+
+    @override_settings(SEARCH_INDEXING={'ENABLED': False})
+    def test_disabled(self):
+        MovieFactory()
+        self.assertEqual(SearchOutbox.objects.count(), 0)
+
+    def test_changes_written_to_outbox(self):
+        m = MovieFactory()
+        p = PersonFactory()
+        SearchOutbox.objects.all().delete()
+        cast = CastFactory.build(movie=m, person=p)
+        cast.save()
+        m.save()
+        cast.delete()
+        p_id = p.id
+        p.delete()
+        self.assertEqual(self.get_changes(), [('movie', m.id)] * 3 + [('person', p_id)] * 3)
+
+    @mock.patch.object(AlgoliaSearchBackend, 'delete')
+    @mock.patch.object(AlgoliaSearchBackend, 'update')
+    @override_settings(SEARCH_BACKEND='cinemanio.core.search.AlgoliaSearchBackend')
+    def test_index_search_outbox(self, update, delete):
+        m1, m2, m3 = MovieFactory(), MovieFactory(), MovieFactory()
+        p = PersonFactory()
+        p_id = p.id
+        SearchOutbox.objects.all().delete()
+        for instance in [m1, m2, m1, m3, m1, m2, m1]:
+            instance.save()
+        p.delete()
+        self.assertEqual(SearchOutbox.objects.count(), 8)
+
+        with self.assertNumQueries(14):
+            index_search_outbox()
+
+        self.assertEqual(SearchOutbox.objects.count(), 0)
+        # repeated changes of the same object are coalesced within batch of 2 changes
+        updated = [(model, {instance.id for instance in objects}) for (model, objects), _ in update.call_args_list]
+        self.assertEqual(updated, [(Movie, {m1.id, m2.id}), (Movie, {m1.id, m3.id}), (Movie, {m1.id, m2.id}),
+                                   (Movie, {m1.id}), (Person, set())])
+        self.assertEqual(delete.call_args_list[-1], mock.call(Person, {p_id}))
+
+    @mock.patch('cinemanio.core.tasks.index_search_outbox.apply_async')
+    def test_indexing_scheduled_once(self, apply_async):
+        for _ in range(3):
+            schedule_search_indexing()
+        apply_async.assert_called_once_with(countdown=10)
+
+    def test_reindex_command(self):
+        m = MovieFactory(title_en='Godfather')
+        Movie.objects.update(search_text='')
+        with mock.patch('cinemanio.core.search.SimpleSearchBackend.update') as update:
+            call_command('reindex_search', '--chunk-size', '1', stdout=StringIO())
+        m.refresh_from_db()
+        self.assertIn('\ngodfather\n', m.search_text)
+        self.assertEqual(update.call_count, Movie.objects.count() + 1 + Person.objects.count() + 1)
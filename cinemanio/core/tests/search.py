@@ -1,12 +1,26 @@
+from importlib import import_module
+from unittest import mock, skipUnless
+
 from parameterized import parameterized
-from unittest import mock
 
+from django.db import connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from cinemanio.api.cache import get_cache
 from cinemanio.core.factories import MovieFactory, PersonFactory
 from cinemanio.core.models import Movie, Person
+from cinemanio.core.search import PostgresSearchBackend, SimpleSearchBackend, get_search_text
 from cinemanio.core.tests.base import BaseTestCase
 
 
+@override_settings(SEARCH_BACKEND='cinemanio.core.search.AlgoliaSearchBackend')
 class SearchTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # forget search results of previous tests
+        get_cache().clear()
+
     def assert_queryset(self, search, indexes):
         return self.assertListEqual(list(search.values_list('id', flat=True)), [self.instances[i].id for i in indexes])
 
@@ -14,16 +28,16 @@ class SearchTest(BaseTestCase):
         (Movie, MovieFactory),
         (Person, PersonFactory),
     ])
-    @mock.patch('cinemanio.core.models.base.raw_search')
+    @mock.patch('cinemanio.core.search.raw_search')
     def test_search_preserve_order(self, model, factory, raw_search):
         self.instances = []
         for i in range(100):
             self.instances.append(factory())
 
-        raw_search.return_value = {'hits': [
-            {'objectID': self.instances[2].id},
-            {'objectID': self.instances[1].id},
-            {'objectID': self.instances[0].id},
+        raw_search.return_value = {'nbHits': 3, 'hits': [
+            {'objectID': str(self.instances[2].id)},
+            {'objectID': str(self.instances[1].id)},
+            {'objectID': str(self.instances[0].id)},
         ]}
 
         # check search results order
@@ -40,3 +54,142 @@ class SearchTest(BaseTestCase):
         with self.assertNumQueries(1):
             search = model.objects.filter(id__in=[self.instances[0].id, self.instances[2].id]).search('')
             self.assert_queryset(search, [2, 0])
+
+    @mock.patch('cinemanio.core.search.raw_search')
+    def test_search_order_in_database(self, raw_search):
+        self.instances = [MovieFactory() for i in range(5)]
+        raw_search.return_value = {'nbHits': 4, 'hits': [{'objectID': str(self.instances[i].id)} for i in (3, 0, 4, 1)]}
+
+        search = Movie.objects.search('')
+        with self.assertNumQueries(0):
+            self.assertEqual(search.count(), 4)
+        with CaptureQueriesContext(connection) as context:
+            self.assert_queryset(search[1:3], [0, 4])
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(search.first(), self.instances[3])
+        self.assertTrue(search.exists())
+        self.assert_queryset(search.filter(id__lt=self.instances[4].id), [3, 0, 1])
+
+    def test_search_order_expression(self):
+        search = Movie.objects.all()
+        search.search_result_ids = [3, 1]
+        with mock.patch.object(connections['default'], 'vendor', 'postgresql'):
+            ordering = search.get_search_ordering()
+        self.assertEqual(ordering.function, 'array_position')
+        self.assertEqual(ordering.source_expressions[0].value, [3, 1])
+
+
+@override_settings(SEARCH_PAGE_SIZE=2)
+class SearchResultsTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        self.instances = [MovieFactory(title_en=f'Godfather {i}') for i in range(5)]
+        MovieFactory(title_en='Apocalypse Now')
+
+    def assert_queryset(self, search, indexes):
+        return self.assertListEqual(list(search.values_list('id', flat=True)), [self.instances[i].id for i in indexes])
+
+    def test_pages_fetched_when_requested(self):
+        search = Movie.objects.search('GodFather ')
+        with mock.patch.object(SimpleSearchBackend, 'search', wraps=SimpleSearchBackend().search) as backend_search, \
+                mock.patch.object(SimpleSearchBackend, 'count', wraps=SimpleSearchBackend().count) as backend_count:
+            self.assert_queryset(search[3:4], [3])
+            self.assertEqual([call[0][2:] for call in backend_search.call_args_list], [(2, 2)])
+
+            # pages and count are cached per normalized term
+            self.assert_queryset(Movie.objects.search('godfather')[2:5], [2, 3, 4])
+            self.assertEqual(Movie.objects.search('godfather').count(), 5)
+            self.assertEqual([call[0][2:] for call in backend_search.call_args_list], [(2, 2), (4, 2)])
+            self.assertEqual(backend_count.call_count, 1)
+
+            # all results beyond the first page
+            self.assert_queryset(Movie.objects.search('godfather'), [0, 1, 2, 3, 4])
+            self.assertEqual(backend_search.call_count, 3)
+
+    def test_results_invalidated_by_changes(self):
+        self.assertEqual(Movie.objects.search('godfather').count(), 5)
+        with mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func()):
+            MovieFactory(title_en='Godfather 5')
+        self.assertEqual(Movie.objects.search('godfather').count(), 6)
+
+    def test_filters_after_search(self):
+        # factory years are random
+        Movie.objects.update(year=1999)
+        Movie.objects.filter(pk__in=[self.instances[1].pk, self.instances[3].pk]).update(year=2000)
+        search = Movie.objects.search('godfather').filter(year=2000)
+        self.assertEqual(search.count(), 2)
+        self.assert_queryset(search, [1, 3])
+        self.assert_queryset(search.order_by('-id'), [3, 1])
+        self.assertEqual(Movie.objects.search('godfather').order_by('id').count(), 5)
+
+    def test_update_and_delete(self):
+        Movie.objects.search('godfather').filter(pk=self.instances[0].pk).update(year=2000)
+        self.assertEqual(Movie.objects.filter(year=2000).count(), 1)
+        Movie.objects.search('apocalypse').delete()
+        self.assertEqual(Movie.objects.count(), 5)
+
+
+class SearchBackendsTest(BaseTestCase):
+    def test_simple_backend(self):
+        m1 = MovieFactory(title_en='The Godfather Part II', title_ru='Крестный отец 2')
+        m2 = MovieFactory(title_en='Godfather', title_ru='Крестный отец')
+        m3 = MovieFactory(title_en='The Godfather', title_original='Il padrino')
+        MovieFactory(title_en='Apocalypse Now')
+        self.assertEqual(SimpleSearchBackend().search(Movie.objects.all(), 'godfather', 0, 10), [m2.id, m1.id, m3.id])
+        self.assertEqual(SimpleSearchBackend().search(Movie.objects.all(), 'Крестный', 0, 10), [m1.id, m2.id])
+        self.assertEqual(SimpleSearchBackend().search(Movie.objects.exclude(pk=m2.pk), 'godfather', 0, 1), [m1.id])
+        # term of punctuation only
+        self.assertEqual(SimpleSearchBackend().search(Movie.objects.all(), ' - ', 0, 10), [])
+        self.assertEqual(SimpleSearchBackend().count(Movie.objects.all(), '!'), 0)
+
+    def test_simple_backend_person_full_name(self):
+        p = PersonFactory(first_name_en='Francis Ford', last_name_en='Coppola')
+        PersonFactory(first_name_en='Sofia', last_name_en='Coppola')
+        self.assertEqual(list(Person.objects.search('francis ford coppola')), [p])
+
+    def test_simple_backend_transliteration(self):
+        m = MovieFactory(title='', title_en='', title_ru='Война и мир', title_original='')
+        p = PersonFactory(first_name='', last_name='', first_name_en='Dmitriy', last_name_en='Nagiyev',
+                          first_name_ru='', last_name_ru='')
+        MovieFactory(title_en='Apocalypse Now')
+        self.assertEqual(list(Movie.objects.search('voina i mir')), [m])
+        self.assertEqual(list(Movie.objects.search('Voyna i mir')), [m])
+        self.assertEqual(list(Person.objects.search('Дмитрий Нагиев')), [p])
+        self.assertEqual(list(Person.objects.search('nagiev')), [p])
+
+    def test_search_text(self):
+        m = MovieFactory(title='', title_en='War and Peace', title_ru='Война и мир', title_original='')
+        self.assertEqual(m.search_text.strip().split('\n'),
+                         ['war and peace', 'wар анд пеаце', 'воина и мир', 'voina i mir'])
+        # search text is updated with any fields
+        m.title_ru = 'Ёлки'
+        m.save(update_fields=['title_ru'])
+        m.refresh_from_db()
+        self.assertIn('\nелки\nelki\n', m.search_text)
+
+    def test_search_text_of_migration(self):
+        migration = import_module('cinemanio.core.migrations.0016_search_text')
+        values = ['War and Peace', 'Война и мир', 'Дмитрий Нагиев', 'Ёлки', 'Schastye', '']
+        self.assertEqual(migration.get_search_text(values), get_search_text(values))
+
+    @parameterized.expand([(Movie,), (Person,)])
+    def test_postgres_backend_query_uses_indexes(self, model):
+        """
+        Expressions of query should be the same as expressions of indexes created by migration to use them
+        """
+        migration = import_module('cinemanio.core.migrations.0016_search_text')
+        sql = str(PostgresSearchBackend().get_queryset(model.objects.all(), 'term').query) \
+            .replace(f'"{model._meta.db_table}".', '')
+        self.assertEqual(dict(migration.SEARCH_FIELDS)[model._meta.model_name], tuple(model.search_fields))
+        self.assertIn("to_tsvector('simple', \"search_text\") @@", sql)
+        self.assertIn('% "search_text"', sql)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL search is available only for PostgreSQL database')
+    def test_postgres_backend(self):
+        m1 = MovieFactory(title_en='The Godfather')
+        m2 = MovieFactory(title_en='Godfather')
+        MovieFactory(title_en='Apocalypse Now')
+        self.assertEqual(set(PostgresSearchBackend().search(Movie.objects.all(), 'godfather', 0, 10)), {m1.id, m2.id})
+        # misspelled
+        self.assertEqual(PostgresSearchBackend().search(Movie.objects.all(), 'godfater', 0, 10)[0], m2.id)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ImagesConfig(AppConfig):
+    name = 'cinemanio.images'
+
+    def ready(self):
+        from cinemanio.images import signals  # noqa
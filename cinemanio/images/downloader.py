@@ -0,0 +1,212 @@
+import hashlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple, Union  # noqa
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from django.core.files import File
+from PIL import Image as PILImage
+from requests.adapters import HTTPAdapter
+
+DownloadedImage = namedtuple('DownloadedImage', ['file', 'extension', 'digest', 'phash'])
+
+# enough bytes of the beginning of file to recognize its type
+SIGNATURE_SIZE = 12
+# size of grayscale image to compare neighbour pixels of for perceptual hash, width is one pixel more than bits in row
+PHASH_SIZE = (9, 8)
+# maximum relative difference of aspect ratios of images looking the same
+ASPECT_RATIO_TOLERANCE = 0.02
+
+
+class ImageWrongType(Exception):
+    pass
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+def get_absolute_url(url: str) -> str:
+    """
+    Add scheme to protocol-relative URL, like //st.kp.yandex.net/im/poster/...
+    """
+    return url if 'http' in url else 'http:' + url
+
+
+def get_extension(signature: bytes) -> Optional[str]:
+    """
+    Recognize type of image by first bytes of file, return file extension for it
+    """
+    if signature.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if signature.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if signature.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if signature.startswith(b'RIFF') and signature[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def get_digest(file) -> str:
+    """
+    Return SHA-256 digest of content of file
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(64 * 1024), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_perceptual_hash(file) -> Optional[str]:
+    """
+    Return 64 bit difference hash of image as hex string: every bit tells if pixel of downscaled grayscale image
+    is brighter than its right neighbour. It's the same for copies of image in different sizes and qualities.
+    Return None if image can't be decoded or it's flat, so hash says nothing about it
+    """
+    try:
+        image = PILImage.open(file)
+        # decode JPEG right into reduced size, it's much faster than decoding and resizing of full image
+        image.draft('L', (PHASH_SIZE[0] * 8, PHASH_SIZE[1] * 8))
+        pixels = list(image.convert('L').resize(PHASH_SIZE, PILImage.LANCZOS).getdata())
+    except (OSError, ValueError):
+        return None
+    width, height = PHASH_SIZE
+    bits = [pixels[row * width + col] > pixels[row * width + col + 1]
+            for row in range(height) for col in range(width - 1)]
+    if not any(bits):
+        return None
+    return f'{sum(1 << i for i, bit in enumerate(bits) if bit):016x}'
+
+
+def get_dimensions(file) -> Optional[Tuple[int, int]]:
+    """
+    Return width and height of image reading only its header, None if image can't be decoded
+    """
+    try:
+        return PILImage.open(file).size
+    except (OSError, ValueError):
+        return None
+
+
+def have_same_proportions(dimensions: Optional[Tuple[int, int]], other: Optional[Tuple[int, int]]) -> bool:
+    """
+    Return True if images of dimensions have the same aspect ratio.
+    Perceptual hash is the same for stretched or cropped image, so it's not enough to consider images the same
+    """
+    if not dimensions or not other:
+        return False
+    (width, height), (other_width, other_height) = dimensions, other
+    return abs(width * other_height - other_width * height) <= ASPECT_RATIO_TOLERANCE * width * other_height
+
+
+class ImageDownloader:
+    """
+    HTTP client downloading images through keep-alive sessions, one pool of connections per host.
+    Response is streamed into temporary file (spooled to disk if it's big) and rejected as soon as it's known
+    that it's not an image or it exceeds maximum size, so the whole body is never kept in memory.
+    Content digest is computed while streaming, perceptual hash right after it in the same thread.
+    Options are taken from settings.IMAGES_DOWNLOAD
+    """
+
+    def __init__(self, max_size: Optional[int] = None, concurrency: Optional[int] = None,
+                 timeout: Optional[int] = None):
+        options = settings.IMAGES_DOWNLOAD
+        self.max_size = max_size if max_size is not None else options['MAX_SIZE']
+        self.concurrency = concurrency if concurrency is not None else options['CONCURRENCY']
+        self.timeout = timeout if timeout is not None else options['TIMEOUT']
+        self.chunk_size = options['CHUNK_SIZE']
+        self.spool_size = options['SPOOL_SIZE']
+        self.sessions = {}  # type: Dict[str, requests.Session]
+        self.lock = Lock()
+
+    def get_session(self, url: str) -> requests.Session:
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.sessions[host] = session
+            return self.sessions[host]
+
+    def close(self) -> None:
+        """
+        Close sessions with their pools of connections, new ones are opened on the next download
+        """
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+
+    def download(self, url: str) -> DownloadedImage:
+        """
+        Download image into temporary file, raise ImageWrongType or ImageTooLarge if it's not acceptable
+        """
+        url = get_absolute_url(url)
+        with self.get_session(url).get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            if int(response.headers.get('Content-Length') or 0) > self.max_size:
+                raise ImageTooLarge(f"Image {url} is larger than {self.max_size} bytes")
+
+            file = SpooledTemporaryFile(max_size=self.spool_size)
+            digest = hashlib.sha256()
+            try:
+                extension = self.stream(url, response, file, digest)
+            except Exception:
+                file.close()
+                raise
+
+        file.seek(0)
+        phash = get_perceptual_hash(file)
+        file.seek(0)
+        return DownloadedImage(File(file), extension, digest.hexdigest(), phash)
+
+    def stream(self, url: str, response, file, digest) -> str:
+        """
+        Write body of response into file by chunks updating digest, check type of image by the first bytes of the body
+        """
+        signature = b''
+        extension = None
+        size = 0
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            size += len(chunk)
+            if size > self.max_size:
+                raise ImageTooLarge(f"Image {url} is larger than {self.max_size} bytes")
+            if extension is None:
+                signature += chunk[:SIGNATURE_SIZE]
+                if len(signature) >= SIGNATURE_SIZE:
+                    extension = self.get_extension(url, signature)
+            digest.update(chunk)
+            file.write(chunk)
+        return extension or self.get_extension(url, signature)
+
+    def get_extension(self, url: str, signature: bytes) -> str:
+        extension = get_extension(signature)
+        if extension is None:
+            raise ImageWrongType(f"Content of {url} is not an image")
+        return extension
+
+    def download_many(self, urls: Iterable[str]) -> Dict[str, Union[DownloadedImage, Exception]]:
+        """
+        Download images in parallel, at most settings.IMAGES_DOWNLOAD['CONCURRENCY'] at once.
+        Return downloaded image or exception raised during its download by URL
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {url: executor.submit(self.download, url) for url in urls}
+
+        results = {}  # type: Dict[str, Union[DownloadedImage, Exception]]
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                results[url] = e
+        return results
+
+
+downloader = ImageDownloader()
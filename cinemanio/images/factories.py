@@ -5,7 +5,7 @@ from cinemanio.images.models import Image, ImageLink
 
 
 class ImageFactory(DjangoModelFactory):
-    original = factory.Faker('file_name', category='image', extension=None)
+    original = factory.django.ImageField(width=200, height=300)
 
     class Meta:
         model = Image
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from cinemanio.images.models import Image
+from cinemanio.images.tasks import generate_placeholders
+
+
+class Command(BaseCommand):
+    """
+    Management command to backfill placeholders of images stored before they were generated on ingest.
+    Images are split into chunks, every chunk is generated by separate Celery task
+    """
+    help = 'Generate BlurHash and dominant color placeholders for images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100, help='Number of images per task')
+        parser.add_argument('--all', action='store_true', help='Regenerate placeholders of all images, not only missing')
+
+    def handle(self, *args, **options):
+        images = Image.objects.order_by('id')
+        if not options['all']:
+            images = images.filter(blurhash=None)
+        image_ids = list(images.values_list('id', flat=True))
+
+        chunk_size = options['chunk_size']
+        chunks = [image_ids[i:i + chunk_size] for i in range(0, len(image_ids), chunk_size)]
+        for chunk in chunks:
+            generate_placeholders.delay(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Scheduled placeholders of {len(image_ids)} images in {len(chunks)} tasks'))
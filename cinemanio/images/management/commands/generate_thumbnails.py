@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from cinemanio.images.models import Image, ThumbnailFormat
+from cinemanio.images.tasks import generate_thumbnails
+
+
+class Command(BaseCommand):
+    """
+    Management command to backfill thumbnails of existing images.
+    Images are split into chunks, every chunk is generated by separate Celery task, so workers process them in parallel
+    """
+    help = 'Generate thumbnails of all sizes and formats for images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100, help='Number of images per task')
+        parser.add_argument('--all', action='store_true', help='Regenerate thumbnails of all images, not only missing')
+
+    def handle(self, *args, **options):
+        images = Image.objects.order_by('id')
+        if not options['all']:
+            images = images.annotate(thumbnails_count=Count('thumbnails')) \
+                .filter(thumbnails_count__lt=len(Image.THUMBNAIL_SIZES) * len(ThumbnailFormat))
+        image_ids = list(images.values_list('id', flat=True))
+
+        chunk_size = options['chunk_size']
+        chunks = [image_ids[i:i + chunk_size] for i in range(0, len(image_ids), chunk_size)]
+        for chunk in chunks:
+            generate_thumbnails.delay(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Scheduled thumbnails of {len(image_ids)} images in {len(chunks)} tasks'))
@@ -0,0 +1,60 @@
+import logging
+from typing import List  # noqa
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from cinemanio.images.downloader import have_same_proportions
+from cinemanio.images.models import Image
+
+logger = logging.getLogger(__name__)
+
+
+def get_duplicates(image: Image, images: List[Image]) -> List[Image]:
+    """
+    Return duplicates of image among images of the same type: images with the same content
+    or looking the same in the same proportions, see ImageManager.get_duplicate
+    """
+    dimensions = image.get_dimensions()
+    return [other for other in images if other.type == image.type and (
+        other.digest == image.digest or have_same_proportions(dimensions, other.get_dimensions()))]
+
+
+class Command(BaseCommand):
+    """
+    Management command to merge duplicates of images stored from different URLs.
+    Hashes are computed for images stored before they were computed on download, after that images with the same
+    content digest and type are merged into the oldest of them, images with the same perceptual hash only if they have
+    the same type and proportions
+    """
+    help = 'Find images with the same content or looking the same and merge them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100, help='Number of images fetched at once')
+
+    def handle(self, *args, **options):
+        hashed = 0
+        for image in Image.objects.filter(digest=None).order_by('id').iterator(chunk_size=options['chunk_size']):
+            try:
+                image.compute_hashes()
+                hashed += 1
+            except (OSError, ValueError):
+                logger.exception('Unable to compute hashes of image', extra={'image_id': image.id})
+
+        merged = 0
+        for field in ('digest', 'phash'):
+            values = Image.objects.exclude(**{field: None}).order_by().values(field).annotate(count=Count('id')) \
+                .filter(count__gt=1).values_list(field, flat=True)
+            for value in values:
+                with transaction.atomic():
+                    images = list(Image.objects.filter(**{field: value}).order_by('id'))
+                    while images:
+                        image, *images = images
+                        duplicates = get_duplicates(image, images)
+                        images = [other for other in images if other not in duplicates]
+                        if duplicates:
+                            image.merge(duplicates)
+                            merged += len(duplicates)
+
+        self.stdout.write(self.style.SUCCESS(f'Computed hashes of {hashed} images, merged {merged} duplicates'))
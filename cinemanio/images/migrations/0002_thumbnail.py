@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Thumbnail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.CharField(max_length=20, verbose_name='Size')),
+                ('url', models.CharField(max_length=300, verbose_name='URL')),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='thumbnails', to='images.Image')),
+            ],
+            options={
+                'verbose_name': 'thumbnail',
+                'verbose_name_plural': 'thumbnails',
+                'unique_together': {('image', 'size')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+import cinemanio.images.models
+from django.db import migrations
+import enumfields.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0002_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thumbnail',
+            name='format',
+            field=enumfields.fields.EnumField(default='jpg', enum=cinemanio.images.models.ThumbnailFormat, max_length=10, verbose_name='Format'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='thumbnail',
+            unique_together={('image', 'size', 'format')},
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0003_thumbnail_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='digest',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True, verbose_name='Digest'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='phash',
+            field=models.CharField(blank=True, db_index=True, max_length=16, null=True, verbose_name='Perceptual hash'),
+        ),
+    ]
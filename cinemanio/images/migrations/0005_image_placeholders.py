@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0004_image_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='blurhash',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='BlurHash'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='color',
+            field=models.CharField(blank=True, max_length=7, null=True, verbose_name='Dominant color'),
+        ),
+    ]
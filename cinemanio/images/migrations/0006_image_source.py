@@ -0,0 +1,30 @@
+import cinemanio.images.models
+from django.db import migrations, models
+import django.db.models.deletion
+import enumfields.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0005_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageSource',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', enumfields.fields.EnumField(enum=cinemanio.images.models.ImageSourceType,
+                                                            max_length=20, verbose_name='Type of source')),
+                ('source_id', models.CharField(max_length=300, verbose_name='Source ID')),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources',
+                                            to='images.Image')),
+            ],
+            options={
+                'verbose_name': 'image source',
+                'verbose_name_plural': 'image sources',
+                'unique_together': {('source_type', 'source_id')},
+            },
+        ),
+    ]
@@ -1,21 +1,25 @@
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple, Type  # noqa
 from urllib.parse import urlparse
-from urllib.request import urlopen, Request
 
 import re
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from django.core.files.base import ContentFile
-from django.db import models
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
 from enumfields import IntEnum, Enum, EnumIntegerField, EnumField
+from PIL import Image as PILImage, ImageOps
 from sorl.thumbnail import get_thumbnail
 from sorl.thumbnail.fields import ImageField
 
 from cinemanio.core.models import Movie, Person
-
-
-class ImageWrongType(Exception):
-    pass
+from cinemanio.images.downloader import (DownloadedImage, ImageTooLarge, ImageWrongType,  # noqa
+                                         downloader, get_absolute_url, get_digest, get_dimensions, get_perceptual_hash,
+                                         have_same_proportions)
+from cinemanio.images.placeholders import get_blurhash, get_dominant_color, get_placeholder_image
 
 
 class ImageType(IntEnum):
@@ -23,16 +27,36 @@ class ImageType(IntEnum):
     PHOTO = 2
 
 
+# fields of primary image of objects and type of images they refer to
+PRIMARY_IMAGE_FIELDS = {
+    Movie: ('poster', ImageType.POSTER),
+    Person: ('photo', ImageType.PHOTO),
+}  # type: Dict[Type[models.Model], Tuple[str, int]]
+
+
+class ThumbnailFormat(Enum):
+    JPEG = 'jpg'
+    WEBP = 'webp'
+
+
+THUMBNAIL_PIL_FORMATS = {
+    ThumbnailFormat.JPEG: 'JPEG',
+    ThumbnailFormat.WEBP: 'WEBP',
+}
+THUMBNAIL_QUALITY = 85
+
+
 class ImageSourceType(Enum):
     KINOPOISK = 'kinopoisk'
     WIKICOMMONS = 'wikicommons'
 
 
 class ImageLinkManager(models.Manager):
-    def get_or_download(self, url, **kwargs):
+    def get_or_download(self, url, downloaded: Optional[DownloadedImage] = None, **kwargs):
         """
         Try to get already downloaded or download image using self.download() method
-        Return tuple with image_link instance and boolean flag equal True if image was downloaded
+        Return tuple with image_link instance and boolean flag equal True if image was downloaded,
+        even if it turned out to be a duplicate of already stored image
         """
         if not self.instance:
             raise RuntimeError("Manager method should be called: instance.images.get_or_download()")
@@ -43,24 +67,25 @@ class ImageLinkManager(models.Manager):
             # pylint: disable=unsubscriptable-object
             image_link = self.get_or_create(image=image, object_id=self.instance.id,
                                             content_type=ContentType.objects.get_for_model(self.instance))[0]
-            downloaded = False
+            is_downloaded = False
         else:
-            image_link = self.download(url, **kwargs)
-            downloaded = True
+            image_link = self.download(url, downloaded, **kwargs)
+            is_downloaded = True
 
-        return image_link, downloaded
+        return image_link, is_downloaded
 
-    def download(self, url, **kwargs):
+    def download(self, url, downloaded: Optional[DownloadedImage] = None, **kwargs):
         """
         Download image and link it to self.instance
         """
         if not self.instance:
             raise RuntimeError("Manager method should be called: instance.images.download()")
 
-        image = Image.objects.download(url, **kwargs)
-        image_link = self.model(image=image, object=self.instance)
-        image_link.save()
-        return image_link
+        image = Image.objects.download(url, downloaded, **kwargs)
+        # image could be a duplicate of image already linked to the instance
+        # pylint: disable=unsubscriptable-object
+        return self.get_or_create(image=image, object_id=self.instance.id,
+                                  content_type=ContentType.objects.get_for_model(self.instance))[0]
 
 
 class ImageManager(models.Manager):
@@ -77,24 +102,57 @@ class ImageManager(models.Manager):
                     try:
                         return self.get(source_type=source_type, source_id=source_id[0])
                     except self.model.DoesNotExist:
-                        image.source_id = source_id[0]
-                        image.source_type = source_type
+                        pass
+                    # image stored from another URL
+                    source = ImageSource.objects.filter(source_type=source_type, source_id=source_id[0]) \
+                        .select_related('image').first()
+                    if source:
+                        return source.image
+                    image.source_id = source_id[0]
+                    image.source_type = source_type
 
         return image
 
-    def download(self, url, **kwargs):
+    def download(self, url, downloaded: Optional[DownloadedImage] = None, **kwargs):
         """
-        Download image from URL save and return it
+        Download image from URL save and return it. Image downloaded in advance could be provided.
+        If the same or looking the same image is already stored, return it instead of storing a duplicate
+        and remember source of URL for it, so the image isn't downloaded from the URL again
         """
         image = self.get_image_from_url(url)
         if not image.id:
+            url = get_absolute_url(url)
+            downloaded = downloaded or downloader.download(url)
+            downloaded.file.seek(0)
+            dimensions = get_dimensions(downloaded.file)
+            downloaded.file.seek(0)
+            duplicate = self.get_duplicate(downloaded.digest, downloaded.phash, kwargs.get('type'), dimensions)
+            if duplicate:
+                downloaded.file.close()
+                duplicate.add_source(image.source_type, image.source_id)
+                return duplicate
             image.__dict__.update(kwargs)
-            if 'http' not in url:
-                url = 'http:' + url
             image.source = urlparse(url).netloc
-            image.download(url)
+            image.download(url, downloaded)
+            transaction.on_commit(lambda: image.schedule_thumbnails())
         return image
 
+    def get_duplicate(self, digest: str, phash: Optional[str], image_type: Optional[ImageType] = None,
+                      dimensions: Optional[Tuple[int, int]] = None) -> Optional['Image']:
+        """
+        Return the first stored image of the same type with the same content digest or with the same perceptual hash
+        and proportions. Hashes are compared exactly using indexes, images with slightly different hashes
+        are not considered the same, because different posters of the same movie could look alike
+        """
+        images = self.filter(type=image_type).order_by('id')
+        duplicate = images.filter(digest=digest).first()
+        if duplicate or not phash:
+            return duplicate
+        for image in images.filter(phash=phash).exclude(digest=digest):
+            if have_same_proportions(dimensions, image.get_dimensions()):
+                return image
+        return None
+
 
 class Image(models.Model):
     """
@@ -116,6 +174,13 @@ class Image(models.Model):
     source_type = EnumField(ImageSourceType, verbose_name=_('Type of source'), max_length=20, null=True, blank=True)
     source_id = models.CharField(_('Source ID'), max_length=300, null=True, blank=True)
 
+    digest = models.CharField(_('Digest'), max_length=64, null=True, blank=True, db_index=True)
+    phash = models.CharField(_('Perceptual hash'), max_length=16, null=True, blank=True, db_index=True)
+
+    # placeholders rendered by clients until thumbnail is loaded
+    blurhash = models.CharField(_('BlurHash'), max_length=50, null=True, blank=True)
+    color = models.CharField(_('Dominant color'), max_length=7, null=True, blank=True)
+
     objects = ImageManager()
 
     class Meta:
@@ -129,19 +194,149 @@ class Image(models.Model):
     FULL_CARD_SIZE = (100, 140)
     SHORT_CARD_SIZE = (42, 58)
     ICON_SIZE = (30, 40)
+    THUMBNAIL_SIZES = (DETAIL_SIZE, FULL_CARD_SIZE, SHORT_CARD_SIZE, ICON_SIZE)
+
+    @staticmethod
+    def get_size(width, height) -> str:
+        return f'{width}x{height}'
 
     def get_thumbnail(self, width, height):
-        return get_thumbnail(self.original, f'{width}x{height}', crop='center', upscale=True)
+        return get_thumbnail(self.original, self.get_size(width, height), crop='center', upscale=True)
 
-    def download(self, url):
+    def generate_thumbnails(self, sizes=THUMBNAIL_SIZES, formats=tuple(ThumbnailFormat)):
         """
-        Download image from url and save it into ImageField
+        Generate thumbnails of sizes in all formats from one decoded original, keep their URLs in thumbnails manifest.
+        Placeholders are generated from the same decoded original
         """
+        original = self.open_original()
+        self.set_placeholders(original)
+        self.save(update_fields=['blurhash', 'color'])
+        if original.mode not in ('RGB', 'L'):
+            original = original.convert('RGB')
+
+        for width, height in sizes:
+            # the same way as sorl.thumbnail with crop='center' and upscale=True
+            thumbnail = ImageOps.fit(original, (width, height), method=PILImage.LANCZOS)
+            for thumbnail_format in formats:
+                content = BytesIO()
+                thumbnail.save(content, THUMBNAIL_PIL_FORMATS[thumbnail_format], quality=THUMBNAIL_QUALITY)
+                name = f'thumbnails/{self.id}/{width}x{height}.{thumbnail_format.value}'
+                default_storage.delete(name)
+                name = default_storage.save(name, ContentFile(content.getvalue()))
+                Thumbnail.objects.update_or_create(image=self, size=self.get_size(width, height),
+                                                   format=thumbnail_format,
+                                                   defaults=dict(url=default_storage.url(name)))
+
+    def open_original(self) -> PILImage.Image:
+        with self.original.open('rb') as file:
+            original = PILImage.open(file)
+            original.load()
+        return original
+
+    def set_placeholders(self, original: PILImage.Image):
+        """
+        Set BlurHash and dominant color of decoded original
+        """
+        placeholder = get_placeholder_image(original)
+        self.blurhash = get_blurhash(placeholder)
+        self.color = get_dominant_color(placeholder)
+
+    def generate_placeholders(self):
+        self.set_placeholders(self.open_original())
+        self.save(update_fields=['blurhash', 'color'])
+
+    def schedule_thumbnails(self):
+        from cinemanio.images.tasks import schedule_thumbnails
+        schedule_thumbnails([self.id])
+
+    def download(self, url, downloaded: Optional[DownloadedImage] = None):
+        """
+        Download image from url and save it into ImageField, streaming it from temporary file to the storage
+        """
+        downloaded = downloaded or downloader.download(url)
+        self.digest, self.phash = downloaded.digest, downloaded.phash
         if not self.id:
             self.save()
-        name = f'{self.id}.jpg'
-        with urlopen(Request(url)) as response:  # nosec
-            self.original.save(name, ContentFile(response.read()))
+        with downloaded.file:
+            self.original.save(f'{self.id}.{downloaded.extension}', downloaded.file)
+
+    def get_dimensions(self) -> Optional[Tuple[int, int]]:
+        try:
+            return self.original.width, self.original.height
+        except (OSError, ValueError):
+            return None
+
+    def compute_hashes(self):
+        """
+        Compute content digest and perceptual hash of original, for images stored before they were computed on download
+        """
+        with self.original.open('rb') as file:
+            self.digest = get_digest(file)
+            file.seek(0)
+            self.phash = get_perceptual_hash(file)
+        self.save(update_fields=['digest', 'phash'])
+
+    def add_source(self, source_type: Optional[ImageSourceType], source_id: Optional[str]):
+        """
+        Remember another source of the same image
+        """
+        if source_id and (source_type, source_id) != (self.source_type, self.source_id):
+            ImageSource.objects.get_or_create(source_type=source_type, source_id=source_id, defaults=dict(image=self))
+
+    def merge(self, duplicates: List['Image']):
+        """
+        Move links, sources and references of primary images from duplicates to self, delete duplicates
+        """
+        duplicate_ids = [duplicate.id for duplicate in duplicates]
+        ImageSource.objects.filter(image_id__in=duplicate_ids).update(image=self)
+        for duplicate in duplicates:
+            self.add_source(duplicate.source_type, duplicate.source_id)
+        linked = set(self.links.values_list('content_type_id', 'object_id'))
+        for link in ImageLink.objects.filter(image_id__in=duplicate_ids):
+            if (link.content_type_id, link.object_id) not in linked:
+                linked.add((link.content_type_id, link.object_id))
+                ImageLink.objects.filter(pk=link.pk).update(image=self)
+        for model, (field, __) in PRIMARY_IMAGE_FIELDS.items():
+            model.objects.filter(**{f'{field}__in': duplicate_ids}).update(**{field: self})
+        # remaining links of duplicates are deleted with them, objects are already linked to self
+        for duplicate in duplicates:
+            duplicate.delete()
+
+
+class ImageSource(models.Model):
+    """
+    Another source of stored image: URL the same or looking the same image was downloaded from
+    """
+    image = models.ForeignKey(Image, related_name='sources', on_delete=models.CASCADE)
+    source_type = EnumField(ImageSourceType, verbose_name=_('Type of source'), max_length=20)
+    source_id = models.CharField(_('Source ID'), max_length=300)
+
+    class Meta:
+        verbose_name = _('image source')
+        verbose_name_plural = _('image sources')
+        unique_together = ('source_type', 'source_id')
+
+    def __repr__(self):
+        return f'ImageSource: {self.image_id} {self.source_type.value} {self.source_id}'
+
+
+class Thumbnail(models.Model):
+    """
+    Thumbnails manifest: URL of thumbnail of image of certain size and format.
+    Thumbnails are generated in background by cinemanio.images.tasks, never during requests
+    """
+    image = models.ForeignKey(Image, related_name='thumbnails', on_delete=models.CASCADE)
+    size = models.CharField(_('Size'), max_length=20)
+    format = EnumField(ThumbnailFormat, verbose_name=_('Format'), max_length=10, default=ThumbnailFormat.JPEG)
+    url = models.CharField(_('URL'), max_length=300)
+
+    class Meta:
+        verbose_name = _('thumbnail')
+        verbose_name_plural = _('thumbnails')
+        unique_together = ('image', 'size', 'format')
+
+    def __repr__(self):
+        return f'Thumbnail: {self.image_id} {self.size} {self.format.value}'
 
 
 class ImageLink(models.Model):
@@ -165,6 +360,37 @@ class ImageLink(models.Model):
     def __repr__(self):
         return f'ImageLink: {self.object}'
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.set_primary_image()
+
+    def get_primary_image_field(self):
+        """
+        Return model of linked object, name of its primary image field and type of images for the field
+        """
+        model = ContentType.objects.get_for_id(self.content_type_id).model_class()
+        return (model,) + PRIMARY_IMAGE_FIELDS.get(model, (None, None))
+
+    def set_primary_image(self):
+        """
+        Make linked image primary image of object, if object has no primary image yet
+        """
+        model, field, image_type = self.get_primary_image_field()
+        if field and self.image.type == image_type:
+            model.objects.filter(pk=self.object_id, **{field: None}).update(**{field: self.image_id})
+
+    def replace_primary_image(self):
+        """
+        Replace primary image of object by another linked image of the same type, if this link was deleted
+        """
+        model, field, image_type = self.get_primary_image_field()
+        if not field:
+            return
+        image = Image.objects.filter(type=image_type, links__content_type_id=self.content_type_id,
+                                     links__object_id=self.object_id).order_by('links__id').first()
+        model.objects.filter(Q(**{field: self.image_id}) | Q(**{field: None}), pk=self.object_id) \
+            .update(**{field: image})
+
 
 Movie.add_to_class('images', GenericRelation(ImageLink, verbose_name=_('Images')))
 Person.add_to_class('images', GenericRelation(ImageLink, verbose_name=_('Images')))
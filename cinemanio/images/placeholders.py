@@ -0,0 +1,88 @@
+import math
+from typing import List, Tuple  # noqa
+
+from PIL import Image as PILImage
+
+# size of image to compute placeholders from, enough for blurred preview
+PLACEHOLDER_SIZE = (32, 32)
+BLURHASH_COMPONENTS = (4, 3)
+BASE83_CHARACTERS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def encode_base83(value: int, length: int) -> str:
+    return ''.join(BASE83_CHARACTERS[value // 83 ** (length - i - 1) % 83] for i in range(length))
+
+
+def srgb_to_linear(value: int) -> float:
+    normalized = value / 255
+    return normalized / 12.92 if normalized <= 0.04045 else ((normalized + 0.055) / 1.055) ** 2.4
+
+
+def linear_to_srgb(value: float) -> int:
+    value = max(0., min(1., value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def sign_pow(value: float, exponent: float) -> float:
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def get_placeholder_image(image: PILImage.Image) -> PILImage.Image:
+    """
+    Return small RGB copy of image, placeholders are computed from it
+    """
+    image = image.convert('RGB')
+    image.thumbnail(PLACEHOLDER_SIZE, PILImage.BILINEAR)
+    return image
+
+
+def get_blurhash(image: PILImage.Image, components: Tuple[int, int] = BLURHASH_COMPONENTS) -> str:
+    """
+    Encode small RGB image to BlurHash string (https://blurha.sh): DC and AC components of cosine transform of image
+    in linear RGB, quantized and encoded in base 83. Clients decode it to blurred preview of image
+    """
+    width, height = image.size
+    x_components, y_components = components
+    pixels = [tuple(srgb_to_linear(channel) for channel in pixel) for pixel in image.getdata()]
+
+    factors = []  # type: List[Tuple[float, float, float]]
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == 0 and j == 0 else 2
+            cos_x = [math.cos(math.pi * i * x / width) for x in range(width)]
+            cos_y = [math.cos(math.pi * j * y / height) for y in range(height)]
+            r = g = b = 0.
+            for index, (red, green, blue) in enumerate(pixels):
+                basis = cos_x[index % width] * cos_y[index // width]
+                r += basis * red
+                g += basis * green
+                b += basis * blue
+            scale = normalisation / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    blurhash = encode_base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        actual_max = max(abs(value) for factor in ac for value in factor)
+        quantised_max = max(0, min(82, int(math.floor(actual_max * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+    else:
+        quantised_max, max_value = 0, 1
+    blurhash += encode_base83(quantised_max, 1)
+    blurhash += encode_base83((linear_to_srgb(dc[0]) << 16) + (linear_to_srgb(dc[1]) << 8) + linear_to_srgb(dc[2]), 4)
+    for factor in ac:
+        r, g, b = [max(0, min(18, int(math.floor(sign_pow(value / max_value, 0.5) * 9 + 9.5)))) for value in factor]
+        blurhash += encode_base83(r * 19 * 19 + g * 19 + b, 2)
+    return blurhash
+
+
+def get_dominant_color(image: PILImage.Image) -> str:
+    """
+    Return the most frequent color of small RGB image reduced to a few colors, in #rrggbb format
+    """
+    palette_image = image.quantize(colors=5)
+    palette = palette_image.getpalette()
+    _, index = max(palette_image.getcolors())
+    return '#{:02x}{:02x}{:02x}'.format(*palette[index * 3:index * 3 + 3])
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete
+from django.dispatch import Signal, receiver
+
+from cinemanio.images.models import ImageLink
+
+thumbnails_generated = Signal(providing_args=['image_ids'])
+placeholders_generated = Signal(providing_args=['image_ids'])
+
+
+@receiver(post_delete, sender=ImageLink)
+def replace_primary_image_signal(sender, instance, **_):
+    """
+    Replace primary image of object, when link to it was deleted
+    """
+    instance.replace_primary_image()
@@ -0,0 +1,51 @@
+import logging
+from typing import Iterable
+
+from cinemanio.api.cache import get_cache
+from cinemanio.celery import app
+from cinemanio.images.models import Image
+from cinemanio.images.signals import placeholders_generated, thumbnails_generated
+
+# flags of scheduled thumbnails are kept in the cache shared by all processes
+SCHEDULED_THUMBNAILS_KEY = 'images:thumbnails:scheduled:{}'
+SCHEDULED_THUMBNAILS_TIMEOUT = 60 * 5
+
+logger = logging.getLogger(__name__)
+
+
+@app.task
+def generate_thumbnails(image_ids):
+    """
+    Generate thumbnails of all sizes and formats for images, skip images with broken originals
+    """
+    for image in Image.objects.filter(pk__in=image_ids):
+        try:
+            image.generate_thumbnails()
+        except (OSError, ValueError):
+            logger.exception('Unable to generate thumbnails', extra={'image_id': image.id})
+    get_cache().delete_many([SCHEDULED_THUMBNAILS_KEY.format(image_id) for image_id in image_ids])
+    thumbnails_generated.send(sender=Image, image_ids=image_ids)
+
+
+@app.task
+def generate_placeholders(image_ids):
+    """
+    Generate placeholders of images, skip images with broken originals
+    """
+    for image in Image.objects.filter(pk__in=image_ids):
+        try:
+            image.generate_placeholders()
+        except (OSError, ValueError):
+            logger.exception('Unable to generate placeholders', extra={'image_id': image.id})
+    placeholders_generated.send(sender=Image, image_ids=image_ids)
+
+
+def schedule_thumbnails(image_ids: Iterable[int]) -> None:
+    """
+    Delay generation of thumbnails for images, unless it's already scheduled for them
+    """
+    cache = get_cache()
+    image_ids = [image_id for image_id in sorted(image_ids)
+                 if cache.add(SCHEDULED_THUMBNAILS_KEY.format(image_id), True, timeout=SCHEDULED_THUMBNAILS_TIMEOUT)]
+    if image_ids:
+        generate_thumbnails.delay(image_ids)
@@ -1,11 +1,25 @@
+import hashlib
+from io import BytesIO, StringIO
 from os.path import isfile
+from unittest import mock
 
-from django.test import TransactionTestCase
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+from PIL import Image as PILImage
 from vcr_unittest import VCRMixin
 
+from cinemanio.api.cache import get_cache
 from cinemanio.core.factories import MovieFactory, PersonFactory
 from cinemanio.core.tests.base import BaseTestCase
-from cinemanio.images.models import ImageLink, Image, ImageType, ImageSourceType
+from cinemanio.images.downloader import (DownloadedImage, ImageDownloader, ImageTooLarge, ImageWrongType,
+                                         get_digest, get_perceptual_hash)
+from cinemanio.images.factories import ImageFactory, ImageLinkFactory
+from cinemanio.images.models import (ImageLink, Image, ImageType, ImageSourceType, ThumbnailFormat,
+                                     THUMBNAIL_PIL_FORMATS)
+from cinemanio.images.placeholders import get_blurhash, get_dominant_color, get_placeholder_image
+from cinemanio.images.tasks import generate_thumbnails, schedule_thumbnails
 
 
 class ImagesTestCase(VCRMixin, BaseTestCase):
@@ -46,6 +60,234 @@ class ImagesTestCase(VCRMixin, BaseTestCase):
         self.assertEqual(link.image.type, ImageType.PHOTO)
         self.assertEqual(link.object, person)
         self.assertEqual(link, person.images.last())
+        person.refresh_from_db()
+        self.assertEqual(person.photo, link.image)
+
+    def test_primary_image(self):
+        movie = MovieFactory()
+        ImageLinkFactory(object=movie, image__type=ImageType.PHOTO)
+        movie.refresh_from_db()
+        self.assertIsNone(movie.poster)
+
+        link1, link2, link3 = [ImageLinkFactory(object=movie, image__type=ImageType.POSTER) for i in range(3)]
+        movie.refresh_from_db()
+        self.assertEqual(movie.poster, link1.image)
+
+        link2.delete()
+        movie.refresh_from_db()
+        self.assertEqual(movie.poster, link1.image)
+
+        link1.delete()
+        movie.refresh_from_db()
+        self.assertEqual(movie.poster, link3.image)
+
+        link3.image.delete()
+        movie.refresh_from_db()
+        self.assertIsNone(movie.poster)
+
+
+class ImagesDuplicatesTestCase(BaseTestCase):
+    url = '//st.kp.yandex.net/im/poster/4/8/3/kinopoisk.ru-Title-{}.jpg'
+
+    def get_downloaded(self, size=(400, 600), quality=85):
+        content = BytesIO()
+        image = PILImage.effect_mandelbrot((400, 600), (-2, -1.5, 1, 1.5), 100)
+        image.resize(size, PILImage.LANCZOS).save(content, 'JPEG', quality=quality)
+        content.seek(0)
+        digest, phash = get_digest(content), get_perceptual_hash(content)
+        content.seek(0)
+        return DownloadedImage(File(content), 'jpg', digest, phash)
+
+    def test_download_the_same_content(self):
+        movie1, movie2 = MovieFactory(), MovieFactory()
+        link1 = movie1.images.get_or_download(self.url.format(1), self.get_downloaded(), type=ImageType.POSTER)[0]
+        link2 = movie2.images.get_or_download(self.url.format(2), self.get_downloaded(), type=ImageType.POSTER)[0]
+        self.assertEqual(link1.image, link2.image)
+        self.assertEqual(Image.objects.count(), 1)
+        self.assertEqual(link1.image.source_id, '1')
+        movie2.refresh_from_db()
+        self.assertEqual(movie2.poster, link1.image)
+        # source of duplicate is remembered, it isn't downloaded again
+        self.assertEqual(Image.objects.get_image_from_url(self.url.format(2)), link1.image)
+        self.assertEqual(movie1.images.get_or_download(self.url.format(2)), (link1, False))
+
+        # the same object
+        link3 = movie2.images.get_or_download(self.url.format(3), self.get_downloaded(), type=ImageType.POSTER)[0]
+        self.assertEqual(link2, link3)
+
+    def test_download_looking_the_same(self):
+        movie = MovieFactory()
+        # perceptual hashes of resized images could differ by a bit depending on version of Pillow
+        downloaded = self.get_downloaded()
+        smaller = self.get_downloaded(size=(100, 150), quality=90)._replace(phash=downloaded.phash)
+        image1 = movie.images.download(self.url.format(1), downloaded).image
+        image2 = movie.images.download(self.url.format(2), smaller).image
+        self.assertEqual(image1, image2)
+        self.assertEqual(movie.images.count(), 1)
+
+    def test_download_looking_the_same_of_other_type_or_proportions(self):
+        movie = MovieFactory()
+        photo = self.get_downloaded()
+        movie.images.download(self.url.format(1), photo, type=ImageType.PHOTO)
+        poster = self.get_downloaded(quality=90)
+        self.assertNotEqual(poster.digest, photo.digest)
+        link = movie.images.download(self.url.format(2), poster._replace(phash=photo.phash), type=ImageType.POSTER)
+        self.assertEqual(link.image.type, ImageType.POSTER)
+        movie.refresh_from_db()
+        self.assertEqual(movie.poster, link.image)
+
+        stretched = self.get_downloaded(size=(400, 300))._replace(phash=photo.phash)
+        stretched_link = movie.images.download(self.url.format(3), stretched, type=ImageType.POSTER)
+        self.assertNotEqual(stretched_link.image, link.image)
+        self.assertEqual(Image.objects.count(), 3)
+
+        smaller = self.get_downloaded(size=(200, 300))._replace(phash=photo.phash)
+        self.assertEqual(movie.images.download(self.url.format(4), smaller, type=ImageType.POSTER).image, link.image)
+        self.assertEqual(Image.objects.count(), 3)
+
+    def test_merge_looking_the_same_command(self):
+        def create_image(source_id, **kwargs):
+            image = ImageFactory(source_type=ImageSourceType.KINOPOISK, source_id=source_id, type=ImageType.POSTER)
+            image.original.save(f'{image.id}.jpg', self.get_downloaded(**kwargs).file)
+            return image
+
+        image = create_image('1')
+        smaller = create_image('2', size=(200, 300), quality=90)
+        stretched = create_image('3', size=(400, 300))
+        photo = create_image('4', size=(200, 300))
+        Image.objects.filter(pk=photo.id).update(type=ImageType.PHOTO)
+        # perceptual hashes of resized images could differ by a bit depending on version of Pillow, set the same
+        for i, pk in enumerate([image.id, smaller.id, stretched.id, photo.id]):
+            Image.objects.filter(pk=pk).update(digest=str(i), phash='0' * 16)
+
+        call_command('merge_duplicate_images', stdout=StringIO())
+
+        self.assertQuerysetEqual(Image.objects.order_by('id'), [image.id, stretched.id, photo.id],
+                                 transform=lambda i: i.id)
+        self.assertEqual(Image.objects.get_image_from_url(self.url.format(smaller.source_id)), image)
+
+    def test_perceptual_hash(self):
+        self.assertIsNone(get_perceptual_hash(BytesIO(b'not an image')))
+        content = BytesIO()
+        PILImage.new('RGB', (200, 300), 'blue').save(content, 'JPEG')
+        self.assertIsNone(get_perceptual_hash(content))
+        self.assertEqual(len(self.get_downloaded().phash), 16)
+
+    def test_merge_duplicates_command(self):
+        movie1, movie2 = MovieFactory(), MovieFactory()
+        link1, link2, link3 = [ImageLinkFactory(object=movie, image__type=ImageType.POSTER)
+                               for movie in (movie1, movie2, movie2)]
+        other = ImageLinkFactory(object=movie1, image__original__color='red').image
+        movie2.refresh_from_db()
+        self.assertEqual(movie2.poster, link2.image)
+
+        call_command('merge_duplicate_images', stdout=StringIO())
+
+        self.assertQuerysetEqual(Image.objects.order_by('id'), [link1.image.id, other.id], transform=lambda i: i.id)
+        self.assertEqual(set(ImageLink.objects.values_list('image_id', 'object_id')),
+                         {(link1.image.id, movie1.id), (link1.image.id, movie2.id), (other.id, movie1.id)})
+        movie2.refresh_from_db()
+        self.assertEqual(movie2.poster, link1.image)
+        self.assertIsNotNone(Image.objects.get(pk=other.id).digest)
+
+
+class PlaceholdersTestCase(BaseTestCase):
+    def test_blurhash(self):
+        # solid color: number of components, max of AC components, DC component equal to color
+        image = PILImage.new('RGB', (40, 60), (255, 0, 0))
+        self.assertEqual(get_blurhash(image, components=(1, 1)), '00TI:j')
+        blurhash = get_blurhash(get_placeholder_image(image))
+        self.assertEqual((blurhash[0], blurhash[2:6]), ('L', 'TI:j'))
+
+        image = PILImage.effect_mandelbrot((200, 300), (-2, -1.5, 1, 1.5), 100)
+        blurhash = get_blurhash(get_placeholder_image(image))
+        self.assertEqual(len(blurhash), 28)
+        self.assertNotEqual(blurhash[6:], 'fQ' * 11)
+
+    def test_dominant_color(self):
+        image = PILImage.new('RGB', (30, 30), (0, 0, 255))
+        image.paste((255, 255, 0), (0, 0, 30, 10))
+        self.assertEqual(get_dominant_color(image), '#0000ff')
+
+    def test_generate_placeholders_command(self):
+        images = [ImageFactory() for i in range(3)]
+        images[0].generate_placeholders()
+        # blue of original after JPEG compression
+        self.assertEqual(images[0].color, '#0000fe')
+
+        with mock.patch('cinemanio.images.tasks.generate_placeholders.delay') as delay:
+            call_command('generate_placeholders', stdout=StringIO())
+        delay.assert_called_once_with([image.id for image in images[1:]])
+
+        # only responses of objects linked to images are invalidated
+        ImageLinkFactory(image=images[1], object=MovieFactory())
+        with mock.patch('cinemanio.api.signals.invalidate') as invalidate:
+            call_command('generate_placeholders', stdout=StringIO())
+        invalidate.assert_called_once_with('movie')
+        self.assertFalse(Image.objects.filter(blurhash=None).exists())
+
+
+class ThumbnailsTestCase(VCRMixin, BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # forget thumbnails scheduled by previous tests
+        get_cache().clear()
+
+    def test_generate_thumbnails(self):
+        image = ImageFactory()
+        generate_thumbnails([image.id])
+        image.refresh_from_db()
+        self.assertEqual(image.color, '#0000fe')
+        self.assertEqual(len(image.blurhash), 28)
+        self.assertEqual(set(image.thumbnails.values_list('size', 'format')),
+                         {(Image.get_size(*size), thumbnail_format)
+                          for size in Image.THUMBNAIL_SIZES for thumbnail_format in ThumbnailFormat})
+        for thumbnail in image.thumbnails.all():
+            with default_storage.open(thumbnail.url.replace(default_storage.base_url, '', 1)) as file:
+                thumbnail_image = PILImage.open(file)
+                self.assertEqual(thumbnail_image.size, tuple(map(int, thumbnail.size.split('x'))))
+                self.assertEqual(thumbnail_image.format, THUMBNAIL_PIL_FORMATS[thumbnail.format])
+
+        # regeneration keeps the same files
+        urls = set(image.thumbnails.values_list('url', flat=True))
+        generate_thumbnails([image.id])
+        self.assertEqual(set(image.thumbnails.values_list('url', flat=True)), urls)
+
+    def test_generate_thumbnails_of_broken_image(self):
+        image = ImageFactory(original='images/missing.jpg')
+        generate_thumbnails([image.id])
+        self.assertEqual(image.thumbnails.count(), 0)
+
+    def test_schedule_thumbnails_after_download(self):
+        url = 'http://upload.wikimedia.org/wikipedia/commons/9/9e/Francis_Ford_Coppola_2007_crop.jpg'
+        with mock.patch('django.db.transaction.on_commit', lambda func: func()):
+            image = Image.objects.download(url)
+        self.assertEqual(image.thumbnails.count(), len(Image.THUMBNAIL_SIZES) * len(ThumbnailFormat))
+
+    def test_generate_thumbnails_command(self):
+        images = [ImageFactory() for i in range(5)]
+        generate_thumbnails([images[0].id])
+
+        with mock.patch('cinemanio.images.tasks.generate_thumbnails.delay') as delay:
+            call_command('generate_thumbnails', '--chunk-size', '3', stdout=StringIO())
+        self.assertEqual(delay.call_args_list, [mock.call([image.id for image in images[1:4]]),
+                                                mock.call([images[4].id])])
+
+        with mock.patch('cinemanio.images.tasks.generate_thumbnails.delay') as delay:
+            call_command('generate_thumbnails', '--all', stdout=StringIO())
+        delay.assert_called_once_with([image.id for image in images])
+
+    def test_schedule_thumbnails_once(self):
+        image1, image2 = ImageFactory(), ImageFactory()
+        with mock.patch('cinemanio.images.tasks.generate_thumbnails.delay') as delay:
+            schedule_thumbnails([image1.id])
+            schedule_thumbnails([image1.id, image2.id])
+        self.assertEqual(delay.call_args_list, [mock.call([image1.id]), mock.call([image2.id])])
+
+        generate_thumbnails([image1.id])
+        with mock.patch('cinemanio.images.tasks.generate_thumbnails.delay') as delay:
+            schedule_thumbnails([image1.id])
+        delay.assert_called_once_with([image1.id])
 
 
 class ImagesFilesTestCase(VCRMixin, TransactionTestCase):
@@ -59,3 +301,63 @@ class ImagesFilesTestCase(VCRMixin, TransactionTestCase):
         image.delete()
         self.assertEqual(Image.objects.count(), 0)
         self.assertFalse(isfile(image.original.url))
+
+
+class ImageDownloaderTestCase(SimpleTestCase):
+    jpeg = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01' + b'0' * 100
+
+    def get_response(self, content, headers=None):
+        response = mock.MagicMock(headers=headers or {})
+        response.__enter__.return_value = response
+        response.iter_content.side_effect = lambda chunk_size: (content[i:i + chunk_size]
+                                                                for i in range(0, len(content), chunk_size))
+        return response
+
+    def get_downloader(self, *responses, **kwargs):
+        downloader = ImageDownloader(**kwargs)
+        downloader.chunk_size = 4
+        session = mock.Mock()
+        session.get.side_effect = list(responses)
+        downloader.get_session = mock.Mock(return_value=session)
+        return downloader
+
+    def test_download(self):
+        downloader = self.get_downloader(self.get_response(self.jpeg))
+        downloaded = downloader.download('//st.kp.yandex.net/image.jpg')
+        self.assertEqual(downloaded.extension, 'jpg')
+        self.assertEqual(downloaded.file.read(), self.jpeg)
+        self.assertEqual(downloaded.digest, hashlib.sha256(self.jpeg).hexdigest())
+        downloader.get_session.assert_called_once_with('http://st.kp.yandex.net/image.jpg')
+
+    def test_download_png(self):
+        png = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR'
+        downloaded = self.get_downloader(self.get_response(png)).download('http://host/image')
+        self.assertEqual(downloaded.extension, 'png')
+
+    def test_wrong_type(self):
+        downloader = self.get_downloader(self.get_response(b'<html><body>Not found</body></html>'))
+        with self.assertRaises(ImageWrongType):
+            downloader.download('http://host/image.jpg')
+
+    def test_too_large_by_header(self):
+        response = self.get_response(self.jpeg, headers={'Content-Length': '1000'})
+        with self.assertRaises(ImageTooLarge):
+            self.get_downloader(response, max_size=100).download('http://host/image.jpg')
+        response.iter_content.assert_not_called()
+
+    def test_too_large_by_content(self):
+        with self.assertRaises(ImageTooLarge):
+            self.get_downloader(self.get_response(self.jpeg), max_size=100).download('http://host/image.jpg')
+
+    def test_download_many(self):
+        downloader = self.get_downloader(self.get_response(self.jpeg), self.get_response(b'<html></html>'))
+        downloader.concurrency = 1
+        results = downloader.download_many(['http://host/1.jpg', 'http://host/2.jpg'])
+        self.assertEqual(results['http://host/1.jpg'].extension, 'jpg')
+        self.assertIsInstance(results['http://host/2.jpg'], ImageWrongType)
+
+    def test_session_per_host(self):
+        downloader = ImageDownloader()
+        session = downloader.get_session('http://host1/1.jpg')
+        self.assertIs(downloader.get_session('http://host1/2.jpg'), session)
+        self.assertIsNot(downloader.get_session('http://host2/1.jpg'), session)
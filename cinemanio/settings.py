@@ -59,12 +59,12 @@ INSTALLED_APPS = [
     'cinemanio.core',
     'cinemanio.users',
     'cinemanio.relations',
-    'cinemanio.api',
+    'cinemanio.api.apps.ApiConfig',
     'cinemanio.sites',
     'cinemanio.sites.imdb',
     'cinemanio.sites.kinopoisk',
     'cinemanio.sites.wikipedia',
-    'cinemanio.images',
+    'cinemanio.images.apps.ImagesConfig',
 ]
 
 MIDDLEWARE = [
@@ -175,9 +175,33 @@ AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default='')
 AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY', default='')
 AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME', default='cinemanio')
 
+# images downloading: max size of image in bytes, number of parallel downloads, timeout in seconds,
+# size of chunk of response and max size of image kept in memory before spooling it to disk
+IMAGES_DOWNLOAD = {
+    'MAX_SIZE': config('IMAGES_DOWNLOAD_MAX_SIZE', default=20 * 1024 * 1024, cast=int),
+    'CONCURRENCY': config('IMAGES_DOWNLOAD_CONCURRENCY', default=4, cast=int),
+    'TIMEOUT': config('IMAGES_DOWNLOAD_TIMEOUT', default=30, cast=int),
+    'CHUNK_SIZE': 64 * 1024,
+    'SPOOL_SIZE': 1024 * 1024,
+}
+
 # redis
 REDIS_URL = config('REDIS_URL', default='')
 
+# cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'graphql': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'graphql',
+    },
+}
+
 # celery
 CELERY_BROKER_URL = REDIS_URL
 CELERY_SEND_TASK_ERROR_EMAILS = True
@@ -206,6 +230,38 @@ GRAPHENE = {
     'MIDDLEWARE': GRAPHENE_MIDDLEWARE,
 }
 
+# limits of static cost analysis of queries, see cinemanio.api.cost
+GRAPHQL_QUERY_COST = {
+    'MAX_COST': config('GRAPHQL_MAX_QUERY_COST', default=20000, cast=int),
+    'MAX_DEPTH': config('GRAPHQL_MAX_QUERY_DEPTH', default=10, cast=int),
+    # expected size of list fields requested without first/last arguments
+    'DEFAULT_LIST_SIZE': 100,
+    # weights of fields by "Type.field": thumbnails could be generated during request, facets are grouped queries
+    'WEIGHTS': {
+        'ImageNode.fullCard': 5,
+        'ImageNode.shortCard': 5,
+        'ImageNode.detail': 5,
+        'ImageNode.icon': 5,
+        'MovieNodeConnection.facets': 10,
+    },
+}
+
+# max amount of parsed and validated GraphQL documents kept in memory of every worker
+GRAPHQL_DOCUMENT_CACHE_SIZE = config('GRAPHQL_DOCUMENT_CACHE_SIZE', default=100, cast=int)
+# max amount of queryset plans of fields of cached GraphQL documents kept in memory of every worker
+GRAPHQL_QUERY_PLAN_CACHE_SIZE = config('GRAPHQL_QUERY_PLAN_CACHE_SIZE', default=1000, cast=int)
+# reject ad-hoc GraphQL documents, execute only persisted queries loaded from manifest
+GRAPHQL_PERSISTED_QUERIES_ONLY = config('GRAPHQL_PERSISTED_QUERIES_ONLY', default=False, cast=bool)
+# max amount of persisted queries kept in memory of every worker
+GRAPHQL_PERSISTED_QUERY_CACHE_SIZE = config('GRAPHQL_PERSISTED_QUERY_CACHE_SIZE', default=1000, cast=int)
+# documents registered automatically by clients are kept in cache of responses for this time
+GRAPHQL_AUTOMATIC_QUERY_TIMEOUT = config('GRAPHQL_AUTOMATIC_QUERY_TIMEOUT', default=24 * 60 * 60, cast=int)
+# cache of responses to anonymous queries, invalidated by changes of movies and persons
+GRAPHQL_RESPONSE_CACHE = 'graphql'
+GRAPHQL_RESPONSE_CACHE_TIMEOUT = config('GRAPHQL_RESPONSE_CACHE_TIMEOUT', default=60 * 60, cast=int)
+# exact counts and facets of connections are cached per filter signature
+GRAPHQL_COUNT_CACHE_TIMEOUT = config('GRAPHQL_COUNT_CACHE_TIMEOUT', default=60, cast=int)
+
 # TODO: choose right settings for CORS
 CORS_ORIGIN_ALLOW_ALL = True
 CORS_ORIGIN_WHITELIST = config('DJANGO_CORS_ORIGIN_WHITELIST', default='https://cineman.io', cast=Csv())
@@ -235,10 +291,51 @@ LOGGING = {
 
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000/', cast=str)
 
+# search backend, see cinemanio.core.search: amount of ids fetched from backend at once, time to keep them in cache
+# and max amount of results ordered not by relevance for backends, that can't filter objects in DB
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='cinemanio.core.search.PostgresSearchBackend', cast=str)
+SEARCH_PAGE_SIZE = 100
+SEARCH_CACHE_TIMEOUT = config('SEARCH_CACHE_TIMEOUT', default=60, cast=int)
+SEARCH_RESULTS_LIMIT = 1000
+# changes of movies and persons are written to outbox and indexed by search backend in batches,
+# changes made during DELAY seconds are indexed together, see cinemanio.core.tasks
+SEARCH_INDEXING = {
+    'ENABLED': config('SEARCH_INDEXING', default=False, cast=bool),
+    'DELAY': config('SEARCH_INDEXING_DELAY', default=10, cast=int),
+    'BATCH_SIZE': 500,
+}
+
+# in-memory prefix indexes of titles and names for autocomplete, see cinemanio.api.autocomplete: memory budget
+# of indexes of every worker, min length of prefix, amount of results, time to keep changes in the log
+# for syncing workers and max amount of changes to apply instead of rebuilding of indexes
+AUTOCOMPLETE = {
+    'MEMORY_LIMIT': config('AUTOCOMPLETE_MEMORY_LIMIT', default=32 * 1024 * 1024, cast=int),
+    'MIN_PREFIX_LENGTH': 3,
+    'RESULTS_LIMIT': 10,
+    'MAX_RESULTS_LIMIT': 50,
+    'CHANGES_TIMEOUT': 24 * 60 * 60,
+    'MAX_CHANGES': 1000,
+}
+
+# in-memory bitmap indexes of movies by genres, countries and languages for filters, see cinemanio.api.bitmaps:
+# max amount of found ids or ranges of them passed to DB as list, amount of applied changes between snapshots saved
+# to shared cache, time to retry failed building of snapshot, time to keep changes in the log for syncing workers
+# and max amount of changes to apply instead of rebuilding
+BITMAP_INDEX = {
+    'ENABLED': config('BITMAP_INDEX', default=True, cast=bool),
+    'MAX_IDS': 1000,
+    'SNAPSHOT_INTERVAL': 100,
+    'BUILD_TIMEOUT': 60 * 60,
+    'CHANGES_TIMEOUT': 24 * 60 * 60,
+    'MAX_CHANGES': 1000,
+}
+
 # algolia search
 ALGOLIA = {
     'APPLICATION_ID': config('ALGOLIASEARCH_APPLICATION_ID', default='', cast=str),
     'API_KEY': config('ALGOLIASEARCH_API_KEY', default='', cast=str),
+    # records are sent in bulk by search outbox instead of every save
+    'AUTO_INDEXING': False,
 }
 
 # registration
@@ -23,6 +23,8 @@ LOGGING = {
     'loggers': {},
 }
 
+SEARCH_BACKEND = 'cinemanio.core.search.SimpleSearchBackend'
+
 ALGOLIA = {
     'APPLICATION_ID': '',
     'API_KEY': '',
@@ -0,0 +1,492 @@
+import gzip
+import json
+import os
+from itertools import islice
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Type  # noqa
+
+from django.db import connection, transaction
+from django.db.models import Model
+from django.utils import timezone
+
+from cinemanio.core.models import Movie, Person, Cast, Genre, Role, SearchOutbox
+from cinemanio.sites.imdb.importer import AUTHOR_NOTES, MERGED_PERSON_IDS, SERIES_KINDS, split_name
+from cinemanio.sites.imdb.models import ImdbMovie, ImdbPerson, ImdbGenre
+from cinemanio.sites.signals import site_imported
+
+NULL = '\\N'
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+# kinds of IMDbPY by types of titles, episodes and video games are not imported like by ImdbMovieImporter
+TITLE_KINDS = {
+    'movie': 'movie',
+    'short': 'short',
+    'tvMovie': 'tv movie',
+    'tvShort': 'tv short',
+    'tvSpecial': 'tv special',
+    'tvSeries': 'tv series',
+    'tvMiniSeries': 'tv mini series',
+    'video': 'video movie',
+}
+# roles by categories of principals, the same as roles imported by ImdbMovieImporter._add_roles
+ROLES = {
+    'director': Role.DIRECTOR_ID,
+    'actor': Role.ACTOR_ID,
+    'actress': Role.ACTOR_ID,
+    'producer': Role.PRODUCER_ID,
+    'editor': Role.EDITOR_ID,
+    'writer': Role.SCENARIST_ID,
+    'cinematographer': Role.OPERATOR_ID,
+}
+# russian titles are found among akas by region or language, see ImdbMovieImporter._get_title
+RUSSIAN_REGION = 'RU'
+RUSSIAN_LANGUAGE = 'ru'
+SMALLINT_MAX = 32767
+
+Row = Dict[str, Optional[str]]
+# values of row of temporary table
+Values = Tuple[Any, ...]
+Parser = Callable[..., Iterator[Values]]
+
+
+def open_dataset(path: str) -> IO[str]:
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='\n')
+    return open(path, 'rt', encoding='utf-8', newline='\n')
+
+
+def read_dataset(path: str) -> Iterator[Row]:
+    """
+    Read rows of gzipped or plain TSV dump line by line, \\N values are None
+    """
+    with open_dataset(path) as file:
+        columns = next(file).rstrip('\n').split('\t')
+        for line in file:
+            values = line.rstrip('\n').split('\t')
+            yield {column: None if value == NULL else value for column, value in zip(columns, values)}
+
+
+def get_id(value: str) -> int:
+    """
+    Return IMDb ID of tconst or nconst like tt0133093
+    """
+    return int(value[2:])
+
+
+def get_int(value: Optional[str], maximum: Optional[int] = None) -> Optional[int]:
+    if value is None or not value.isdigit() or maximum is not None and int(value) > maximum:
+        return None
+    return int(value)
+
+
+def get_kind(row: Row) -> Optional[str]:
+    return TITLE_KINDS.get(row['titleType'] or '')
+
+
+def parse_titles(rows: Iterable[Row]) -> Iterator[Values]:
+    for row in rows:
+        tconst = row['tconst']
+        if tconst is not None and get_kind(row) is not None:
+            yield (get_id(tconst), (row['primaryTitle'] or '')[:200],
+                   get_int(row['startYear'], SMALLINT_MAX), get_int(row['runtimeMinutes'], SMALLINT_MAX))
+
+
+def parse_title_genres(rows: Iterable[Row], genres: Dict[str, int]) -> Iterator[Values]:
+    """
+    Return genres of titles: genres of IMDb and series genre by type of title, see ImdbMovieImporter._get_types
+    """
+    for row in rows:
+        tconst, kind = row['tconst'], get_kind(row)
+        if tconst is None or kind is None:
+            continue
+        ids = {genres[name] for name in (row['genres'] or '').split(',') if name in genres}
+        if kind in SERIES_KINDS:
+            ids.add(Genre.SERIES_ID)
+        for genre_id in sorted(ids):
+            yield get_id(tconst), genre_id
+
+
+def parse_akas(rows: Iterable[Row]) -> Iterator[Values]:
+    for row in rows:
+        title_id = row['titleId']
+        if title_id is not None and (row['region'] == RUSSIAN_REGION or row['language'] == RUSSIAN_LANGUAGE):
+            title = (row['title'] or '').strip()
+            if len(title) > 2 and title[0] == title[-1] == '"':
+                title = title[1:-1]
+            yield get_id(title_id), get_int(row['ordering']), title[:200]
+
+
+def parse_ratings(rows: Iterable[Row]) -> Iterator[Values]:
+    for row in rows:
+        tconst, rating = row['tconst'], row['averageRating']
+        if tconst is not None and rating is not None:
+            yield get_id(tconst), float(rating), get_int(row['numVotes'])
+
+
+def parse_names(rows: Iterable[Row]) -> Iterator[Values]:
+    for row in rows:
+        nconst = row['nconst']
+        if nconst is not None:
+            first, last = split_name(row['primaryName'] or '')
+            yield get_id(nconst), first[:50], last[:50]
+
+
+def parse_principals(rows: Iterable[Row]) -> Iterator[Values]:
+    """
+    Return roles of persons in titles with names of roles of actors, see ImdbMovieImporter.create_cast
+    """
+    for row in rows:
+        tconst, nconst, characters = row['tconst'], row['nconst'], row['characters']
+        role_id = ROLES.get(row['category'] or '')
+        if tconst is None or nconst is None or role_id is None or get_id(nconst) in MERGED_PERSON_IDS:
+            continue
+        if role_id == Role.SCENARIST_ID and AUTHOR_NOTES.search(row['job'] or ''):
+            role_id = Role.AUTHOR_ID
+        name = ''
+        if role_id == Role.ACTOR_ID and characters:
+            try:
+                name = (json.loads(characters) or [''])[0][:1000]
+            except (ValueError, TypeError):
+                pass
+        yield get_id(tconst), get_id(nconst), role_id, name
+
+
+def format_copy_row(row: Values) -> str:
+    return '\t'.join(NULL if value is None else str(value).translate(COPY_ESCAPES) for value in row) + '\n'
+
+
+class CopyStream:
+    """
+    File-like object reading rows in text format of COPY, so rows are streamed to DB without buffering all of them
+    """
+
+    def __init__(self, rows: Iterable[Values]):
+        self.rows = iter(rows)
+        self.buffer = ''
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        lines = [self.buffer]
+        length = len(self.buffer)
+        while size < 0 or length < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            line = format_copy_row(row)
+            lines.append(line)
+            length += len(line)
+            self.count += 1
+        data = ''.join(lines)
+        if size < 0:
+            size = len(data)
+        data, self.buffer = data[:size], data[size:]
+        return data
+
+
+def get_defaults(model: Type[Model], exclude: Iterable[str]) -> Tuple[List[str], List[Any]]:
+    """
+    Return columns and values of defaults of fields of model, that aren't inserted explicitly,
+    defaults of Django fields don't exist in DB
+    """
+    columns, values = [], []
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.null or field.column in exclude or not field.has_default():
+            continue
+        columns.append(field.column)
+        values.append(field.get_db_prep_save(field.get_default(), connection))
+    return columns, values
+
+
+def get_object_column(imdb_model: Type[Model]) -> str:
+    """
+    Return column of object of IMDb model: movie_id or person_id
+    """
+    return next(field.column for field in imdb_model._meta.concrete_fields if field.one_to_one)
+
+
+class ImdbDatasetsImporter:
+    """
+    Bulk importer of movies, persons and cast from IMDb datasets https://www.imdb.com/interfaces/:
+    title.basics, title.akas, title.ratings, name.basics and title.principals gzipped TSV dumps.
+    Dumps are read line by line and staged into temporary tables by COPY in PostgreSQL and by batches of inserts
+    in other databases. Staged data is upserted by set-based queries with the same rules as ImdbMovieImporter
+    and ImdbPersonImporter: objects are found by IMDb ID, then by title and year or by name, or created.
+    Queries are formatted only with names of tables and columns taken from _meta of models and constants,
+    values are always passed as params, so formatted SQL is marked with nosec
+    """
+    stages = (
+        # table, dataset, parser, columns
+        ('imdb_stage_title', 'title.basics', parse_titles,
+         (('tconst', 'integer'), ('title', 'varchar(200)'), ('year', 'integer'), ('runtime', 'integer'))),
+        ('imdb_stage_genre', 'title.basics', parse_title_genres, (('tconst', 'integer'), ('genre_id', 'integer'))),
+        ('imdb_stage_aka', 'title.akas', parse_akas,
+         (('tconst', 'integer'), ('ordering', 'integer'), ('title', 'varchar(200)'))),
+        ('imdb_stage_rating', 'title.ratings', parse_ratings,
+         (('tconst', 'integer'), ('rating', 'real'), ('votes', 'integer'))),
+        ('imdb_stage_name', 'name.basics', parse_names,
+         (('nconst', 'integer'), ('first_name', 'varchar(50)'), ('last_name', 'varchar(50)'))),
+        ('imdb_stage_principal', 'title.principals', parse_principals,
+         (('tconst', 'integer'), ('nconst', 'integer'), ('role_id', 'integer'), ('name', 'varchar(1000)'))),
+    )  # type: Tuple[Tuple[str, str, Parser, Tuple[Tuple[str, str], ...]], ...]
+
+    def __init__(self, directory: str, batch_size: int = 10000):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.now = connection.ops.adapt_datetimefield_value(timezone.now())
+        self.tables = []  # type: List[str]
+        self.counts = {}  # type: Dict[str, int]
+
+    def get_path(self, dataset: str) -> str:
+        for extension in ('.tsv.gz', '.tsv'):
+            path = os.path.join(self.directory, dataset + extension)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"IMDb dataset {dataset} is not found in {self.directory}")
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        # params are always passed, so %% are unescaped by every backend
+        with connection.cursor() as cursor:
+            cursor.execute(sql, list(params))
+            return cursor.rowcount
+
+    def count(self, table: str) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {table}')  # nosec
+            return cursor.fetchone()[0]
+
+    def run(self) -> Dict[str, int]:
+        """
+        Import datasets, return amounts of staged rows and imported objects
+        """
+        genres = dict(ImdbGenre.objects.exclude(name=None).values_list('name', 'genre_id'))
+        try:
+            for table, dataset, parser, columns in self.stages:
+                rows = read_dataset(self.get_path(dataset))
+                values = parser(rows, genres) if parser is parse_title_genres else parser(rows)
+                self.counts[table] = self.stage(table, columns, values)
+            with transaction.atomic():
+                self.import_movies()
+                self.import_persons()
+                self.import_cast()
+                self.update_search_texts(Movie, 'imdb_stage_movie', 'movie_id')
+                self.update_search_texts(Person, 'imdb_stage_person', 'person_id')
+                site_imported.send(sender=self.__class__, models=[Movie, Person])
+        finally:
+            for table in reversed(self.tables):
+                self.execute(f'DROP TABLE IF EXISTS {table}')
+            self.tables = []
+        return self.counts
+
+    def create_table(self, table: str, sql: str, params: Sequence[Any] = (), indexes: Sequence[str] = ()) -> int:
+        """
+        Create temporary table from query, it's dropped after import
+        """
+        self.tables.append(table)
+        self.execute(f'CREATE TEMPORARY TABLE {table} AS {sql}', params)
+        for column in indexes:
+            self.execute(f'CREATE INDEX {table}_{column} ON {table} ({column})')
+        return self.count(table)
+
+    def drop_table(self, table: str) -> None:
+        self.execute(f'DROP TABLE {table}')
+        self.tables.remove(table)
+
+    def stage(self, table: str, columns: Sequence[Tuple[str, str]], rows: Iterable[Values]) -> int:
+        """
+        Create temporary table and fill it by rows, return amount of rows
+        """
+        self.tables.append(table)
+        names = [name for name, _ in columns]
+        self.execute(f'CREATE TEMPORARY TABLE {table} ({", ".join(" ".join(column) for column in columns)})')
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                stream = CopyStream(rows)
+                cursor.copy_expert(f'COPY {table} ({", ".join(names)}) FROM STDIN', stream)
+                count = stream.count
+            else:
+                count = 0
+                sql = f'INSERT INTO {table} ({", ".join(names)}) VALUES ({", ".join(["%s"] * len(names))})'
+                rows = iter(rows)
+                batch = list(islice(rows, self.batch_size))
+                while batch:
+                    cursor.executemany(sql, batch)
+                    count += len(batch)
+                    batch = list(islice(rows, self.batch_size))
+        self.execute(f'CREATE INDEX {table}_{names[0]} ON {table} ({names[0]})')
+        if connection.vendor == 'postgresql':
+            self.execute(f'ANALYZE {table}')
+        return count
+
+    def link(self, imdb_model: Type[Model], matches: str, oldest: bool = False) -> int:
+        """
+        Create IMDb IDs of objects matching staged IMDb objects, query of matches returns imdb_id and object_id.
+        Objects matching several IMDb IDs are skipped, IMDb IDs matching several objects are skipped too,
+        if oldest, the oldest of them is linked like ImdbMovieImporter.create_cast does for cast of movie
+        """
+        self.create_table('imdb_stage_match', matches)
+        unique = '' if oldest else \
+            'AND imdb_id IN (SELECT imdb_id FROM imdb_stage_match GROUP BY imdb_id HAVING COUNT(*) = 1)'
+        count = self.execute(f'''
+            INSERT INTO {imdb_model._meta.db_table} (id, {get_object_column(imdb_model)})
+            SELECT imdb_id, MIN(object_id) FROM imdb_stage_match
+            WHERE object_id IN (SELECT object_id FROM imdb_stage_match GROUP BY object_id
+                                HAVING COUNT(DISTINCT imdb_id) = 1) {unique}
+            GROUP BY imdb_id''')  # nosec
+        self.drop_table('imdb_stage_match')
+        return count
+
+    def create(self, model: Type[Model], imdb_model: Type[Model], columns: Sequence[str], values: Sequence[str],
+               rows: str) -> int:
+        """
+        Create objects from rows of query with imdb_id column by one insert, then create their IMDb IDs.
+        IDs of objects are assigned in advance in temporary table mapping them to IMDb IDs: from sequence in PostgreSQL,
+        after the greatest ID in other databases, where writes are serialized by transaction of import
+        """
+        table = model._meta.db_table
+        if connection.vendor == 'postgresql':
+            object_id, params = "nextval(pg_get_serial_sequence(%s, 'id'))", [table]
+        else:
+            object_id = f'(SELECT COALESCE(MAX(id), 0) FROM {table}) + ROW_NUMBER() OVER (ORDER BY imdb_id)'  # nosec
+            params = []
+        self.create_table('imdb_stage_new', f'SELECT r.*, {object_id} AS object_id FROM ({rows}) r', params)
+        default_columns, default_values = get_defaults(model, exclude=columns)
+        count = self.execute(f'''
+            INSERT INTO {table} ({", ".join(["id"] + list(columns) + default_columns)})
+            SELECT {", ".join(["object_id"] + list(values) + ["%s"] * len(default_values))} FROM imdb_stage_new''',
+                             default_values)
+        self.execute(f'''
+            INSERT INTO {imdb_model._meta.db_table} (id, {get_object_column(imdb_model)})
+            SELECT imdb_id, object_id FROM imdb_stage_new''')  # nosec
+        self.drop_table('imdb_stage_new')
+        return count
+
+    def import_movies(self) -> None:
+        """
+        Find or create movies of staged titles, update them, see ImdbMovieImporter.apply_remote_data.
+        Movies are not marked as synced, so the rest of their data is synced from IMDb later
+        """
+        movie, imdb, genres = Movie._meta.db_table, ImdbMovie._meta.db_table, Movie.genres.through._meta.db_table
+        # movies without IMDb ID by title and year, see ImdbPersonImporter.create_cast
+        self.counts['movies_linked'] = self.link(ImdbMovie, f'''
+            SELECT t.tconst AS imdb_id, m.id AS object_id FROM imdb_stage_title t
+            JOIN {movie} m ON m.title_en = t.title AND m.year = t.year
+            WHERE NOT EXISTS (SELECT 1 FROM {imdb} i WHERE i.id = t.tconst)
+            AND NOT EXISTS (SELECT 1 FROM {imdb} i WHERE i.movie_id = m.id)''')  # nosec
+        self.counts['movies_created'] = self.create(
+            Movie, ImdbMovie, ['title', 'title_en', 'year', 'runtime'], ['title', 'title', 'year', 'runtime'], f'''
+            SELECT tconst AS imdb_id, title, year, runtime FROM imdb_stage_title t
+            WHERE NOT EXISTS (SELECT 1 FROM {imdb} i WHERE i.id = t.tconst)''')  # nosec
+        self.counts['movies'] = self.create_table('imdb_stage_movie', f'''
+            SELECT i.movie_id, i.id AS tconst FROM {imdb} i
+            WHERE i.id IN (SELECT tconst FROM imdb_stage_title)''', indexes=['movie_id', 'tconst'])  # nosec
+
+        # title, year and runtime are updated even if there are values
+        title = ('SELECT t.{} FROM imdb_stage_title t JOIN imdb_stage_movie s ON s.tconst = t.tconst '  # nosec
+                 f'WHERE s.movie_id = {movie}.id')  # nosec
+        self.execute(f'''
+            UPDATE {movie} SET title_en = ({title.format('title')}),
+            year = COALESCE(({title.format('year')}), year), runtime = COALESCE(({title.format('runtime')}), runtime)
+            WHERE id IN (SELECT movie_id FROM imdb_stage_movie)''')  # nosec
+        # russian title is updated only if there is no value
+        self.execute(f'''
+            UPDATE {movie} SET title_ru = (
+                SELECT a.title FROM imdb_stage_aka a JOIN imdb_stage_movie s ON s.tconst = a.tconst
+                WHERE s.movie_id = {movie}.id ORDER BY a.ordering LIMIT 1)
+            WHERE (title_ru IS NULL OR title_ru = '')
+            AND id IN (SELECT s.movie_id FROM imdb_stage_movie s
+                       JOIN imdb_stage_aka a ON a.tconst = s.tconst)''')  # nosec
+        rating = f'SELECT r.{{}} FROM imdb_stage_rating r WHERE r.tconst = {imdb}.id'  # nosec
+        self.execute(f'''
+            UPDATE {imdb} SET rating = ({rating.format('rating')}), votes = ({rating.format('votes')})
+            WHERE id IN (SELECT tconst FROM imdb_stage_movie)
+            AND id IN (SELECT tconst FROM imdb_stage_rating)''')  # nosec
+        # genres are added to existing ones
+        self.execute(f'''
+            INSERT INTO {genres} (movie_id, genre_id)
+            SELECT DISTINCT s.movie_id, g.genre_id FROM imdb_stage_genre g JOIN imdb_stage_movie s ON s.tconst = g.tconst
+            WHERE NOT EXISTS (SELECT 1 FROM {genres} mg
+                              WHERE mg.movie_id = s.movie_id AND mg.genre_id = g.genre_id)''')  # nosec
+
+    def import_persons(self) -> None:
+        """
+        Find or create persons of principals of imported movies, see ImdbMovieImporter.create_cast.
+        Persons are not marked as synced, dates of birth and death are not in datasets
+        """
+        person, imdb, cast = Person._meta.db_table, ImdbPerson._meta.db_table, Cast._meta.db_table
+        self.create_table('imdb_stage_cast', '''
+            SELECT s.movie_id, p.nconst, p.role_id, p.name FROM imdb_stage_principal p
+            JOIN imdb_stage_movie s ON s.tconst = p.tconst''', indexes=['nconst'])
+        not_linked = (f'NOT EXISTS (SELECT 1 FROM {imdb} i WHERE i.id = n.nconst) '  # nosec
+                      f'AND NOT EXISTS (SELECT 1 FROM {imdb} i WHERE i.person_id = p.id)')  # nosec
+        # persons without IMDb ID by name among persons of movie with the same role
+        self.counts['persons_linked'] = self.link(ImdbPerson, f'''
+            SELECT n.nconst AS imdb_id, p.id AS object_id FROM imdb_stage_cast sc
+            JOIN imdb_stage_name n ON n.nconst = sc.nconst
+            JOIN {cast} c ON c.movie_id = sc.movie_id AND c.role_id = sc.role_id
+            JOIN {person} p ON p.id = c.person_id AND p.first_name_en = n.first_name AND p.last_name_en = n.last_name
+            WHERE {not_linked}''', oldest=True)  # nosec
+        # persons without IMDb ID by name among all persons
+        self.counts['persons_linked'] += self.link(ImdbPerson, f'''
+            SELECT n.nconst AS imdb_id, p.id AS object_id FROM imdb_stage_name n
+            JOIN {person} p ON p.first_name_en = n.first_name AND p.last_name_en = n.last_name
+            WHERE n.nconst IN (SELECT nconst FROM imdb_stage_cast) AND {not_linked}''')  # nosec
+        self.counts['persons_created'] = self.create(
+            Person, ImdbPerson, ['first_name', 'last_name', 'first_name_en', 'last_name_en'],
+            ['first_name', 'last_name', 'first_name', 'last_name'], f'''
+            SELECT nconst AS imdb_id, first_name, last_name FROM imdb_stage_name n
+            WHERE n.nconst IN (SELECT nconst FROM imdb_stage_cast)
+            AND NOT EXISTS (SELECT 1 FROM {imdb} i WHERE i.id = n.nconst)''')  # nosec
+        self.counts['persons'] = self.create_table('imdb_stage_person', f'''
+            SELECT i.person_id, i.id AS nconst FROM {imdb} i
+            WHERE i.id IN (SELECT nconst FROM imdb_stage_cast)''', indexes=['person_id', 'nconst'])  # nosec
+        # english name is updated only if there is no value
+        for field in ('first_name', 'last_name'):
+            self.execute(f'''
+                UPDATE {person} SET {field}_en = (
+                    SELECT n.{field} FROM imdb_stage_name n JOIN imdb_stage_person s ON s.nconst = n.nconst
+                    WHERE s.person_id = {person}.id)
+                WHERE ({field}_en IS NULL OR {field}_en = '')
+                AND id IN (SELECT s.person_id FROM imdb_stage_person s
+                           JOIN imdb_stage_name n ON n.nconst = s.nconst)''')  # nosec
+
+    def import_cast(self) -> None:
+        """
+        Create cast of imported movies and persons, add source and names of roles of actors to existing one
+        """
+        cast = Cast._meta.db_table
+        staged = f'''
+            FROM imdb_stage_cast sc JOIN imdb_stage_person s ON s.nconst = sc.nconst
+            WHERE sc.movie_id = {cast}.movie_id AND s.person_id = {cast}.person_id AND sc.role_id = {cast}.role_id'''
+        self.execute(f'''
+            UPDATE {cast} SET sources = CASE WHEN sources = '' THEN 'imdb' ELSE sources || ',imdb' END,
+            updated_at = %s WHERE sources NOT LIKE %s AND EXISTS (SELECT 1 {staged})''', [self.now, '%imdb%'])
+        # names of roles of actors are updated only if there is no value
+        self.execute(f'''
+            UPDATE {cast} SET name_en = (SELECT MIN(sc.name) {staged} AND sc.name != '')
+            WHERE (name_en IS NULL OR name_en = '') AND role_id = %s
+            AND EXISTS (SELECT 1 {staged} AND sc.name != '')''', [Role.ACTOR_ID])
+        columns = ['movie_id', 'person_id', 'role_id', 'name_en', 'sources', 'created_at', 'updated_at']
+        default_columns, default_values = get_defaults(Cast, exclude=columns)
+        self.counts['cast_created'] = self.execute(f'''
+            INSERT INTO {cast} ({", ".join(columns + default_columns)})
+            SELECT sc.movie_id, s.person_id, sc.role_id, MIN(sc.name), %s, %s, %s{", %s" * len(default_values)}
+            FROM imdb_stage_cast sc JOIN imdb_stage_person s ON s.nconst = sc.nconst
+            WHERE NOT EXISTS (SELECT 1 FROM {cast} c
+                              WHERE c.movie_id = sc.movie_id AND c.person_id = s.person_id AND c.role_id = sc.role_id)
+            GROUP BY sc.movie_id, s.person_id, sc.role_id''', ['imdb', self.now, self.now] + default_values)  # nosec
+
+    def update_search_texts(self, model: Type[Model], table: str, column: str) -> None:
+        """
+        Compute search texts of imported objects by batches and record them in search outbox
+        """
+        # RawSQL in pk__in is wrapped into parentheses twice, it's a scalar subquery in SQLite
+        where = f'"{model._meta.db_table}"."id" IN (SELECT {column} FROM {table})'  # nosec
+        queryset = model.objects.extra(where=[where]).order_by('pk')  # nosec
+        last = 0
+        while True:
+            objects = list(queryset.filter(pk__gt=last)[:self.batch_size])
+            if not objects:
+                break
+            for instance in objects:
+                instance.search_text = instance.get_search_text()
+            model.objects.bulk_update(objects, ['search_text'])
+            SearchOutbox.objects.add(objects)
+            last = objects[-1].pk
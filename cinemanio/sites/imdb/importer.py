@@ -13,6 +13,23 @@ from cinemanio.sites.exceptions import SiteIDDoesNotExist
 
 logger = logging.getLogger(__name__)
 
+# notes of writers, who are authors of the source of the script
+AUTHOR_NOTES = re.compile(r'story|novel')
+# persons merged on IMDb into others, https://github.com/alberanid/imdbpy/issues/242
+MERGED_PERSON_IDS = (440022,)
+# kinds of movies marked by series genre
+SERIES_KINDS = ('tv series', 'tv mini series')
+
+
+def split_name(name) -> Tuple[str, str]:
+    """
+    Return first and last name of full name: the first word and the rest
+    """
+    names = name.split()
+    first = names[0] if names else ''
+    last = ' '.join(names[1:])
+    return first, last
+
 
 class ImdbImporterBase:
     """
@@ -125,10 +142,7 @@ class ImdbPersonImporter(ImdbImporterBase):
 
         # 'name': 'IMDb, Robert De Niro -'
         if name.find('IMDb') != -1:
-            name = re.sub(r'IMDb, (.+) -', r'\1', name)
-            names = name.split()
-            first = names[0]
-            last = ' '.join(names[1:]) if len(names) > 1 else ''
+            first, last = split_name(re.sub(r'IMDb, (.+) -', r'\1', name))
         else:
             last, first = self.get_name_parts(name)
 
@@ -194,7 +208,7 @@ class ImdbPersonImporter(ImdbImporterBase):
         year = imdb_movie.data.get('year')
 
         # if writer has note story or novel, then it must be a
-        if role.is_scenarist() and re.search(r'story|novel', imdb_movie.notes):
+        if role.is_scenarist() and AUTHOR_NOTES.search(imdb_movie.notes):
             role = Role.objects.get_author()
 
         cast_kwargs = dict(person=self.object, role=role, defaults=dict(sources='imdb'))
@@ -372,7 +386,7 @@ class ImdbMovieImporter(ImdbImporterBase):
                 or data.get('languages') and 'None' in data.get('languages'):
             ids += [Genre.SILENT_ID]
 
-        if data.get('kind') in ['tv series', 'tv mini series']:
+        if data.get('kind') in SERIES_KINDS:
             ids += [Genre.SERIES_ID]
         # 'number of seasons': 5
         # 'series years': '2004-2006'
@@ -437,7 +451,7 @@ class ImdbMovieImporter(ImdbImporterBase):
         last, first = self.get_name_parts(imdb_person.data['name'])
 
         # if writer has note story or novel, then it must be a
-        if role.is_scenarist() and re.search(r'story|novel', imdb_person.notes):
+        if role.is_scenarist() and AUTHOR_NOTES.search(imdb_person.notes):
             role = Role.objects.get_author()
 
         cast_kwargs = dict(movie=self.object, role=role, defaults=dict(sources='imdb'))
@@ -465,7 +479,7 @@ class ImdbMovieImporter(ImdbImporterBase):
 
         # special case with merged person
         # https://github.com/alberanid/imdbpy/issues/242
-        if int(imdb_id) == 440022:
+        if int(imdb_id) in MERGED_PERSON_IDS:
             return cast
 
         ImdbPerson.objects.update_or_create(person=cast.person, defaults={'id': int(imdb_id)})
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from cinemanio.sites.imdb.datasets import ImdbDatasetsImporter
+
+
+class Command(BaseCommand):
+    """
+    Management command to import movies, persons and cast in bulk from IMDb datasets
+    downloaded from https://datasets.imdbws.com/, see cinemanio.sites.imdb.datasets.ImdbDatasetsImporter
+    """
+    help = 'Import movies, persons and cast from directory with IMDb datasets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory with title.basics.tsv.gz and other datasets')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Number of rows inserted at once')
+
+    def handle(self, *args, **options):
+        counts = ImdbDatasetsImporter(options['directory'], options['batch_size']).run()
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count}')
+        self.stdout.write(self.style.SUCCESS('Imported IMDb datasets'))
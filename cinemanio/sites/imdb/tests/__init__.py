@@ -1,7 +1,9 @@
+from .datasets import ImdbDatasetsTest
 from .models import ImdbTest
 from .sync import ImdbSyncTest
 
 __all__ = [
+    'ImdbDatasetsTest',
     'ImdbTest',
     'ImdbSyncTest',
 ]
@@ -0,0 +1,142 @@
+import gzip
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+
+from cinemanio.core.factories import MovieFactory, PersonFactory, CastFactory
+from cinemanio.core.models import Movie, Person, Cast, Genre
+from cinemanio.core.tests.base import BaseTestCase
+from cinemanio.sites.imdb.datasets import CopyStream, ImdbDatasetsImporter, read_dataset
+from cinemanio.sites.imdb.factories import ImdbMovieFactory
+from cinemanio.sites.imdb.models import ImdbPerson
+from cinemanio.sites.imdb.tests.mixins import ImdbSyncMixin
+
+DUMPS = os.path.join(os.path.dirname(__file__), 'dumps')
+
+
+class ImdbDatasetsTest(BaseTestCase):
+    fixtures = BaseTestCase.fixtures + ImdbSyncMixin.fixtures
+
+    def setUp(self):
+        super().setUp()
+        self.matrix = MovieFactory(title_en='The Matrix', year=1999, runtime=None, title_ru='',
+                                   genres=[self.get_genre('Drama')])
+        self.reloaded = ImdbMovieFactory(id=234215, movie__title_en='Matrix 2', movie__year=2000,
+                                         movie__genres=[]).movie
+        self.keanu = PersonFactory(first_name_en='Keanu', last_name_en='Reeves')
+        self.keanu_cast = CastFactory(movie=self.matrix, person=self.keanu, role=self.actor, name_en='',
+                                      sources='kinopoisk')
+        self.fishburne = PersonFactory(first_name_en='Laurence', last_name_en='Fishburne')
+        # namesakes are not linked
+        PersonFactory.create_batch(2, first_name_en='Bryan', last_name_en='Cranston')
+
+    def get_genre(self, name):
+        return Genre.objects.get(imdb__name=name)
+
+    def get_genres(self, *names):
+        return {self.get_genre(name) for name in names}
+
+    def run_import(self):
+        with mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func()), \
+                mock.patch('cinemanio.api.changes.ChangeLog.reset') as reset, \
+                mock.patch('cinemanio.api.signals.invalidate') as invalidate:
+            counts = ImdbDatasetsImporter(DUMPS, batch_size=2).run()
+        # cached responses are invalidated, autocomplete and bitmaps of workers are rebuilt after commit
+        invalidate.assert_called_once_with('movie', 'person')
+        self.assertEqual(reset.call_count, 2)
+        return counts
+
+    def test_import(self):
+        counts = self.run_import()
+        self.assertEqual(counts['imdb_stage_title'], 4)
+        self.assertEqual(counts['imdb_stage_principal'], 8)
+        self.assertEqual(counts['movies_linked'], 1)
+        self.assertEqual(counts['movies_created'], 2)
+        self.assertEqual(counts['persons_linked'], 2)
+        self.assertEqual(counts['persons_created'], 3)
+        self.assertEqual(Movie.objects.count(), 4)
+
+        # found by title and year
+        self.matrix.refresh_from_db()
+        self.assertEqual(self.matrix.imdb.id, 133093)
+        self.assertEqual(self.matrix.imdb.rating, 8.7)
+        self.assertEqual(self.matrix.imdb.votes, 2012345)
+        self.assertIsNone(self.matrix.imdb.synced_at)
+        self.assertEqual(self.matrix.runtime, 136)
+        self.assertEqual(self.matrix.title_ru, 'Матрица')
+        self.assertEqual(set(self.matrix.genres.all()), self.get_genres('Drama', 'Action', 'Sci-Fi'))
+        # found by IMDb ID
+        self.reloaded.refresh_from_db()
+        self.assertEqual(self.reloaded.title_en, 'The Matrix Reloaded')
+        self.assertEqual(self.reloaded.year, 2003)
+        # created
+        carmencita = Movie.objects.get(imdb__id=1)
+        self.assertEqual((carmencita.title, carmencita.year, carmencita.runtime), ('Carmencita', 1894, 1))
+        self.assertEqual(set(carmencita.genres.all()), self.get_genres('Documentary', 'Short'))
+        self.assertIn('\ncarmencita\n', carmencita.search_text)
+        # IDs of created movies aren't taken again
+        self.assertGreater(MovieFactory().id, carmencita.id)
+        breaking_bad = Movie.objects.get(imdb__id=903747)
+        self.assertEqual(breaking_bad.title_ru, 'Во все тяжкие')
+        self.assertEqual(set(breaking_bad.genres.all()),
+                         self.get_genres('Crime', 'Drama', 'Thriller') | {Genre.objects.get(id=Genre.SERIES_ID)})
+
+        # found by name among persons of movie and among all persons
+        self.assertEqual(Person.objects.get(imdb__id=206), self.keanu)
+        self.assertEqual(Person.objects.get(imdb__id=401), self.fishburne)
+        self.assertIsNone(ImdbPerson.objects.get(id=206).synced_at)
+        lana = Person.objects.get(imdb__id=905152)
+        self.assertEqual((lana.first_name_en, lana.last_name_en), ('Lana', 'Wachowski'))
+        self.assertIn('\nlana wachowski\n', lana.search_text)
+        self.assertEqual(Person.objects.filter(first_name_en='Bryan', last_name_en='Cranston').count(), 3)
+        self.assertFalse(ImdbPerson.objects.filter(id__in=[440022, 1588970]).exists())
+
+        self.keanu_cast.refresh_from_db()
+        self.assertEqual((self.keanu_cast.name_en, self.keanu_cast.sources), ('Neo', 'kinopoisk,imdb'))
+        self.assertEqual(set(Cast.objects.filter(movie=self.matrix).values_list('person__imdb__id', 'role_id')),
+                         {(206, self.actor.id), (401, self.actor.id),
+                          (905152, self.director.id), (905152, self.scenarist.id)})
+        self.assertEqual(Cast.objects.get(movie=self.reloaded, person=self.keanu).name_en, 'Neo')
+        self.assertEqual(set(Cast.objects.filter(movie=breaking_bad).values_list('person__imdb__id', 'role_id')),
+                         {(186505, self.actor.id), (319213, self.author.id)})
+        self.assertEqual(Cast.objects.get(person__imdb__id=186505).sources, 'imdb')
+
+    def test_import_again(self):
+        self.run_import()
+        amounts = Movie.objects.count(), Person.objects.count(), Cast.objects.count()
+        counts = self.run_import()
+        self.assertEqual((counts['movies_created'], counts['persons_created'], counts['cast_created']), (0, 0, 0))
+        self.assertEqual((Movie.objects.count(), Person.objects.count(), Cast.objects.count()), amounts)
+        self.assertEqual(Cast.objects.get(person=self.keanu, movie=self.matrix).sources, 'kinopoisk,imdb')
+
+    def test_command(self):
+        out = StringIO()
+        with mock.patch('django.db.transaction.on_commit'), mock.patch('cinemanio.api.signals.invalidate') as invalidate:
+            call_command('import_imdb_datasets', DUMPS, stdout=out)
+        invalidate.assert_not_called()
+        self.assertIn('movies_created: 2', out.getvalue())
+
+    def test_read_gzipped_dataset(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'title.ratings.tsv.gz')
+        with open(os.path.join(DUMPS, 'title.ratings.tsv'), 'rb') as source, gzip.open(path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        rows = list(read_dataset(path))
+        self.assertEqual(rows, list(read_dataset(os.path.join(DUMPS, 'title.ratings.tsv'))))
+        self.assertEqual(rows[1], {'tconst': 'tt0133093', 'averageRating': '8.7', 'numVotes': '2012345'})
+        self.assertIsNone(next(read_dataset(os.path.join(DUMPS, 'title.basics.tsv')))['endYear'])
+
+    def test_copy_stream(self):
+        stream = CopyStream([(1, 'tab\tand\nnewline'), (2, None), (3, 'back\\slash')])
+        chunks = []
+        chunk = stream.read(5)
+        while chunk:
+            chunks.append(chunk)
+            chunk = stream.read(5)
+        self.assertEqual(''.join(chunks), '1\ttab\\tand\\nnewline\n2\t\\N\n3\tback\\\\slash\n')
+        self.assertEqual(stream.count, 3)
@@ -1,15 +1,16 @@
 import logging
 import operator
 from functools import reduce
-from typing import List, Tuple, Any
+from typing import Any, Dict, List, Tuple
 
+import requests
 from alphabet_detector import AlphabetDetector
 from django.db.models import Q
 from kinopoisk.movie import Movie as KinoMovie
 from kinopoisk.person import Person as KinoPerson
 
 from cinemanio.core.models import Movie, Person, Genre, Country, Role, Cast
-from cinemanio.images.models import ImageWrongType, ImageType
+from cinemanio.images.models import DownloadedImage, Image, ImageWrongType, ImageTooLarge, ImageType, downloader
 
 logger = logging.getLogger(__name__)
 
@@ -36,16 +37,45 @@ class SyncBase:
             self._remote_obj = self.model(id=self.id)
         return self._remote_obj
 
-    def sync_image(self, url, instance, **kwargs) -> None:
+    def sync_image(self, url, instance, downloaded=None, **kwargs) -> None:
+        """
+        Link image to instance, downloaded image or exception raised during its download could be provided
+        """
         extra = dict(url=url, instance=instance)
         try:
-            downloaded = instance.images.get_or_download(url, **kwargs)[1]
-            if downloaded:
+            if isinstance(downloaded, Exception):
+                raise downloaded
+            is_downloaded = instance.images.get_or_download(url, downloaded=downloaded, **kwargs)[1]
+            if is_downloaded:
                 logger.info('Image downloaded successfully', extra=extra)
             else:
                 logger.info('Found already downloaded image', extra=extra)
         except ImageWrongType:
-            logger.error('Error saving image. Need jpeg', extra=extra)
+            logger.error('Error saving image. Need jpeg, png, gif or webp', extra=extra)
+        except ImageTooLarge:
+            logger.error('Error saving image. Image is too large', extra=extra)
+        except requests.RequestException as e:
+            logger.error(f'Error downloading image: {e}', extra=extra)
+
+    def sync_images_of(self, urls, instance, **kwargs) -> None:
+        """
+        Download new images in parallel through keep-alive connections and link them to instance one by one
+        """
+        new_urls = {}  # type: Dict[Any, str]
+        for url in urls:
+            image = Image.objects.get_image_from_url(url)
+            if not image.id:
+                # the same image could be listed by different URLs, download it once
+                new_urls.setdefault((image.source_type, image.source_id) if image.source_id else url, url)
+        downloaded = downloader.download_many(new_urls.values())
+        try:
+            for url in urls:
+                self.sync_image(url, instance, downloaded=downloaded.get(url), **kwargs)
+        finally:
+            # temporary files of images not saved because of errors or duplicates
+            for image in downloaded.values():
+                if isinstance(image, DownloadedImage):
+                    image.file.close()
 
     def get_name_parts(self, name) -> Tuple[str, str]:
         """
@@ -97,8 +127,7 @@ class PersonSyncMixin(SyncBase):
     def sync_images(self) -> None:
         self.remote_obj.get_content('photos')
 
-        for url in self.remote_obj.photos:
-            self.sync_image(url, self.person, type=ImageType.PHOTO)
+        self.sync_images_of(self.remote_obj.photos, self.person, type=ImageType.PHOTO)
 
         logger.info(f'Photos were imported successfully for person {self.person}',
                     extra=dict(count=len(self.remote_obj.photos), person=self.person.id))
@@ -242,8 +271,7 @@ class MovieSyncMixin(SyncBase):
     def sync_images(self) -> None:
         self.remote_obj.get_content('posters')
 
-        for url in self.remote_obj.posters:
-            self.sync_image(url, self.movie, type=ImageType.POSTER)
+        self.sync_images_of(self.remote_obj.posters, self.movie, type=ImageType.POSTER)
 
         logger.info(f'Posters imported successfully for movie {self.movie}',
                     extra=dict(count=len(self.remote_obj.posters), person=self.movie.id))
@@ -9,19 +9,21 @@ from cinemanio.sites.kinopoisk.models import KinopoiskMovie, KinopoiskPerson
 @app.task
 def sync_movie(movie_id):
     """
-    Sync movie with kinopoisk
+    Sync and save movie with kinopoisk
     """
     movie = Movie.objects.get(pk=movie_id)
     movie.kinopoisk.sync()
+    movie.kinopoisk.save()
 
 
 @app.task
 def sync_person(person_id):
     """
-    Sync person with kinopoisk
+    Sync and save person with kinopoisk
     """
     person = Person.objects.get(pk=person_id)
     person.kinopoisk.sync()
+    person.kinopoisk.save()
 
 
 @app.task
@@ -1,9 +1,11 @@
+from unittest import mock
+
+import requests
 from parameterized import parameterized
-from vcr_unittest import VCRMixin
 
 from cinemanio.core.factories import MovieFactory, PersonFactory
 from cinemanio.core.models import Genre
-from cinemanio.core.tests.base import BaseTestCase
+from cinemanio.core.tests.base import BaseTestCase, VCRMixin
 from cinemanio.sites.kinopoisk.factories import KinopoiskMovieFactory, KinopoiskPersonFactory
 from cinemanio.sites.kinopoisk.tests.mixins import KinopoiskSyncMixin
 
@@ -81,6 +83,14 @@ class KinopoiskSyncTest(VCRMixin, BaseTestCase, KinopoiskSyncMixin):
         kp_movie.sync_images()
         self.assertEqual(kp_movie.movie.images.count(), 2)
 
+    def test_sync_image_download_error(self):
+        kp_movie = KinopoiskMovieFactory(id=161018)
+        with mock.patch('cinemanio.sites.kinopoisk.sync.logger') as logger:
+            kp_movie.sync_image('http://st.kp.yandex.net/image.jpg', kp_movie.movie,
+                                downloaded=requests.ConnectionError('Connection refused'))
+        logger.error.assert_called_once()
+        self.assertEqual(kp_movie.movie.images.count(), 0)
+
     def test_add_photos_to_person(self):
         kp_person = KinopoiskPersonFactory(id=129095)
         kp_person.sync_images()
@@ -1,6 +1,6 @@
 from typing import List, Tuple
 from datetime import timedelta
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from django.conf import settings
@@ -16,7 +16,17 @@ class SitesBaseModel(models.Model):
         abstract = True
 
     def sync(self, **_) -> None:
+        """
+        Mark instance as synced, site_synced signal is sent after synced instance is saved and committed
+        """
         self.synced_at = timezone.now()
+        self._synced = True
+
+    def save(self, *args, **kwargs):
+        from cinemanio.sites.signals import site_synced
+        super().save(*args, **kwargs)
+        if self.__dict__.pop('_synced', False):
+            transaction.on_commit(lambda: site_synced.send(sender=self.__class__, instance=self))
 
 
 def get_sites_queryset(queryset):
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+site_synced = Signal(providing_args=['instance'])
+site_imported = Signal(providing_args=['models'])
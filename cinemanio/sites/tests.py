@@ -2,11 +2,10 @@ from datetime import timedelta
 from django.utils import timezone
 from django.urls.base import reverse
 from django.contrib.contenttypes.models import ContentType
-from vcr_unittest import VCRMixin
 from parameterized import parameterized
 
 from cinemanio.core.factories import MovieFactory, PersonFactory
-from cinemanio.core.tests.base import BaseTestCase
+from cinemanio.core.tests.base import BaseTestCase, VCRMixin
 from cinemanio.core.tests.admin import AdminBaseTest
 from cinemanio.sites.imdb.factories import ImdbMovieFactory, ImdbPersonFactory
 from cinemanio.sites.imdb.tests.mixins import ImdbSyncMixin
@@ -20,7 +20,7 @@ from django.contrib import admin
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
 
-from graphene_django.views import GraphQLView
+from cinemanio.api.views import GraphQLView
 
 urlpatterns = [
     path('admin/', admin.site.urls),